@@ -0,0 +1,101 @@
+from cmath import exp as scalar_exp, phase as scalar_phase
+from math import sqrt
+from numpy import add, arange, cos, empty, interp, multiply, sin, zeros
+
+
+def pll_loop_gains(loop_bandwidth, damping=1 / sqrt(2)):
+    """
+    Proportional and integral gains of a second order phase-locked loop.
+
+    Args:
+        loop_bandwidth (float): Noise bandwidth of the loop times the update period (BnT).
+        damping (float): Damping factor of the loop.
+
+    Returns:
+        tuple: Proportional gain and integral gain, for a phase detector of unit gain.
+
+    Resource:
+        M. Rice, "Phase-Locked Loops", in Digital Communications: A Discrete-Time Approach.
+        Pearson Prentice Hall, 2009, app. C, pp. 709-715.
+    """
+    theta_n = loop_bandwidth / (damping + 1 / (4 * damping))
+    denominator = 1 + 2 * damping * theta_n + theta_n**2
+    proportional_gain = 4 * damping * theta_n / denominator
+    integral_gain = 4 * theta_n**2 / denominator
+    return proportional_gain, integral_gain
+
+
+def baseband_pll_QAM4_2(baseband, fs, loop_bandwidth, block_length,
+                        display_output, out=None):
+    """
+    Track the carrier phase of a complex QAM4_2 baseband signal with a fourth-power loop.
+
+    Every QAM4_2 symbol is a real amplitude times (1 + 1j), so the fourth power of the pulse
+    shaped signal is a negative real number rotated by four times the carrier phase, whatever the
+    data. The phase detector compares the angle of the fourth power with pi, which leaves a pi/2
+    ambiguity that 'frame_generator_RX' resolves from the signs of the correlation peaks.
+
+    The loop runs once per block of 'block_length' samples. The fourth powers are summed per block
+    in one vectorized pass, so that each update only costs a few scalar operations, and a second
+    order loop filter tracks the residual frequency left by the coarse frequency correction.
+    The phase of every sample is interpolated between the block centers and the signal is
+    derotated in one vectorized pass. Unlike 'costas_loop_QAM', the loop works on the complex
+    samples directly, without band shifting, low-pass filters and down-mixing.
+
+    Args:
+        baseband (numpy.ndarray): Complex baseband signal after coarse frequency correction.
+        fs (float): Sampling frequency of the signal.
+        loop_bandwidth (float): Noise bandwidth of the loop times the block period (BnT).
+        block_length (int): Number of samples per loop update.
+        display_output (bool): Flag to display the phase track.
+        out (numpy.ndarray, optional): Array of len(baseband) elements for the derotated
+                                       signal, may not be 'baseband' itself. Allocated with the
+                                       dtype of 'baseband' when None.
+
+    Returns:
+        tuple: A tuple containing:
+        theta (numpy.ndarray):           Estimated carrier phase of every sample.
+        baseband_signal (numpy.ndarray): Derotated baseband signal, written into 'out'.
+    """
+    N = len(baseband)
+    if out is None:
+        out = empty(N, dtype=baseband.dtype)
+    proportional_gain, integral_gain = pll_loop_gains(loop_bandwidth)
+
+    # The fourth power is computed in 'out', which is overwritten by the derotation afterwards
+    fourth_power = multiply(baseband, baseband, out=out)
+    multiply(fourth_power, fourth_power, out=fourth_power)
+    block_starts = arange(0, N, block_length)
+    number_of_blocks = len(block_starts)
+    block_sums = add.reduceat(fourth_power, block_starts).tolist() if N else []
+
+    theta_blocks = zeros(number_of_blocks)
+    theta_k = scalar_phase(-block_sums[0]) / 4 if block_sums else 0.0
+    frequency = 0.0
+    for b in range(number_of_blocks):
+        theta_blocks[b] = theta_k
+        error = scalar_phase(-block_sums[b] * scalar_exp(-4j * theta_k)) / 4
+        frequency += integral_gain * error
+        theta_k += frequency + proportional_gain * error
+
+    block_centers = block_starts + (block_length - 1) / 2
+    theta = interp(arange(N), block_centers, theta_blocks)
+    # exp(-1j * theta) written into the real and imaginary parts
+    cos(theta, out=out.real)
+    sin(theta, out=out.imag)
+    out.imag *= -1
+    baseband_signal = multiply(out, baseband, out=out)
+    if display_output:
+        baseband_pll_visualize(arange(N) / fs, theta)
+    return theta, baseband_signal
+
+
+def baseband_pll_visualize(t, theta):
+    from matplotlib.pyplot import subplots
+    fig, axs = subplots(figsize=(12.8, 9.6))
+    fig.suptitle("Baseband PLL Phase Recovery", fontsize=20)
+    axs.plot(t, theta)
+    axs.set_title("Theta", fontsize=18)
+    axs.set_ylabel("Carrier Phase", fontsize=16)
+    axs.set_xlabel("t (s)", fontsize=16)
+    fig.tight_layout()
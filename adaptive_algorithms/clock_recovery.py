@@ -1,9 +1,10 @@
-from utils.interpolation_with_sinc import interpolation_with_sinc
-from numpy import zeros
+from utils.interpolation_with_sinc import interpolation_with_sinc, interpolation_with_polyphase, polyphase_filter_bank, pad_for_polyphase
+from numpy import zeros, array, complex64, finfo, promote_types
 
 
 def clock_recovery_OP_max(baseband_signal, t_now, half_number_of_symbols,
-                          oversampling_factor, mu, delta, beta):
+                          oversampling_factor, mu, delta, beta,
+                          number_of_phases=None):
     """
     Perform clock recovery on sampled data.
 
@@ -18,8 +19,8 @@ def clock_recovery_OP_max(baseband_signal, t_now, half_number_of_symbols,
         mu (float): Step size coefficient for phase update.
         delta (float): Timing error detection window.
         beta (float): Roll-off factor for interpolation filter.
-
-    
+        number_of_phases (int, optional): Number of phases of the polyphase interpolator bank.
+                                          None uses the exact 'interpolation_with_sinc' path.
 
     Returns:
         tuple: A tuple containing:
@@ -27,7 +28,9 @@ def clock_recovery_OP_max(baseband_signal, t_now, half_number_of_symbols,
             numpy.ndarray: Array of recovered samples at each iteration.
 
     Note:
-        This function utilizes the 'interpolation_with_sinc' function for interpolation.
+        This function utilizes the 'interpolation_with_sinc' function for interpolation. When
+        'number_of_phases' is given, the fractional delay is quantized and each interpolant is
+        evaluated with 'interpolation_with_polyphase' instead.
 
     Resource:
         C. R. Johnson Jr, W. A. Sethares, and A. G. Klein, "Timing Recovery", in Software Receiver Design: Build
@@ -46,6 +49,25 @@ def clock_recovery_OP_max(baseband_signal, t_now, half_number_of_symbols,
     tau_save = zeros(n)
     i = 0
     tau = 0.0
+    if number_of_phases is not None:
+        filter_bank = polyphase_filter_bank(l, m, beta, number_of_phases)
+        padded_signal = pad_for_polyphase(baseband_signal, filter_bank)
+        while t_now < (len(baseband_signal) - l * m / 4):
+            xs[i] = interpolation_with_polyphase(padded_signal, t_now + tau,
+                                                 filter_bank)
+            x_deltap = interpolation_with_polyphase(padded_signal,
+                                                    t_now + tau + delta,
+                                                    filter_bank)
+            x_deltam = interpolation_with_polyphase(padded_signal,
+                                                    t_now + tau - delta,
+                                                    filter_bank)
+            dx = x_deltap - x_deltam
+            tau = tau + mu * dx * xs[i]
+            t_now = t_now + m
+            tau_save[i] = tau
+            i = i + 1
+        return tau_save, xs
+
     while t_now < (
             len(baseband_signal) - l * m / 4
     ):  
@@ -72,3 +94,142 @@ def clock_recovery_OP_max(baseband_signal, t_now, half_number_of_symbols,
         i = i + 1
 
     return tau_save, xs
+
+
+def clock_recovery_OP_max_IQ(baseband_signal, t_now, half_number_of_symbols,
+                             oversampling_factor, mu, delta, beta,
+                             number_of_phases=None):
+    """
+    Perform joint clock recovery on the real and imaginary rails of complex sampled data.
+
+    This function tracks a single timing offset for both rails of the complex 'baseband_signal'.
+    I and Q are interpolated together in one pass and the output power maximization error is
+    averaged over both rails, so the timing of the two rails cannot drift apart and the
+    interpolation work of two separate 'clock_recovery_OP_max' calls is halved.
+
+    Args:
+        baseband_signal (numpy.ndarray): Array containing complex baseband signal data for clock recovery.
+        t_now (float): Current time reference for clock recovery.
+        half_number_of_symbols (int): Half of the number of symbols for srrc.
+        oversampling_factor (int): Oversampling factor.
+        mu (float): Step size coefficient for phase update.
+        delta (float): Timing error detection window.
+        beta (float): Roll-off factor for interpolation filter.
+        number_of_phases (int, optional): Number of phases of the polyphase interpolator bank.
+                                          None uses the exact 'interpolation_with_sinc' path.
+
+    Returns:
+        tuple: A tuple containing:
+            numpy.ndarray: Array of recovered timing errors at each iteration.
+            numpy.ndarray: Array of recovered complex samples at each iteration.
+
+    Note:
+        Averaging the error over the rails keeps the loop gain of 'mu' equal to the one of
+        'clock_recovery_OP_max'.
+    """
+    m = oversampling_factor
+    l = half_number_of_symbols
+    if (t_now < m * l / 2):
+        print('tnow is less than min, therefore m*l/2 is assigned')
+        t_now = m * l / 2
+    n = round((len(baseband_signal) / oversampling_factor) - 2 * l)
+    # complex64 input is interpolated in single precision, tau stays a double
+    complex_dtype = promote_types(baseband_signal.dtype, complex64)
+    real_dtype = finfo(complex_dtype).dtype
+    xs = zeros(n, dtype=complex_dtype)
+    tau_save = zeros(n)
+    i = 0
+    tau = 0.0
+    if number_of_phases is not None:
+        filter_bank = polyphase_filter_bank(l, m, beta,
+                                            number_of_phases).astype(real_dtype, copy=False)
+        padded_signal = pad_for_polyphase(baseband_signal.astype(complex_dtype, copy=False),
+                                          filter_bank)
+        tau_block, xs_block, _, _ = clock_recovery_OP_max_IQ_block(
+            padded_iq=padded_signal.view(real_dtype).reshape(-1, 2),
+            filter_bank=filter_bank,
+            t_now=t_now,
+            t_end=len(baseband_signal) - l * m / 4,
+            tau=tau,
+            oversampling_factor=m,
+            mu=mu,
+            delta=delta)
+        count = min(n, len(xs_block))
+        tau_save[:count] = tau_block[:count]
+        xs[:count] = xs_block[:count]
+        return tau_save, xs
+
+    while t_now < (len(baseband_signal) - l * m / 4):
+        x = interpolation_with_sinc(sampledData=baseband_signal,
+                                    t=t_now + tau,
+                                    oneSidedLength=l,
+                                    osFactor=m,
+                                    beta=beta)
+        dx = interpolation_with_sinc(sampledData=baseband_signal,
+                                     t=t_now + tau + delta,
+                                     oneSidedLength=l,
+                                     osFactor=m,
+                                     beta=beta) - interpolation_with_sinc(
+                                         sampledData=baseband_signal,
+                                         t=t_now + tau - delta,
+                                         oneSidedLength=l,
+                                         osFactor=m,
+                                         beta=beta)
+        xs[i] = x
+        tau = tau + mu * (dx.real * x.real + dx.imag * x.imag) / 2
+        t_now = t_now + m
+        tau_save[i] = tau
+        i = i + 1
+
+    return tau_save, xs
+
+
+def clock_recovery_OP_max_IQ_block(padded_iq, filter_bank, t_now, t_end, tau,
+                                   oversampling_factor, mu, delta):
+    """
+    Run joint I/Q clock recovery over a block of samples with externally held state.
+
+    I and Q are stored as the two columns of a real array so that one real dot product of a
+    polyphase filter interpolates both rails.
+
+    Args:
+        padded_iq (numpy.ndarray): Array of shape (N, 2) holding the real and imaginary rails,
+                                   padded as done by 'pad_for_polyphase'.
+        filter_bank (numpy.ndarray): Filter bank generated by 'polyphase_filter_bank'.
+        t_now (float): Time reference of the first symbol, relative to the unpadded data.
+        t_end (float): Clock recovery stops once 't_now' reaches this time.
+        tau (float): Timing offset estimation at 't_now'.
+        oversampling_factor (int): Oversampling factor.
+        mu (float): Step size coefficient for phase update.
+        delta (float): Timing error detection window.
+
+    Returns:
+        tuple: A tuple containing:
+            numpy.ndarray: Array of recovered timing errors at each iteration.
+            numpy.ndarray: Array of recovered complex samples at each iteration.
+            float: Time reference of the next symbol.
+            float: Timing offset estimation for the next symbol.
+    """
+    m = oversampling_factor
+    tau_save = []
+    xs_real = []
+    xs_imag = []
+    while t_now < t_end:
+        x_real, x_imag = interpolation_with_polyphase(padded_iq, t_now + tau,
+                                                      filter_bank).tolist()
+        p_real, p_imag = interpolation_with_polyphase(padded_iq,
+                                                      t_now + tau + delta,
+                                                      filter_bank).tolist()
+        m_real, m_imag = interpolation_with_polyphase(padded_iq,
+                                                      t_now + tau - delta,
+                                                      filter_bank).tolist()
+        tau = tau + mu * ((p_real - m_real) * x_real +
+                          (p_imag - m_imag) * x_imag) / 2
+        t_now = t_now + m
+        tau_save.append(tau)
+        xs_real.append(x_real)
+        xs_imag.append(x_imag)
+    xs = zeros(len(xs_real), dtype=complex)
+    xs.real = xs_real
+    xs.imag = xs_imag
+    return array(tau_save), xs, t_now, tau
@@ -1,7 +1,7 @@
+from math import cos as scalar_cos, sin as scalar_sin
 from scipy.signal import remez, freqz
-from numpy import append, fliplr, matmul, pi, zeros, arange, cos, exp
-from utils.visualization import plot_response
-from matplotlib.pyplot import subplots
+from numpy import append, fliplr, matmul, pi, zeros, arange, cos, sin, exp, dot
+from utils.design_cache import DESIGN_CACHE
 """
     Perform carrier frequency and phase offset estimation using Costas loop for QAM signals.
 
@@ -77,17 +77,164 @@ def costas_loop_QAM(rx, fs, mu, estimated_frequency, theta_init,
         complex_exp_estimation[k] = exp(
             -1j * (2 * pi * estimated_frequency * t[k] + theta[k]))
     if display_output:
-        plot_response(wBP, hBP, "LP Filter for Costas Loop")
-
-        fig5, axs = subplots(2, 1, figsize=(12.8, 9.6))
-        fig5.suptitle("Costas Loop Phase Recovery", fontsize=20)
-        axs[0].plot(t, theta)
-        axs[0].set_title("Theta", fontsize=18)
-        axs[0].set_ylabel("Phase Offset", fontsize=16)
-        axs[0].set_xlabel("t (s)", fontsize=16)
-        axs[1].plot(t, carrier_estimation)
-        axs[1].set_title('Estimated Carrier', fontsize=18)
-        axs[1].set_ylabel("Amplitude", fontsize=16)
-        axs[1].set_xlabel("t (s)", fontsize=16)
-        fig5.tight_layout()
+        costas_loop_visualize(wBP, hBP, t, theta, carrier_estimation)
     return carrier_estimation, theta, complex_exp_estimation
+
+
+def costas_loop_filter(fs, fl=201):
+    """
+    Design the low-pass filter used in the arms of the Costas loop.
+
+    Args:
+        fs (float): Sampling frequency of the received signal.
+        fl (int): Number of filter taps.
+
+    Returns:
+        taps(numpy.ndarray): Read-only Remez low-pass filter taps, pass band up to 0.3 and stop band
+                             from 0.4 of Nyquist. Designs are served from 'DESIGN_CACHE'.
+    """
+    nyquist_freq = fs / 2
+    cut_off_freq = 0.4 * nyquist_freq
+    start_freq = 0.3 * nyquist_freq
+    ff = [0, start_freq, cut_off_freq, nyquist_freq]
+    fa = [1, 0]
+    return DESIGN_CACHE.get(('costas_loop_filter', float(fs), int(fl)),
+                            lambda: remez(fl, ff, fa, fs=fs))
+
+
+def costas_loop_QAM_block(rx, carrier_phase, theta_init, mu, reversed_taps,
+                          delay_line, position):
+    """
+    Run the Costas loop over one block of samples with externally held state.
+
+    The four mixer outputs are written into a preallocated (2 * fl, 4) delay line. Each sample is
+    stored twice, at 'position' and 'position + fl', so the latest 'fl' samples are always
+    available as one contiguous window and all four low-pass outputs are obtained with a single
+    vector-matrix product. The four quadrature cosines are derived from one cosine and one sine
+    of the loop phase. No arrays are allocated inside the sample loop.
+
+    Args:
+        rx (numpy.ndarray): Real received samples of the block.
+        carrier_phase (numpy.ndarray): Carrier phase 2*pi*f0*t of every sample in the block.
+        theta_init (float): Phase offset estimation for the first sample of the block.
+        mu (float): Step size for phase update in the Costas loop.
+        reversed_taps (numpy.ndarray): Time reversed low-pass filter taps of length fl.
+        delay_line (numpy.ndarray): Delay line of shape (2 * fl, 4), updated in place.
+        position (int): Write position in the delay line.
+
+    Returns:
+        tuple: A tuple containing:
+        theta (numpy.ndarray): Estimated phase offset, one longer than 'rx'. The last value is
+                               the initial phase for the next block.
+        position (int):        Write position in the delay line for the next block.
+    """
+    fl = len(reversed_taps)
+    # Quadrature offsets 0, pi/4, pi/2, 3pi/4 expressed as cos/sin pairs
+    c0, c1, c2, c3 = [scalar_cos(k * pi / 4) for k in range(4)]
+    s0, s1, s2, s3 = [scalar_sin(k * pi / 4) for k in range(4)]
+
+    theta = zeros(len(rx) + 1)
+    theta[0] = theta_init
+    phases = carrier_phase[:len(rx)].tolist()
+    samples = (2 * rx).tolist()
+    lpf = zeros(4)
+    theta_k = float(theta_init)
+
+    for k in range(len(samples)):
+        s = samples[k]
+        phase = phases[k] + theta_k
+        cos_phase = scalar_cos(phase)
+        sin_phase = scalar_sin(phase)
+        mixed = (s * (cos_phase * c0 - sin_phase * s0),
+                 s * (cos_phase * c1 - sin_phase * s1),
+                 s * (cos_phase * c2 - sin_phase * s2),
+                 s * (cos_phase * c3 - sin_phase * s3))
+        delay_line[position] = mixed
+        delay_line[position + fl] = mixed
+        position += 1
+        if position == fl:
+            position = 0
+        dot(reversed_taps, delay_line[position:position + fl], out=lpf)
+        lpf1, lpf2, lpf3, lpf4 = lpf.tolist()
+        theta_k = theta_k + mu * lpf1 * lpf2 * lpf3 * lpf4
+        theta[k + 1] = theta_k
+    return theta, position
+
+
+def costas_loop_QAM_ring_buffer(rx, fs, mu, estimated_frequency, theta_init,
+                                display_output, dtype=complex):
+    """
+    Ring buffer implementation of 'costas_loop_QAM'.
+
+    The sample loop runs in 'costas_loop_QAM_block' on a freshly cleared delay line, and the
+    carrier and complex exponential estimations are evaluated over the whole phase track once
+    the loop has finished.
+
+    Args:
+        rx (numpy.ndarray): Received signal.
+        fs (float): Sampling frequency of the received signal.
+        mu (float): Step size for phase update in the Costas loop.
+        estimated_frequency (float): Estimated carrier frequency of the received signal.
+        theta_init (float): Initial phase offset estimation.
+        display_output (bool): Flag to display intermediate plots and outputs.
+        dtype (optional): Complex data type of the complex exponential estimation, complex by
+                          default. The carrier estimation has the matching real type.
+
+    Returns:
+        tuple: A tuple containing:
+        carrier_estimation (numpy.ndarray):     Estimated carrier signal.
+        theta (numpy.ndarray):                  Estimated phase offset.
+        complex_exp_estimation (numpy.ndarray): Estimated complex exponential signal.
+
+    Note:
+        The outputs match 'costas_loop_QAM' up to floating point rounding. The phase track, and
+        therefore 'theta', is always float64, the loop would drift in single precision.
+    """
+    f0 = estimated_frequency
+    Ts = 1 / fs
+    N = len(rx)
+    time = N * Ts
+    t = arange(0, time, Ts)
+    fl = 201
+    taps = costas_loop_filter(fs, fl)
+
+    # Oldest sample first in the delay window, therefore taps are reversed
+    reversed_taps = taps[::-1].copy()
+    delay_line = zeros((2 * fl, 4))
+    carrier_phase = 2 * pi * f0 * t
+    K = max(len(t) - 1, 0)
+    theta = zeros(len(t))
+    theta[0] = theta_init
+    theta[:K + 1], _ = costas_loop_QAM_block(rx[:K], carrier_phase, theta_init,
+                                             mu, reversed_taps, delay_line, 0)
+
+    complex_exp_estimation = zeros(N, dtype=dtype)
+    carrier_estimation = zeros(N, dtype=complex_exp_estimation.real.dtype)
+    phase_track = carrier_phase[:K] + theta[:K]
+    cos(phase_track, out=carrier_estimation[:K])
+    # exp(-1j * phase_track) written into the real and imaginary parts
+    complex_exp_estimation.real[:K] = carrier_estimation[:K]
+    sin(phase_track, out=complex_exp_estimation.imag[:K])
+    complex_exp_estimation.imag[:K] *= -1
+    if display_output:
+        wBP, hBP = freqz(taps, [1], worN=1048, fs=fs)
+        costas_loop_visualize(wBP, hBP, t, theta, carrier_estimation)
+    return carrier_estimation, theta, complex_exp_estimation
+
+
+def costas_loop_visualize(wBP, hBP, t, theta, carrier_estimation):
+    from matplotlib.pyplot import subplots
+    from utils.visualization import plot_response
+    plot_response(wBP, hBP, "LP Filter for Costas Loop")
+
+    fig5, axs = subplots(2, 1, figsize=(12.8, 9.6))
+    fig5.suptitle("Costas Loop Phase Recovery", fontsize=20)
+    axs[0].plot(t, theta)
+    axs[0].set_title("Theta", fontsize=18)
+    axs[0].set_ylabel("Phase Offset", fontsize=16)
+    axs[0].set_xlabel("t (s)", fontsize=16)
+    axs[1].plot(t, carrier_estimation)
+    axs[1].set_title('Estimated Carrier', fontsize=18)
+    axs[1].set_ylabel("Amplitude", fontsize=16)
+    axs[1].set_xlabel("t (s)", fontsize=16)
+    fig5.tight_layout()
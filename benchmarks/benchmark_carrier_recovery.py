@@ -0,0 +1,134 @@
+from time import perf_counter
+import numpy as np
+from numpy.random import default_rng
+from adaptive_algorithms.costas_loop import costas_loop_QAM_ring_buffer
+from adaptive_algorithms.baseband_pll import baseband_pll_QAM4_2
+from benchmarks.synthetic_signals import qam4_2_baseband
+from benchmarks.benchmark_link import StageRecorder, random_text, transmit, \
+    FRAME_LENGTH_SYMBOLS, SAMPLE_RATE, CHANNEL_GAIN
+from receiver_module.operation_RX import symbol_detection_RX
+from receiver_module.frame_generator_RX import frame_generator_RX
+from receiver_module.message_handler import message_handler
+from utils.simulated_radio import SimulatedRadio, SimulatedChannel
+"""
+    Compare the two carrier recovery stages of 'operation_RX', the band-shifted Costas loop and
+    the fourth-power baseband PLL.
+
+    Lock behaviour is measured on synthetic QAM4_2 signals with a known residual frequency offset,
+    as left by the coarse frequency correction. The constellation phase error of the derotated
+    signal is estimated over windows of samples, the lock time is the end of the last window with
+    an error above 'LOCK_THRESHOLD', and the RMS error is taken over the second half of the
+    signal. CPU time and decode rate are then measured on the simulated link of
+    'benchmark_link', with the stages of 'symbol_detection_RX' timed separately.
+
+    Run from the repository root:
+        python -m benchmarks.benchmark_carrier_recovery
+"""
+
+FC = 2e6
+COSTAS_MU = 0.2
+THETA_INIT = np.pi / 6
+PLL_LOOP_BANDWIDTH = 0.01
+PLL_BLOCK_LENGTH = 16
+ERROR_WINDOW = 1024
+LOCK_THRESHOLD = 0.1
+
+
+def constellation_phase_error(baseband_signal):
+    # QAM4_2 lies on the diagonals, the fourth power of the signal is a negative real number
+    number_of_windows = len(baseband_signal) // ERROR_WINDOW
+    windows = baseband_signal[:number_of_windows * ERROR_WINDOW].reshape(number_of_windows, -1)
+    return np.angle(-np.sum(windows**4, axis=1)) / 4
+
+
+def lock_statistics(baseband_signal):
+    error = constellation_phase_error(baseband_signal)
+    unlocked = np.flatnonzero(np.abs(error) > LOCK_THRESHOLD)
+    lock_time = (unlocked[-1] + 1) * ERROR_WINDOW if len(unlocked) else 0
+    rms_error = np.sqrt(np.mean(error[len(error) // 2:]**2))
+    return lock_time, rms_error
+
+
+def benchmark_lock(number_of_samples=2**16, frequency_offsets=(0, 100, 500, 2000),
+                   snrs_db=(10, 20), seed=0):
+    rng = default_rng(seed)
+    baseband = qam4_2_baseband(number_of_samples, seed=seed)
+    baseband *= 0.5 / np.max(np.abs(baseband))
+    signal_power = np.mean(np.abs(baseband)**2)
+    t = np.arange(number_of_samples) / SAMPLE_RATE
+    print(f'{"Offset (Hz)":>11} {"SNR (dB)":>8} | {"Costas lock":>11} {"RMS (rad)":>9} '
+          f'{"Time (s)":>8} | {"PLL lock":>8} {"RMS (rad)":>9} {"Time (s)":>8}')
+    for frequency_offset in frequency_offsets:
+        for snr_db in snrs_db:
+            phase = 2 * np.pi * frequency_offset * t + rng.uniform(0, 2 * np.pi)
+            noise_std = np.sqrt(signal_power / 10**(snr_db / 10) / 2)
+            received = baseband * np.exp(1j * phase) + noise_std * (
+                rng.normal(size=number_of_samples) + 1j * rng.normal(size=number_of_samples))
+
+            shifted = received * np.exp(2j * np.pi * FC * t)
+            start = perf_counter()
+            _, _, complex_exp_estimation = costas_loop_QAM_ring_buffer(
+                np.real(shifted), SAMPLE_RATE, COSTAS_MU, FC, THETA_INIT, False)
+            costas_time = perf_counter() - start
+            costas_lock, costas_rms = lock_statistics(complex_exp_estimation * shifted)
+
+            start = perf_counter()
+            _, pll_baseband = baseband_pll_QAM4_2(received, SAMPLE_RATE, PLL_LOOP_BANDWIDTH,
+                                                  PLL_BLOCK_LENGTH, False)
+            pll_time = perf_counter() - start
+            pll_lock, pll_rms = lock_statistics(pll_baseband)
+            print(f'{frequency_offset:11.0f} {snr_db:8.0f} | {costas_lock:11d} {costas_rms:9.4f} '
+                  f'{costas_time:8.4f} | {pll_lock:8d} {pll_rms:9.4f} {pll_time:8.4f}')
+
+
+def decode(radio, message, carrier_recovery):
+    recorder = StageRecorder()
+    rx = radio.receive_samples()
+    recorder.mark()
+    try:
+        quantized_symbols, correlation_indices, correlation_values = symbol_detection_RX(
+            rx, radio.sample_rate, False, recorder, carrier_recovery)
+        received_message = message_handler(frame_generator_RX(
+            quantized_symbols=quantized_symbols,
+            correlation_indices=correlation_indices,
+            correlation_values=correlation_values,
+            single_frame_length=FRAME_LENGTH_SYMBOLS,
+            header='barker13',
+            modulation_type='QAM4_2'), display_outputs=False)
+    except Exception:
+        received_message = None
+    return recorder.stages, received_message == message
+
+
+def benchmark_link_carrier_recovery(rx_buffer_size=2**16, snrs_db=(5, 10, 20), trials=4,
+                                    message_length=100, seed=0):
+    message = random_text(message_length, seed)
+    print(f'{"SNR (dB)":>8} {"Stage":>12} {"Decoded":>8} {"Carrier (s)":>11} {"RX (s)":>8}')
+    for snr_db in snrs_db:
+        for carrier_recovery, stage in (('costas', 'costas_loop'), ('pll', 'baseband_pll')):
+            decoded = 0
+            carrier_time = 0.0
+            rx_time = 0.0
+            for trial in range(trials):
+                rng = default_rng(seed + trial)
+                channel = SimulatedChannel(frequency_offset=rng.uniform(-5e3, 5e3),
+                                           phase_offset=rng.uniform(0, 2 * np.pi),
+                                           timing_offset=rng.uniform(0, 2**18),
+                                           snr_db=snr_db,
+                                           gain=CHANNEL_GAIN,
+                                           seed=seed + trial)
+                radio = SimulatedRadio('benchmark', 'benchmark', channel=channel)
+                radio.sample_rate = SAMPLE_RATE
+                radio.rx_buffer_size = rx_buffer_size
+                transmit(StageRecorder(), radio, message)
+                stages, success = decode(radio, message, carrier_recovery)
+                decoded += success
+                carrier_time += stages.get(stage, {}).get('wall_time_s', 0.0)
+                rx_time += sum(record['wall_time_s'] for record in stages.values())
+            print(f'{snr_db:8.0f} {carrier_recovery:>12} {decoded:4d}/{trials:<3d} '
+                  f'{carrier_time / trials:11.4f} {rx_time / trials:8.4f}')
+
+
+if __name__ == "__main__":
+    benchmark_lock()
+    benchmark_link_carrier_recovery()
@@ -0,0 +1,96 @@
+from time import perf_counter
+from numpy import abs, imag, max, real
+from numpy.random import default_rng
+from adaptive_algorithms.clock_recovery import clock_recovery_OP_max, clock_recovery_OP_max_IQ
+from utils.interpolation_with_sinc import interpolation_with_sinc, interpolation_with_polyphase, polyphase_filter_bank, pad_for_polyphase
+from benchmarks.synthetic_signals import matched_filtered_qam4_2
+"""
+    Compare the exact and polyphase interpolation paths of 'clock_recovery_OP_max'.
+
+    Reports the run time of clock recovery for each path, the maximum interpolation error of
+    the polyphase bank against 'interpolation_with_sinc' as a function of the phase count, and
+    the run time of joint I/Q recovery against two separate rails.
+
+    Run from the repository root:
+        python -m benchmarks.benchmark_clock_recovery
+"""
+
+OVERSAMPLING_RATE = 16
+HALF_NO_OF_SYMBOLS = 6
+ROLLOFF_FACTOR = 0.75
+PHASE_COUNTS = [16, 32, 64, 128, 256, 512, 1024]
+
+
+def time_clock_recovery(baseband_signal, number_of_phases,
+                        clock_recovery=clock_recovery_OP_max):
+    start = perf_counter()
+    tau, downsampled = clock_recovery(
+        baseband_signal=baseband_signal,
+        t_now=2 * HALF_NO_OF_SYMBOLS * OVERSAMPLING_RATE,
+        half_number_of_symbols=HALF_NO_OF_SYMBOLS,
+        oversampling_factor=OVERSAMPLING_RATE,
+        mu=0.6,
+        delta=2,
+        beta=ROLLOFF_FACTOR,
+        number_of_phases=number_of_phases)
+    return perf_counter() - start, tau, downsampled
+
+
+def interpolation_error(baseband_signal, number_of_phases, times):
+    filter_bank = polyphase_filter_bank(HALF_NO_OF_SYMBOLS, OVERSAMPLING_RATE,
+                                        ROLLOFF_FACTOR, number_of_phases)
+    padded_signal = pad_for_polyphase(baseband_signal, filter_bank)
+    error = 0.0
+    for t in times:
+        exact = interpolation_with_sinc(baseband_signal, t,
+                                        HALF_NO_OF_SYMBOLS, OVERSAMPLING_RATE,
+                                        ROLLOFF_FACTOR)
+        quantized = interpolation_with_polyphase(padded_signal, t, filter_bank)
+        error = max([error, abs(exact - quantized)])
+    return error
+
+
+def benchmark_clock_recovery(number_of_samples=2**14, number_of_times=2000):
+    baseband_signal = real(matched_filtered_qam4_2(number_of_samples))
+    peak = max(abs(baseband_signal))
+
+    exact_time, exact_tau, exact_symbols = time_clock_recovery(
+        baseband_signal, None)
+    print(f'Samples = {number_of_samples}, symbols = {len(exact_symbols)}')
+    print(f'{"Path":>12} {"Time (s)":>10} {"Symbols/s":>12} {"Speed-up":>9} {"Max tau diff":>13}')
+    print(f'{"exact":>12} {exact_time:10.4f} {len(exact_symbols) / exact_time:12.0f} {1.0:9.1f} {0.0:13.3e}')
+    for number_of_phases in [64, 256]:
+        run_time, tau, symbols = time_clock_recovery(baseband_signal,
+                                                     number_of_phases)
+        tau_difference = max(abs(tau - exact_tau))
+        print(f'{number_of_phases:>12} {run_time:10.4f} {len(symbols) / run_time:12.0f} {exact_time / run_time:9.1f} {tau_difference:13.3e}')
+
+    rng = default_rng(1)
+    l = HALF_NO_OF_SYMBOLS * OVERSAMPLING_RATE
+    times = rng.uniform(l, number_of_samples - l, number_of_times)
+    print(f'\nMax interpolation error over {number_of_times} random times (signal peak = {peak:.3f})')
+    print(f'{"Phases":>8} {"Max error":>12} {"Relative":>10}')
+    for number_of_phases in PHASE_COUNTS:
+        error = interpolation_error(baseband_signal, number_of_phases, times)
+        print(f'{number_of_phases:>8} {error:12.3e} {error / peak:10.3e}')
+
+
+def benchmark_joint_clock_recovery(number_of_samples=2**16,
+                                   number_of_phases=256):
+    baseband_signal = matched_filtered_qam4_2(number_of_samples)
+    real_time, _, _ = time_clock_recovery(real(baseband_signal),
+                                          number_of_phases)
+    imag_time, _, _ = time_clock_recovery(imag(baseband_signal),
+                                          number_of_phases)
+    joint_time, _, _ = time_clock_recovery(baseband_signal, number_of_phases,
+                                           clock_recovery_OP_max_IQ)
+    two_rail_time = real_time + imag_time
+    print(f'\nJoint I/Q clock recovery, {number_of_samples} samples, {number_of_phases} phases')
+    print(f'Separate I and Q rails = {two_rail_time:.4f} s')
+    print(f'Joint I/Q              = {joint_time:.4f} s')
+    print(f'Speed-up               = {two_rail_time / joint_time:.1f}x')
+
+
+if __name__ == "__main__":
+    benchmark_clock_recovery()
+    benchmark_joint_clock_recovery()
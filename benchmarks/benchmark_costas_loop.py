@@ -0,0 +1,39 @@
+from time import perf_counter
+from numpy import abs, max, pi
+from adaptive_algorithms.costas_loop import costas_loop_QAM, costas_loop_QAM_ring_buffer
+from benchmarks.synthetic_signals import costas_loop_input
+"""
+    Compare samples/second of 'costas_loop_QAM' and 'costas_loop_QAM_ring_buffer' on the same
+    synthetic QAM4_2 input.
+
+    Run from the repository root:
+        python -m benchmarks.benchmark_costas_loop
+"""
+
+SAMPLING_RATE = 10e6
+FC = 2e6
+MU = 0.2
+THETA_INIT = pi / 6
+
+
+def time_costas_loop(costas_loop, rx):
+    start = perf_counter()
+    outputs = costas_loop(rx, SAMPLING_RATE, MU, FC, THETA_INIT, False)
+    elapsed = perf_counter() - start
+    return elapsed, outputs
+
+
+def benchmark_costas_loop(number_of_samples=2**13):
+    rx = costas_loop_input(number_of_samples, fs=SAMPLING_RATE, fc=FC)
+    reference_time, reference = time_costas_loop(costas_loop_QAM, rx)
+    ring_time, ring = time_costas_loop(costas_loop_QAM_ring_buffer, rx)
+    theta_error = max(abs(reference[1] - ring[1]))
+    print(f'Samples                      = {number_of_samples}')
+    print(f'costas_loop_QAM              = {number_of_samples / reference_time:12.0f} samples/s')
+    print(f'costas_loop_QAM_ring_buffer  = {number_of_samples / ring_time:12.0f} samples/s')
+    print(f'Speed-up                     = {reference_time / ring_time:12.1f}x')
+    print(f'Max theta difference         = {theta_error:12.3e} rad')
+
+
+if __name__ == "__main__":
+    benchmark_costas_loop()
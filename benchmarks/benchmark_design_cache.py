@@ -0,0 +1,54 @@
+from os import remove
+from tempfile import gettempdir
+from os.path import join
+from time import perf_counter
+from utils.design_cache import DESIGN_CACHE
+from utils.pulse_shape import srrc_cached
+from utils.interpolation_with_sinc import polyphase_filter_bank
+from adaptive_algorithms.costas_loop import costas_loop_filter
+"""
+    Compare cold-start, warm and disk-loaded design times of the filters and pulses used by
+    'operation_RX', and print the hit/miss counters of 'DESIGN_CACHE'.
+
+    Run from the repository root:
+        python -m benchmarks.benchmark_design_cache
+"""
+
+SAMPLE_RATE = 10e6
+OVERSAMPLING_RATE = 16
+HALF_NO_OF_SYMBOLS = 6
+ROLLOFF_FACTOR = 0.75
+NUMBER_OF_PHASES = 256
+
+
+def design_receiver_filters():
+    start = perf_counter()
+    srrc_cached(HALF_NO_OF_SYMBOLS, ROLLOFF_FACTOR, OVERSAMPLING_RATE)
+    costas_loop_filter(SAMPLE_RATE)
+    polyphase_filter_bank(HALF_NO_OF_SYMBOLS, OVERSAMPLING_RATE,
+                          ROLLOFF_FACTOR, NUMBER_OF_PHASES)
+    return perf_counter() - start
+
+
+def benchmark_design_cache():
+    cache_file = join(gettempdir(), 'pluto_chat_design_cache.npz')
+    DESIGN_CACHE.clear()
+    cold_time = design_receiver_filters()
+    warm_time = design_receiver_filters()
+    print(f'After cold and warm run: {DESIGN_CACHE}')
+
+    DESIGN_CACHE.save(cache_file)
+    DESIGN_CACHE.clear()
+    start = perf_counter()
+    DESIGN_CACHE.load(cache_file)
+    load_time = perf_counter() - start
+    loaded_time = design_receiver_filters()
+    print(f'After loading from disk: {DESIGN_CACHE}')
+    remove(cache_file)
+
+    print(f'{"Cold (s)":>10} {"Warm (s)":>10} {"Load (s)":>10} {"Loaded (s)":>11}')
+    print(f'{cold_time:10.4f} {warm_time:10.6f} {load_time:10.4f} {loaded_time:11.6f}')
+
+
+if __name__ == "__main__":
+    benchmark_design_cache()
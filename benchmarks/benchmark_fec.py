@@ -0,0 +1,124 @@
+from argparse import ArgumentParser
+from time import perf_counter
+import numpy as np
+from numpy.random import default_rng
+from benchmarks.benchmark_link import random_text, SAMPLE_RATE, CHANNEL_GAIN, FREQUENCY_OFFSET, \
+    BUFFER_LENGTH_TX
+from receiver_module.frame_generator_RX import frame_generator_RX_binary
+from receiver_module.operation_RX import symbol_detection_RX
+from transmission_module.operation_TX import operation_TX
+from utils.fec import FEC_CODES, coded_length, fec_decode, fec_encode
+from utils.frame_header import DATA_LENGTH, FRAME_OVERHEAD
+from utils.simulated_radio import SimulatedRadio, SimulatedChannel
+from utils.symbol_conversion import letters_to_pam_lut
+"""
+    Benchmark the forward error correction of 'utils.fec'.
+
+    Decoder: frames of 85 bytes, the binary frames of 'operation_TX', are encoded, a fraction
+    'symbol_error_rate' of the coded PAM symbols is moved to a neighbouring level, and the frames
+    are decoded in one call. Reported are the decoder throughput in coded symbols per second and
+    the rate of frames with residual errors.
+
+    Link: a message is sent in binary frames with every code through a simulated channel and
+    received in consecutive buffers. Reported are the valid frames per buffer and the goodput,
+    the payload bytes of the frames passing the CRC per second of received samples. At high SNR
+    the uncoded frames carry the most payload, at low SNR only coded frames get through.
+
+    Run from the repository root:
+        python -m benchmarks.benchmark_fec
+        python -m benchmarks.benchmark_fec --snrs 2 4 8 --buffers 4
+"""
+
+FRAME_LENGTH_BYTES = DATA_LENGTH + FRAME_OVERHEAD
+CARRIER_RECOVERY = 'pll'
+
+
+def symbol_errors(symbols_PAM, symbol_error_rate, rng):
+    # A symbol error moves the level to a neighbouring level, the outer levels inwards
+    received = symbols_PAM.astype(float)
+    errors = rng.random(received.shape) < symbol_error_rate
+    steps = np.where(rng.random(received.shape) < 0.5, -2, 2)
+    steps = np.where(np.abs(received + steps) > 3, -steps, steps)
+    received[errors] += steps[errors]
+    return received
+
+
+def benchmark_decoder(number_of_frames=64, symbol_error_rates=(0, 0.003, 0.01, 0.03),
+                      repeats=3, seed=0):
+    rng = default_rng(seed)
+    frames = rng.integers(0, 256, size=(number_of_frames, FRAME_LENGTH_BYTES), dtype=np.uint8)
+    symbols_PAM = letters_to_pam_lut(frames.ravel()).reshape(number_of_frames, -1)
+    print(f'Decoder, {number_of_frames} frames of {FRAME_LENGTH_BYTES} bytes')
+    print(f'{"FEC":>13} {"Symbols":>8} {"SER":>6} {"Decode (s)":>10} {"Symbols/s":>10} '
+          f'{"Frame errors":>12}')
+    for fec in FEC_CODES:
+        coded = fec_encode(symbols_PAM, fec)
+        for symbol_error_rate in symbol_error_rates:
+            received = symbol_errors(coded, symbol_error_rate, rng)
+            best = None
+            for _ in range(repeats):
+                start = perf_counter()
+                decoded = fec_decode(received, fec)
+                elapsed = perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            frame_errors = np.mean(np.any(decoded != symbols_PAM, axis=1))
+            print(f'{fec:>13} {coded_length(fec, FRAME_LENGTH_BYTES):8d} {symbol_error_rate:6.3f} '
+                  f'{best:10.4f} {coded.size / best:10.3g} {frame_errors:12.2f}')
+
+
+def receive_frames(message, fec, snr_db, rx_buffer_size, number_of_buffers, seed):
+    rng = default_rng(seed)
+    channel = SimulatedChannel(frequency_offset=FREQUENCY_OFFSET,
+                               phase_offset=rng.uniform(0, 2 * np.pi),
+                               timing_offset=rng.uniform(0, BUFFER_LENGTH_TX),
+                               snr_db=snr_db,
+                               gain=CHANNEL_GAIN,
+                               seed=seed)
+    radio = SimulatedRadio('benchmark', 'benchmark', channel=channel)
+    radio.sample_rate = SAMPLE_RATE
+    radio.rx_buffer_size = rx_buffer_size
+    operation_TX(radio, message, False, False, frame_format='binary', fec=fec)
+    valid_frames = 0
+    payload_bytes = 0
+    for _ in range(number_of_buffers):
+        quantized_symbols, correlation_indices, correlation_values = symbol_detection_RX(
+            radio.receive_samples(), SAMPLE_RATE, False, carrier_recovery=CARRIER_RECOVERY)
+        records = frame_generator_RX_binary(
+            quantized_symbols=quantized_symbols,
+            correlation_indices=correlation_indices,
+            correlation_values=correlation_values,
+            data_length_with_header=FRAME_LENGTH_BYTES,
+            header='barker13',
+            modulation_type='QAM4_2')
+        valid_frames += len(records)
+        payload_bytes += sum(len(payload) for _, _, payload in records)
+    return valid_frames, payload_bytes
+
+
+def benchmark_link(snrs=(2, 4, 6, 8), message_length=1000, rx_buffer_size=2**16,
+                   number_of_buffers=8, seed=0):
+    message = random_text(message_length, seed)
+    seconds = number_of_buffers * rx_buffer_size / SAMPLE_RATE
+    print(f'Link, messages of {message_length} characters, {number_of_buffers} buffers of '
+          f'{rx_buffer_size} samples')
+    print(f'{"SNR (dB)":>8} {"FEC":>13} {"Frames/buffer":>13} {"Goodput (kB/s)":>14}')
+    for snr_db in snrs:
+        for fec in FEC_CODES:
+            valid_frames, payload_bytes = receive_frames(
+                message, fec, snr_db, rx_buffer_size, number_of_buffers, seed)
+            print(f'{snr_db:8.1f} {fec:>13} {valid_frames / number_of_buffers:13.2f} '
+                  f'{payload_bytes / seconds / 1000:14.1f}')
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description='Benchmark the forward error correction')
+    parser.add_argument('--frames', type=int, default=64)
+    parser.add_argument('--snrs', type=float, nargs='+', default=[2, 4, 6, 8])
+    parser.add_argument('--message-length', type=int, default=1000)
+    parser.add_argument('--buffer-size', type=int, default=16, help='log2 of rx_buffer_size')
+    parser.add_argument('--buffers', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    arguments = parser.parse_args()
+    benchmark_decoder(arguments.frames, seed=arguments.seed)
+    benchmark_link(arguments.snrs, arguments.message_length, 2**arguments.buffer_size,
+                   arguments.buffers, arguments.seed)
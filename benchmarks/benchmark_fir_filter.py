@@ -0,0 +1,99 @@
+from time import perf_counter
+from numpy import abs, complex64, complex128, concatenate, finfo, max
+from numpy.random import default_rng
+from scipy import signal
+from utils.fir_filter import OverlapSaveFilter
+from utils.pulse_shape import srrc_cached
+"""
+    Compare 'OverlapSaveFilter' with the 'scipy.signal.convolve' calls it replaces.
+
+    The RX matched filter, 'signal.convolve(baseband_signal, pulse, 'same')' on complex samples,
+    and the former TX pulse shaper, two real 'full' convolutions of the real and imaginary parts,
+    are timed against the overlap-save filter for block sizes from 2**12 to 2**20, in double and
+    single precision. The streaming mode is checked by filtering the largest block in pieces and
+    comparing with one causal convolution of the whole block.
+
+    Run from the repository root:
+        python -m benchmarks.benchmark_fir_filter
+"""
+
+HALF_NO_OF_SYMBOLS = 6
+ROLLOFF_FACTOR = 0.75
+OVERSAMPLING_RATE = 16
+NUMBER_OF_PIECES = 16
+
+
+def best_time(function, repeats):
+    best = None
+    for _ in range(repeats):
+        start = perf_counter()
+        result = function()
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def benchmark_matched_filter(block_sizes, repeats):
+    rng = default_rng(0)
+    print('RX matched filter, mode same')
+    print(f'{"Samples":>8} {"dtype":>10} {"FFT":>5} {"convolve (s)":>12} {"overlap-save (s)":>16} '
+          f'{"Speed-up":>9} {"Max error":>10}')
+    for dtype in (complex128, complex64):
+        pulse = srrc_cached(HALF_NO_OF_SYMBOLS, ROLLOFF_FACTOR, OVERSAMPLING_RATE,
+                            dtype=finfo(dtype).dtype)
+        matched_filter = OverlapSaveFilter(pulse)
+        for n in block_sizes:
+            baseband = (rng.normal(size=n) + 1j * rng.normal(size=n)).astype(dtype)
+            convolve_time, reference = best_time(
+                lambda: signal.convolve(baseband, pulse, 'same'), repeats)
+            filter_time, filtered = best_time(
+                lambda: matched_filter.filter(baseband, 'same'), repeats)
+            error = max(abs(filtered - reference))
+            print(f'{n:8d} {dtype.__name__:>10} {matched_filter.fft_length_for(n):5d} '
+                  f'{convolve_time:12.5f} {filter_time:16.5f} '
+                  f'{convolve_time / filter_time:8.1f}x {error:10.2e}')
+
+
+def benchmark_pulse_shaper(block_sizes, repeats):
+    rng = default_rng(1)
+    pulse = srrc_cached(HALF_NO_OF_SYMBOLS, ROLLOFF_FACTOR, OVERSAMPLING_RATE)
+    pulse_shaper = OverlapSaveFilter(pulse)
+    print('TX pulse shaper, mode full')
+    print(f'{"Samples":>8} {"2 x convolve (s)":>16} {"overlap-save (s)":>16} {"Speed-up":>9} '
+          f'{"Max error":>10}')
+    for n in block_sizes:
+        oversampled_symbols = rng.choice([-3.0, -1.0, 1.0, 3.0], size=(2, n))
+        oversampled_symbols[:, 1::2] = 0
+        oversampled_real, oversampled_imag = oversampled_symbols
+        convolve_time, reference = best_time(
+            lambda: signal.convolve(oversampled_real, pulse, 'full') +
+            1j * signal.convolve(oversampled_imag, pulse, 'full'), repeats)
+        filter_time, shaped = best_time(
+            lambda: pulse_shaper.filter(oversampled_real + 1j * oversampled_imag, 'full'),
+            repeats)
+        error = max(abs(shaped - reference))
+        print(f'{n:8d} {convolve_time:16.5f} {filter_time:16.5f} '
+              f'{convolve_time / filter_time:8.1f}x {error:10.2e}')
+
+
+def check_stream(n):
+    # Pieces of a stream filtered one after the other equal one causal convolution
+    rng = default_rng(2)
+    pulse = srrc_cached(HALF_NO_OF_SYMBOLS, ROLLOFF_FACTOR, OVERSAMPLING_RATE)
+    stream = rng.normal(size=n) + 1j * rng.normal(size=n)
+    matched_filter = OverlapSaveFilter(pulse)
+    pieces = stream.reshape(NUMBER_OF_PIECES, -1)
+    filtered = concatenate([matched_filter.process(piece) for piece in pieces])
+    reference = signal.convolve(stream, pulse, 'full')[:n]
+    print(f'Stream of {NUMBER_OF_PIECES} pieces of {n // NUMBER_OF_PIECES}, '
+          f'max error = {max(abs(filtered - reference)):.2e}')
+
+
+def benchmark_fir_filter(block_sizes=(2**12, 2**14, 2**16, 2**18, 2**20), repeats=5):
+    benchmark_matched_filter(block_sizes, repeats)
+    benchmark_pulse_shaper(block_sizes, repeats)
+    check_stream(block_sizes[-1])
+
+
+if __name__ == "__main__":
+    benchmark_fir_filter()
@@ -0,0 +1,111 @@
+from time import perf_counter
+from numpy import array_equal, concatenate, imag, real
+from transmission_module.frame_generator_TX import frame_generator_TX, frame_generator_TX_preallocated
+from receiver_module.frame_generator_RX import frame_generator_RX, frame_generator_RX_batched, \
+    select_frame_peaks
+from receiver_module.symbol_correlation import symbol_correlation_vectorized
+from receiver_module.message_handler import ReassemblyStore, message_handler
+from benchmarks.benchmark_symbol_conversion import random_message
+"""
+    Compare 'frame_generator_TX' and 'frame_generator_TX_preallocated' on multi-kilobyte messages,
+    and the RX deframers 'frame_generator_RX' and 'frame_generator_RX_batched'.
+
+    The RX deframers decode the TX frames of the same messages, with the real axis inverted to
+    exercise the phase ambiguity correction. Both decode the peaks chosen by 'select_frame_peaks',
+    so the batched frames joined are identical to the string of 'frame_generator_RX'.
+
+    The frames of short messages around multiples of 'DATA_LENGTH' are decoded the same way and
+    reassembled by 'message_handler' and 'ReassemblyStore'. A message whose length is a multiple
+    of 'DATA_LENGTH' ends with an empty frame, which has to be found as the last frame.
+
+    Run from the repository root:
+        python -m benchmarks.benchmark_frame_generator
+"""
+
+DATA_LENGTH = 80
+MESSAGE_LENGTHS = [1024, 4096, 16384]
+REASSEMBLY_MESSAGE_LENGTHS = [79, 80, 81, 160, 240, 800]
+HEADER_LENGTH = 13
+TRIGGER = 80
+
+
+def time_frame_generator(frame_generator, message):
+    start = perf_counter()
+    outputs = frame_generator(data_length=DATA_LENGTH,
+                              text_message=message,
+                              header_type='barker13',
+                              modulation_type='QAM4_2',
+                              info=False)
+    return perf_counter() - start, outputs
+
+
+def time_frame_generator_RX(frame_generator, quantized_symbols, correlation_indices,
+                            correlation_values, single_frame_length):
+    start = perf_counter()
+    outputs = frame_generator(quantized_symbols=quantized_symbols,
+                              correlation_indices=correlation_indices,
+                              correlation_values=correlation_values,
+                              single_frame_length=single_frame_length,
+                              header='barker13',
+                              modulation_type='QAM4_2')
+    return perf_counter() - start, outputs
+
+
+def benchmark_frame_generator():
+    print(f'{"Characters":>10} {"Frames":>7} {"Append (s)":>11} {"Prealloc (s)":>13} {"Speed-up":>9} {"Identical":>10}')
+    for message_length in MESSAGE_LENGTHS:
+        message = random_message(message_length)
+        append_time, reference = time_frame_generator(frame_generator_TX,
+                                                      message)
+        preallocated_time, frames = time_frame_generator(
+            frame_generator_TX_preallocated, message)
+        identical = array_equal(reference[0], frames[0])
+        number_of_frames = len(frames[0]) // frames[1]
+        print(f'{message_length:>10} {number_of_frames:>7} {append_time:11.4f} {preallocated_time:13.4f} {append_time / preallocated_time:9.1f} {str(identical):>10}')
+
+
+def received_frames(message):
+    symbols, single_frame_length = frame_generator_TX_preallocated(
+        DATA_LENGTH, message, 'barker13', 'QAM4_2', False)[:2]
+    # Two copies of the cyclic TX buffer, received with the real axis inverted
+    symbols = concatenate((symbols, symbols))
+    quantized_symbols = -real(symbols) + 1j * imag(symbols)
+    correlation_indices, correlation_values = symbol_correlation_vectorized(
+        symbols=quantized_symbols,
+        modulation_type='QAM4_2',
+        trigger=TRIGGER,
+        header_length=HEADER_LENGTH,
+        visualize=False)
+    peaks, _ = select_frame_peaks(correlation_indices, single_frame_length - HEADER_LENGTH,
+                                  len(quantized_symbols))
+    return (quantized_symbols, correlation_indices[peaks], correlation_values[peaks],
+            single_frame_length)
+
+
+def benchmark_frame_generator_RX():
+    print(f'{"Characters":>10} {"Frames":>7} {"Loop (s)":>9} {"Batched (s)":>12} {"Speed-up":>9} {"Per frame (us)":>15} {"Identical":>10}')
+    for message_length in MESSAGE_LENGTHS:
+        message = random_message(message_length)
+        arguments = received_frames(message)
+        loop_time, reference = time_frame_generator_RX(frame_generator_RX, *arguments)
+        batched_time, records = time_frame_generator_RX(frame_generator_RX_batched, *arguments)
+        identical = ''.join(frame for _, frame in records) == reference
+        print(f'{message_length:>10} {len(records):>7} {loop_time:9.4f} {batched_time:12.4f} {loop_time / batched_time:9.1f} {1e6 * batched_time / len(records):15.1f} {str(identical):>10}')
+
+
+def check_reassembly():
+    print(f'{"Characters":>10} {"Frames":>7} {"Handler":>8} {"Store":>6}')
+    for message_length in REASSEMBLY_MESSAGE_LENGTHS:
+        message = random_message(message_length)
+        records = frame_generator_RX_batched(*received_frames(message), header='barker13',
+                                             modulation_type='QAM4_2')
+        received_message = ''.join(frame for _, frame in records)
+        handler = message_handler(received_message, display_outputs=False) == message
+        store = ReassemblyStore().add(received_message) == [message]
+        print(f'{message_length:>10} {len(records):>7} {str(handler):>8} {str(store):>6}')
+
+
+if __name__ == "__main__":
+    benchmark_frame_generator()
+    benchmark_frame_generator_RX()
+    check_reassembly()
@@ -0,0 +1,310 @@
+import json
+import platform
+import resource
+import tracemalloc
+from argparse import ArgumentParser
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from statistics import median
+from time import perf_counter
+import numpy as np
+from numpy.random import default_rng
+from transmission_module.frame_generator_TX import frame_generator_TX_preallocated
+from transmission_module.signal_generator_TX import signal_generator_cached
+from receiver_module.frame_generator_RX import frame_generator_RX
+from receiver_module.message_handler import message_handler
+from receiver_module.operation_RX import symbol_detection_RX
+from utils.frame_header import DATA_LENGTH
+from utils.precision import PRECISION
+from utils.simulated_radio import SimulatedRadio, SimulatedChannel
+from utils.work_buffers import work_buffers
+"""
+    End-to-end link benchmark on a simulated radio.
+
+    Every configuration of the sweep over message length, 'rx_buffer_size' and SNR runs the TX
+    chain of 'operation_TX', a 'SimulatedRadio' channel and the stages of 'operation_RX', on seeded
+    inputs. The RX stages are timed by passing the stage recorder as the 'timer' of
+    'symbol_detection_RX', so the benchmark always runs the code of 'operation_RX'. For each stage
+    the median wall time, the processed samples per second and the peak traced memory are
+    reported. For each configuration the rate of trials whose message is decoded exactly, the
+    exception types raised by the RX chain and how often, the full-length work arrays allocated
+    by a warm RX call and the peak RSS of a process running one trial are reported. The report is
+    JSON, so runs on two commits can be diffed. Nothing is plotted, so matplotlib is not imported.
+
+    Peak traced memory is measured in a separate run with 'tracemalloc', so that tracing does not
+    distort the wall times. Peak RSS is measured in a fresh process for every configuration.
+
+    Run from the repository root:
+        python -m benchmarks.benchmark_link --output link.json
+        python -m benchmarks.benchmark_link --message-lengths 100 --buffer-sizes 16 --snr 20
+"""
+
+#TX
+BUFFER_LENGTH_TX = int(2**18)
+SAMPLE_RATE = int(10e6)
+
+#RX
+FRAME_LENGTH_SYMBOLS = 365
+SYMBOL_STAGES = ('quantization', 'correlation')
+
+#SRRC Generation
+OVERSAMPLING_RATE = 16
+HALF_NO_OF_SYMBOLS = 6
+ROLLOFF_FACTOR = 0.75
+
+#Channel
+FREQUENCY_OFFSET = 3e3
+CHANNEL_GAIN = 0.5
+
+MESSAGE_CHARACTERS = 'abcdefghijklmnopqrstuvwxyz '
+NON_RX_STAGES = ('frame_generator_TX', 'signal_generator', 'channel')
+
+
+def random_text(number_of_characters, seed=0):
+    rng = default_rng(seed)
+    return ''.join(
+        rng.choice(list(MESSAGE_CHARACTERS), number_of_characters))
+
+
+class StageRecorder:
+    """
+    Collect the wall time, processed samples and optionally the peak traced memory of stages.
+
+    Stages are either run through 'run', or timed with 'lap' like the 'StageTimer' of
+    'INSTRUMENTATION', in which case a stage lasts from the previous 'mark' or 'lap'.
+
+    Args:
+        trace_memory (bool): Record the peak memory allocated by each stage with 'tracemalloc'.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.mark()
+
+    def mark(self):
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            self._baseline = tracemalloc.get_traced_memory()[0]
+        self._start = perf_counter()
+
+    def lap(self, stage, samples=0):
+        wall_time = perf_counter() - self._start
+        unit = 'symbols' if stage in SYMBOL_STAGES else 'samples'
+        record = {'wall_time_s': wall_time, 'samples': samples, 'unit': unit}
+        if self.trace_memory:
+            record['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1] - self._baseline
+        self.stages[stage] = record
+        self.mark()
+
+    def run(self, name, samples, unit, function, *args, **kwargs):
+        self.mark()
+        result = function(*args, **kwargs)
+        self.lap(name, samples)
+        self.stages[name]['unit'] = unit
+        return result
+
+
+def transmit(recorder, radio, message):
+    my_frames, _, _, _ = recorder.run('frame_generator_TX', len(message),
+                                      'characters',
+                                      frame_generator_TX_preallocated,
+                                      data_length=DATA_LENGTH,
+                                      text_message=message,
+                                      header_type='barker13',
+                                      modulation_type='QAM4_2',
+                                      info=False)
+    my_signal = recorder.run('signal_generator', BUFFER_LENGTH_TX, 'samples',
+                             signal_generator_cached,
+                             symbol_frames=my_frames,
+                             buffer_len_TX=BUFFER_LENGTH_TX,
+                             oversampling_rate=OVERSAMPLING_RATE,
+                             half_number_of_symbols=HALF_NO_OF_SYMBOLS,
+                             beta=ROLLOFF_FACTOR,
+                             signal_or_symbols=1,
+                             visualize=False,
+                             print_data=False,
+                             dtype=PRECISION.complex_dtype)
+    radio.transmit_samples(my_signal[:BUFFER_LENGTH_TX])
+
+
+def receive(recorder, radio):
+    """
+    The stages of 'operation_RX', each one timed separately.
+
+    Returns:
+        tuple: Decoded message and the number of work arrays allocated by the call.
+    """
+    n = radio.rx_buffer_size
+    rx = recorder.run('channel', n, 'samples', radio.receive_samples)
+    allocations = work_buffers().allocations
+    recorder.mark()
+    quantized_symbols, correlation_indices, correlation_values = symbol_detection_RX(
+        rx, radio.sample_rate, False, recorder)
+    allocations = work_buffers().allocations - allocations
+    received_message = recorder.run('frame_generator_RX', len(quantized_symbols),
+                                    'symbols',
+                                    frame_generator_RX,
+                                    quantized_symbols=quantized_symbols,
+                                    correlation_indices=correlation_indices,
+                                    correlation_values=correlation_values,
+                                    single_frame_length=FRAME_LENGTH_SYMBOLS,
+                                    header='barker13',
+                                    modulation_type='QAM4_2')
+    message = recorder.run('message_handler', len(received_message), 'characters',
+                           message_handler, received_message,
+                           display_outputs=False)
+    return message, allocations
+
+
+def run_link(message, rx_buffer_size, snr_db, seed, trace_memory=False):
+    """
+    Send 'message' once over a fresh simulated link.
+
+    Only the RX chain may fail on a noisy buffer, an exception of the TX chain or the simulated
+    channel is raised.
+
+    Returns:
+        tuple: Stage records of 'StageRecorder', the decode result (bool), the number of work
+               arrays allocated by the RX call, None when the call raised, and the name of the
+               exception type raised by the RX call, None when it returned.
+    """
+    rng = default_rng(seed)
+    channel = SimulatedChannel(frequency_offset=FREQUENCY_OFFSET,
+                               phase_offset=rng.uniform(0, 2 * np.pi),
+                               timing_offset=rng.uniform(0, BUFFER_LENGTH_TX),
+                               snr_db=snr_db,
+                               gain=CHANNEL_GAIN,
+                               seed=seed)
+    radio = SimulatedRadio('benchmark', 'benchmark', channel=channel)
+    radio.sample_rate = SAMPLE_RATE
+    radio.rx_buffer_size = rx_buffer_size
+    recorder = StageRecorder(trace_memory)
+    if trace_memory:
+        tracemalloc.start()
+    allocations = None
+    error = None
+    try:
+        transmit(recorder, radio, message)
+        try:
+            received_message, allocations = receive(recorder, radio)
+            decoded = received_message == message
+        except Exception as exception:
+            # 'operation_RX' drops buffers which cannot be decoded, so does the benchmark
+            decoded = False
+            error = type(exception).__name__
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+    return recorder.stages, decoded, allocations, error
+
+
+def peak_rss(message, rx_buffer_size, snr_db, seed):
+    """
+    Run one trial and return the peak resident set size of the process in bytes.
+
+    Meant to run in a fresh process, the peak includes the interpreter and the imported modules.
+    """
+    run_link(message, rx_buffer_size, snr_db, seed)
+    # Linux reports kilobytes, macOS bytes
+    scale = 1 if platform.system() == 'Darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def summarize(trials, memory_stages):
+    # A trial stops at the stage which raised, stages are summarized over the trials reaching them
+    names = list(dict.fromkeys(name for trial in trials for name in trial))
+    stages = {}
+    for name in names:
+        records = [trial[name] for trial in trials if name in trial]
+        wall_time = median(record['wall_time_s'] for record in records)
+        samples = records[0]['samples']
+        stages[name] = {
+            'wall_time_s': wall_time,
+            'samples': samples,
+            'unit': records[0]['unit'],
+            'samples_per_s': samples / wall_time if wall_time > 0 else None,
+            'peak_memory_bytes': memory_stages.get(name, {}).get('peak_memory_bytes')
+        }
+    return stages
+
+
+def benchmark_link(message_lengths, buffer_sizes, snrs_db, number_of_trials,
+                   seed=0):
+    results = []
+    for message_length in message_lengths:
+        message = random_text(message_length, seed)
+        for rx_buffer_size in buffer_sizes:
+            for snr_db in snrs_db:
+                trials = []
+                decoded = 0
+                errors = Counter()
+                for trial in range(number_of_trials):
+                    stages, success, allocations, error = run_link(message, rx_buffer_size,
+                                                                   snr_db, seed + trial)
+                    trials.append(stages)
+                    decoded += success
+                    if error is not None:
+                        errors[error] += 1
+                memory_stages, _, _, _ = run_link(message, rx_buffer_size, snr_db,
+                                               seed, trace_memory=True)
+                with ProcessPoolExecutor(max_workers=1,
+                                         mp_context=get_context('spawn')) as executor:
+                    rss = executor.submit(peak_rss, message, rx_buffer_size, snr_db,
+                                          seed).result()
+                stages = summarize(trials, memory_stages)
+                rx_time = sum(stage['wall_time_s'] for name, stage in stages.items()
+                              if name not in NON_RX_STAGES)
+                results.append({
+                    'message_length': message_length,
+                    'rx_buffer_size': rx_buffer_size,
+                    'snr_db': snr_db,
+                    'trials': number_of_trials,
+                    'decode_rate': decoded / number_of_trials,
+                    'rx_errors': dict(errors),
+                    'rx_wall_time_s': rx_time,
+                    'rx_samples_per_s': rx_buffer_size / rx_time,
+                    'work_array_allocations_per_call': allocations,
+                    'peak_rss_bytes': rss,
+                    'stages': stages
+                })
+    return {
+        'metadata': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'seed': seed,
+            'sample_rate': SAMPLE_RATE,
+            'buffer_length_TX': BUFFER_LENGTH_TX,
+            'frequency_offset': FREQUENCY_OFFSET,
+            'channel_gain': CHANNEL_GAIN,
+            'precision': PRECISION.mode
+        },
+        'results': results
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description='End-to-end link benchmark on a simulated radio.')
+    parser.add_argument('--message-lengths', type=int, nargs='+', default=[16, 100, 400],
+                        help='Message lengths in characters.')
+    parser.add_argument('--buffer-sizes', type=int, nargs='+', default=[14, 16],
+                        help='RX buffer sizes as powers of two.')
+    parser.add_argument('--snr', type=float, nargs='+', default=[10, 20, 30],
+                        help='Channel SNR values in dB.')
+    parser.add_argument('--trials', type=int, default=3,
+                        help='Seeded trials per configuration.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None,
+                        help='JSON report file, printed to stdout when omitted.')
+    arguments = parser.parse_args()
+
+    report = benchmark_link(arguments.message_lengths,
+                            [int(2**size) for size in arguments.buffer_sizes],
+                            arguments.snr, arguments.trials, arguments.seed)
+    if arguments.output is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(arguments.output, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
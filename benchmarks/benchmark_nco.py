@@ -0,0 +1,55 @@
+from time import perf_counter
+from numpy import abs, arange, concatenate, exp, max, pi
+from numpy.random import default_rng
+from utils.nco import NCO
+"""
+    Compare the two 'np.exp' mixers of the former 'operation_RX' front end with one fused 'NCO'
+    mixer, and check the phase continuity of the NCO over a stream of buffers.
+
+    Run from the repository root:
+        python -m benchmarks.benchmark_nco
+"""
+
+SAMPLE_RATE = 10e6
+BAND_SHIFT_FREQUENCY = 2e6
+COARSE_FREQUENCY = 12345.6
+NUMBER_OF_BUFFERS = 16
+
+
+def exp_mixers(rx, coarse_frequency, fc, fs):
+    t = arange(len(rx)) / fs
+    coarse_baseband = rx * exp(-1j * 2 * pi * coarse_frequency * t)
+    return coarse_baseband * exp(1j * 2 * pi * fc * t)
+
+
+def benchmark_nco(buffer_sizes=(2**12, 2**14, 2**16, 2**18, 2**20), repeats=5):
+    rng = default_rng(0)
+    print(f'{"Samples":>8} {"np.exp (s)":>11} {"NCO (s)":>9} {"Speed-up":>9} {"Max error":>10}')
+    for n in buffer_sizes:
+        rx = rng.normal(size=n) + 1j * rng.normal(size=n)
+        start = perf_counter()
+        for _ in range(repeats):
+            reference = exp_mixers(rx, COARSE_FREQUENCY, BAND_SHIFT_FREQUENCY, SAMPLE_RATE)
+        exp_time = (perf_counter() - start) / repeats
+
+        nco = NCO(BAND_SHIFT_FREQUENCY - COARSE_FREQUENCY, SAMPLE_RATE)
+        out = rx.copy()
+        start = perf_counter()
+        for _ in range(repeats):
+            nco.reset()
+            nco.mix(rx, out=out)
+        nco_time = (perf_counter() - start) / repeats
+        error = max(abs(out - reference))
+        print(f'{n:8d} {exp_time:11.5f} {nco_time:9.5f} {exp_time / nco_time:8.1f}x {error:10.2e}')
+
+    # Buffers of a stream mixed one after the other equal one long mix
+    n = 2**16
+    stream = rng.normal(size=n * NUMBER_OF_BUFFERS) + 0j
+    nco = NCO(BAND_SHIFT_FREQUENCY - COARSE_FREQUENCY, SAMPLE_RATE)
+    mixed = concatenate([nco.mix(buffer) for buffer in stream.reshape(NUMBER_OF_BUFFERS, n)])
+    reference = exp_mixers(stream, COARSE_FREQUENCY, BAND_SHIFT_FREQUENCY, SAMPLE_RATE)
+    print(f'Stream of {NUMBER_OF_BUFFERS} buffers of {n}, max error = {max(abs(mixed - reference)):.2e}')
+
+
+if __name__ == "__main__":
+    benchmark_nco()
@@ -0,0 +1,125 @@
+import json
+import platform
+from argparse import ArgumentParser
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+import numpy as np
+from benchmarks.benchmark_link import random_text, run_link, peak_rss, summarize, \
+    NON_RX_STAGES, SAMPLE_RATE
+from utils.precision import PRECISION, PRECISION_MODES
+"""
+    Compare the 'double' and 'single' modes of 'PRECISION' on the simulated link of
+    'benchmark_link'.
+
+    Every configuration is run in both modes on the same seeded inputs. For each mode the decode
+    rate, the RX wall time, the wall time and peak traced memory of every stage and the peak RSS of
+    a process running one trial are reported. For each configuration the report adds the RX
+    speed-up and the ratios of the peak memories of 'single' over 'double', and whether both modes
+    decoded the same trials.
+
+    Run from the repository root:
+        python -m benchmarks.benchmark_precision --output precision.json
+        python -m benchmarks.benchmark_precision --buffer-sizes 16 18 --snr 10
+"""
+
+
+def peak_rss_in_mode(mode, message, rx_buffer_size, snr_db, seed):
+    PRECISION.set(mode)
+    return peak_rss(message, rx_buffer_size, snr_db, seed)
+
+
+def run_mode(mode, message, rx_buffer_size, snr_db, number_of_trials, seed):
+    PRECISION.set(mode)
+    trials = []
+    decoded = []
+    errors = Counter()
+    for trial in range(number_of_trials):
+        stages, success, _, error = run_link(message, rx_buffer_size, snr_db, seed + trial)
+        trials.append(stages)
+        decoded.append(success)
+        if error is not None:
+            errors[error] += 1
+    memory_stages, _, _, _ = run_link(message, rx_buffer_size, snr_db, seed,
+                                      trace_memory=True)
+    with ProcessPoolExecutor(max_workers=1,
+                             mp_context=get_context('spawn')) as executor:
+        rss = executor.submit(peak_rss_in_mode, mode, message, rx_buffer_size, snr_db,
+                              seed).result()
+    stages = summarize(trials, memory_stages)
+    rx_time = sum(stage['wall_time_s'] for name, stage in stages.items()
+                  if name not in NON_RX_STAGES)
+    peak_memory = max(stage['peak_memory_bytes'] or 0 for stage in stages.values())
+    return {
+        'decode_rate': sum(decoded) / number_of_trials,
+        'decoded_trials': decoded,
+        'rx_errors': dict(errors),
+        'rx_wall_time_s': rx_time,
+        'rx_samples_per_s': rx_buffer_size / rx_time,
+        'peak_stage_memory_bytes': peak_memory,
+        'peak_rss_bytes': rss,
+        'stages': stages
+    }
+
+
+def benchmark_precision(message_length, buffer_sizes, snrs_db, number_of_trials, seed=0):
+    message = random_text(message_length, seed)
+    results = []
+    try:
+        for rx_buffer_size in buffer_sizes:
+            for snr_db in snrs_db:
+                modes = {
+                    mode: run_mode(mode, message, rx_buffer_size, snr_db, number_of_trials,
+                                   seed)
+                    for mode in PRECISION_MODES
+                }
+                double, single = modes['double'], modes['single']
+                results.append({
+                    'rx_buffer_size': rx_buffer_size,
+                    'snr_db': snr_db,
+                    'trials': number_of_trials,
+                    'rx_speedup': double['rx_wall_time_s'] / single['rx_wall_time_s'],
+                    'peak_stage_memory_ratio': (single['peak_stage_memory_bytes'] /
+                                                double['peak_stage_memory_bytes']),
+                    'peak_rss_ratio': single['peak_rss_bytes'] / double['peak_rss_bytes'],
+                    'same_decoded_trials': double['decoded_trials'] == single['decoded_trials'],
+                    'modes': modes
+                })
+    finally:
+        PRECISION.set('double')
+    return {
+        'metadata': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'seed': seed,
+            'sample_rate': SAMPLE_RATE,
+            'message_length': message_length
+        },
+        'results': results
+    }
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description='Double and single precision on the simulated link.')
+    parser.add_argument('--message-length', type=int, default=100,
+                        help='Message length in characters.')
+    parser.add_argument('--buffer-sizes', type=int, nargs='+', default=[14, 16, 18],
+                        help='RX buffer sizes as powers of two.')
+    parser.add_argument('--snr', type=float, nargs='+', default=[10, 20],
+                        help='Channel SNR values in dB.')
+    parser.add_argument('--trials', type=int, default=3,
+                        help='Seeded trials per configuration.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default=None,
+                        help='JSON report file, printed to stdout when omitted.')
+    arguments = parser.parse_args()
+
+    report = benchmark_precision(arguments.message_length,
+                                 [int(2**size) for size in arguments.buffer_sizes],
+                                 arguments.snr, arguments.trials, arguments.seed)
+    if arguments.output is None:
+        print(json.dumps(report, indent=2))
+    else:
+        with open(arguments.output, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
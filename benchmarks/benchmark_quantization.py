@@ -0,0 +1,54 @@
+from time import perf_counter
+from numpy import array, array_equal
+from numpy.random import default_rng
+from receiver_module.quantization import quantalph_distance, quantalph_distance_vectorized
+"""
+    Compare 'quantalph_distance' and 'quantalph_distance_vectorized' on 10^6 noisy QAM4_2 symbols.
+
+    Run from the repository root:
+        python -m benchmarks.benchmark_quantization
+"""
+
+ALPHABET = array([1, 3])
+
+
+def noisy_qam4_2_symbols(number_of_symbols, noise_std=0.3, seed=0):
+    rng = default_rng(seed)
+    levels = 2 * rng.integers(0, 4, number_of_symbols) - 3
+    signs = rng.choice([1, -1], number_of_symbols)
+    symbols = levels * (1 + 1j) * signs
+    noise = rng.normal(0, noise_std, (2, number_of_symbols))
+    return symbols + noise[0] + 1j * noise[1]
+
+
+def benchmark_quantization(number_of_symbols=10**6, number_of_blocks=16):
+    symbols = noisy_qam4_2_symbols(number_of_symbols)
+
+    start = perf_counter()
+    reference, _ = quantalph_distance(symbols, ALPHABET)
+    loop_time = perf_counter() - start
+
+    start = perf_counter()
+    quantized, _ = quantalph_distance_vectorized(symbols, ALPHABET)
+    vectorized_time = perf_counter() - start
+
+    blocks = symbols.reshape(number_of_blocks, -1)
+    start = perf_counter()
+    quantized_blocks, _ = quantalph_distance_vectorized(blocks, ALPHABET)
+    batch_time = perf_counter() - start
+    batch_identical = all(
+        array_equal(quantized_blocks[i],
+                    quantalph_distance_vectorized(blocks[i], ALPHABET)[0])
+        for i in range(number_of_blocks))
+
+    print(f'Symbols                        = {number_of_symbols}')
+    print(f'quantalph_distance             = {loop_time:.4f} s, {number_of_symbols / loop_time:14.0f} symbols/s')
+    print(f'quantalph_distance_vectorized  = {vectorized_time:.4f} s, {number_of_symbols / vectorized_time:14.0f} symbols/s')
+    print(f'Batch of {number_of_blocks} blocks             = {batch_time:.4f} s, {number_of_symbols / batch_time:14.0f} symbols/s')
+    print(f'Speed-up                       = {loop_time / vectorized_time:.1f}x')
+    print(f'Identical output               = {array_equal(reference, quantized)}')
+    print(f'Batch matches per-block calls  = {batch_identical}')
+
+
+if __name__ == "__main__":
+    benchmark_quantization()
@@ -0,0 +1,108 @@
+from argparse import ArgumentParser
+import numpy as np
+from numpy.random import default_rng
+from benchmarks.benchmark_link import random_text, SAMPLE_RATE, CHANNEL_GAIN, FREQUENCY_OFFSET, \
+    BUFFER_LENGTH_TX
+from receiver_module.message_handler import ReassemblyStore
+from receiver_module.operation_RX import operation_RX
+from transmission_module.operation_TX import operation_TX
+from utils.simulated_radio import SimulatedRadio, SimulatedChannel
+"""
+    Decode long messages from small receive buffers with a persistent 'ReassemblyStore'.
+
+    For every trial, a random message of 'message_length' characters is sent in the cyclic TX
+    buffer of a simulated radio and received in consecutive buffers of 'rx_buffer_size' samples.
+    Every buffer is decoded by 'operation_RX' twice: on its own, as without a store, and with the
+    frames collected in a 'ReassemblyStore'. Reported are the size of one receive buffer, the rate
+    of buffers decoding the message on their own, the median number of buffers until the store
+    emits the message, the number of trials whose message is emitted, and the number of emitted
+    messages, which equals the number of trials when every repeat is suppressed. The PLL carrier
+    recovery is used to keep the run short.
+
+    A random payload may correlate with the Barker header. With the text frame format, the false
+    peak is skipped when it lies in the data of the frame before, see 'select_frame_peaks', and a
+    frame of a false peak at the start of a buffer may hide the frame after it. Binary frames of
+    false peaks are rejected by their CRC.
+
+    Run from the repository root:
+        python -m benchmarks.benchmark_reassembly
+        python -m benchmarks.benchmark_reassembly --message-length 2000 --buffer-sizes 14 15
+        python -m benchmarks.benchmark_reassembly --frame-format binary
+"""
+
+CARRIER_RECOVERY = 'pll'
+
+
+def receive_stream(message, rx_buffer_size, snr_db, number_of_buffers, seed, frame_format):
+    rng = default_rng(seed)
+    channel = SimulatedChannel(frequency_offset=FREQUENCY_OFFSET,
+                               phase_offset=rng.uniform(0, 2 * np.pi),
+                               timing_offset=rng.uniform(0, BUFFER_LENGTH_TX),
+                               snr_db=snr_db,
+                               gain=CHANNEL_GAIN,
+                               seed=seed)
+    radio = SimulatedRadio('benchmark', 'benchmark', channel=channel)
+    radio.sample_rate = SAMPLE_RATE
+    radio.rx_buffer_size = rx_buffer_size
+    operation_TX(radio, message, False, False, frame_format=frame_format)
+
+    store = ReassemblyStore()
+    single_buffer_decodes = 0
+    first_emission = None
+    emitted = []
+    for buffer in range(number_of_buffers):
+        samples = radio.receive_samples()
+        single_buffer_decodes += operation_RX(
+            radio, False, samples, carrier_recovery=CARRIER_RECOVERY,
+            frame_format=frame_format) == message
+        received = operation_RX(radio, False, samples, carrier_recovery=CARRIER_RECOVERY,
+                                reassembly_store=store, frame_format=frame_format)
+        if received is not None:
+            emitted.extend(received.split('\n'))
+            if first_emission is None:
+                first_emission = buffer + 1
+    return single_buffer_decodes, first_emission, emitted
+
+
+def benchmark_reassembly(message_length=1000, buffer_sizes=(2**14, 2**15, 2**16, 2**17),
+                         snr_db=20, number_of_buffers=16, trials=3, seed=0, frame_format='text'):
+    print(f'Messages of {message_length} characters, {number_of_buffers} buffers, '
+          f'SNR {snr_db} dB, {trials} trials, {frame_format} frames')
+    print(f'{"Buffer":>8} {"Buffer (kB)":>11} {"Single buffer":>13} {"Store after":>11} '
+          f'{"Decoded":>7} {"Emitted":>7}')
+    for rx_buffer_size in buffer_sizes:
+        single_buffer_decodes = 0
+        first_emissions = []
+        decoded = 0
+        emitted = 0
+        for trial in range(trials):
+            message = random_text(message_length, seed + trial)
+            single, first_emission, messages = receive_stream(
+                message, rx_buffer_size, snr_db, number_of_buffers, seed + trial, frame_format)
+            single_buffer_decodes += single
+            if first_emission is not None:
+                first_emissions.append(first_emission)
+            decoded += message in messages
+            emitted += len(messages)
+        buffer_kilobytes = rx_buffer_size * np.dtype(complex).itemsize / 1024
+        first = f'{np.median(first_emissions):.1f}' if first_emissions else '-'
+        print(f'{rx_buffer_size:8d} {buffer_kilobytes:11.0f} '
+              f'{single_buffer_decodes / (number_of_buffers * trials):13.2f} {first:>11} '
+              f'{decoded:3d}/{trials:<3d} {emitted:7d}')
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description='Benchmark the reassembly of long messages over buffers')
+    parser.add_argument('--message-length', type=int, default=1000)
+    parser.add_argument('--buffer-sizes', type=int, nargs='+', default=[14, 15, 16, 17],
+                        help='log2 of rx_buffer_size')
+    parser.add_argument('--snr', type=float, default=20)
+    parser.add_argument('--buffers', type=int, default=16)
+    parser.add_argument('--trials', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--frame-format', choices=['text', 'binary'], default='text')
+    arguments = parser.parse_args()
+    benchmark_reassembly(arguments.message_length,
+                         [2**size for size in arguments.buffer_sizes],
+                         arguments.snr, arguments.buffers, arguments.trials, arguments.seed,
+                         arguments.frame_format)
@@ -0,0 +1,51 @@
+from time import perf_counter
+from numpy import abs, max
+from transmission_module.signal_generator_TX import signal_generator, signal_generator_cached
+from transmission_module.frame_generator_TX import frame_generator_TX_preallocated
+from benchmarks.benchmark_symbol_conversion import random_message
+"""
+    Compare TX latency of 'signal_generator' and 'signal_generator_cached' for the buffer used by
+    'operation_TX'.
+
+    Run from the repository root:
+        python -m benchmarks.benchmark_signal_generator
+"""
+
+BUFFER_LENGTH_TX = int(2**18)
+OVERSAMPLING_RATE = 16
+HALF_NO_OF_SYMBOLS = 6
+ROLLOFF_FACTOR = 0.75
+MESSAGE_LENGTHS = [16, 400, 4096]
+
+
+def time_signal_generator(generator, symbol_frames):
+    start = perf_counter()
+    my_signal = generator(symbol_frames=symbol_frames,
+                          buffer_len_TX=BUFFER_LENGTH_TX,
+                          oversampling_rate=OVERSAMPLING_RATE,
+                          half_number_of_symbols=HALF_NO_OF_SYMBOLS,
+                          beta=ROLLOFF_FACTOR,
+                          signal_or_symbols=1,
+                          visualize=False,
+                          print_data=False)
+    return perf_counter() - start, my_signal[:BUFFER_LENGTH_TX]
+
+
+def benchmark_signal_generator():
+    transient = 2 * HALF_NO_OF_SYMBOLS * OVERSAMPLING_RATE
+    print(f'Buffer length = {BUFFER_LENGTH_TX}')
+    print(f'{"Characters":>10} {"Convolve (s)":>13} {"Cached (s)":>11} {"Speed-up":>9} {"Max diff":>10}')
+    for message_length in MESSAGE_LENGTHS:
+        symbol_frames = frame_generator_TX_preallocated(
+            80, random_message(message_length), 'barker13', 'QAM4_2',
+            False)[0]
+        convolve_time, reference = time_signal_generator(
+            signal_generator, symbol_frames)
+        cached_time, my_signal = time_signal_generator(signal_generator_cached,
+                                                       symbol_frames)
+        difference = max(abs(reference[transient:] - my_signal[transient:]))
+        print(f'{message_length:>10} {convolve_time:13.4f} {cached_time:11.4f} {convolve_time / cached_time:9.1f} {difference:10.2e}')
+
+
+if __name__ == "__main__":
+    benchmark_signal_generator()
@@ -0,0 +1,47 @@
+from time import perf_counter
+from numpy import array_equal
+from numpy.random import default_rng
+from utils.symbol_conversion import letters_to_pam, pam_to_letters, pam_to_qam4_2, qam4_2_to_pam, letters_to_pam_lut, pam_to_letters_lut, pam_to_qam4_2_lut, qam4_2_to_pam_lut
+"""
+    Compare the character/symbol loops of 'utils.symbol_conversion' with the table-driven codec
+    on a long chat message, TX direction (text to QAM4_2) and RX direction (QAM4_2 to text).
+
+    Run from the repository root:
+        python -m benchmarks.benchmark_symbol_conversion
+"""
+
+
+def random_message(number_of_characters, seed=0):
+    rng = default_rng(seed)
+    return ''.join(map(chr, rng.integers(32, 127, number_of_characters)))
+
+
+def time_round_trip(to_symbols, to_text, message):
+    start = perf_counter()
+    symbols = to_symbols(message)
+    tx_time = perf_counter() - start
+    start = perf_counter()
+    text = to_text(symbols)
+    rx_time = perf_counter() - start
+    return tx_time, rx_time, symbols, text
+
+
+def benchmark_symbol_conversion(number_of_characters=20000):
+    message = random_message(number_of_characters)
+    loop_tx, loop_rx, loop_symbols, loop_text = time_round_trip(
+        lambda text: pam_to_qam4_2(letters_to_pam(text)),
+        lambda symbols: pam_to_letters(qam4_2_to_pam(symbols)), message)
+    lut_tx, lut_rx, lut_symbols, lut_text = time_round_trip(
+        lambda text: pam_to_qam4_2_lut(letters_to_pam_lut(text)),
+        lambda symbols: pam_to_letters_lut(qam4_2_to_pam_lut(symbols)),
+        message)
+    print(f'Characters = {number_of_characters}')
+    print(f'{"":>8} {"Loop (s)":>10} {"Table (s)":>10} {"Speed-up":>9}')
+    print(f'{"TX":>8} {loop_tx:10.4f} {lut_tx:10.4f} {loop_tx / lut_tx:9.1f}')
+    print(f'{"RX":>8} {loop_rx:10.4f} {lut_rx:10.4f} {loop_rx / lut_rx:9.1f}')
+    print(f'Identical symbols = {array_equal(loop_symbols, lut_symbols)}')
+    print(f'Identical text    = {loop_text == lut_text == message}')
+
+
+if __name__ == "__main__":
+    benchmark_symbol_conversion()
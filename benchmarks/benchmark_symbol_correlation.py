@@ -0,0 +1,46 @@
+from time import perf_counter
+from numpy import resize, array_equal
+from receiver_module.symbol_correlation import symbol_correlation, symbol_correlation_vectorized
+from transmission_module.frame_generator_TX import frame_generator_TX_preallocated
+from benchmarks.benchmark_symbol_conversion import random_message
+"""
+    Compare 'symbol_correlation' and 'symbol_correlation_vectorized' on cyclic QAM4_2 frame
+    streams. 'symbol_correlation' is only run while the stream holds fewer than 80 peaks.
+
+    Run from the repository root:
+        python -m benchmarks.benchmark_symbol_correlation
+"""
+
+TRIGGER = 80
+HEADER_LENGTH = 13
+SYMBOL_LENGTHS = [2**10, 2**12, 2**16, 2**20]
+
+
+def time_correlation(correlation, symbols):
+    start = perf_counter()
+    correlation_indices, _ = correlation(symbols=symbols,
+                                         modulation_type='QAM4_2',
+                                         trigger=TRIGGER,
+                                         header_length=HEADER_LENGTH,
+                                         visualize=False)
+    return perf_counter() - start, correlation_indices
+
+
+def benchmark_symbol_correlation():
+    frames = frame_generator_TX_preallocated(80, random_message(400),
+                                             'barker13', 'QAM4_2', False)[0]
+    print(f'{"Symbols":>8} {"Peaks":>6} {"Loop (s)":>9} {"Vectorized (s)":>15} {"Speed-up":>9} {"Identical":>10}')
+    for number_of_symbols in SYMBOL_LENGTHS:
+        symbols = resize(frames, number_of_symbols)
+        vectorized_time, correlation_indices = time_correlation(
+            symbol_correlation_vectorized, symbols)
+        if len(correlation_indices) < TRIGGER:
+            loop_time, reference = time_correlation(symbol_correlation,
+                                                    symbols)
+            print(f'{number_of_symbols:>8} {len(correlation_indices):>6} {loop_time:9.4f} {vectorized_time:15.4f} {loop_time / vectorized_time:9.1f} {str(array_equal(reference, correlation_indices)):>10}')
+        else:
+            print(f'{number_of_symbols:>8} {len(correlation_indices):>6} {"-":>9} {vectorized_time:15.4f} {"-":>9} {"-":>10}')
+
+
+if __name__ == "__main__":
+    benchmark_symbol_correlation()
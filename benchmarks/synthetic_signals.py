@@ -0,0 +1,97 @@
+from numpy import abs, arange, exp, max, pi, real, zeros
+from numpy.random import default_rng
+from scipy.signal import convolve
+from utils.pulse_shape import srrc
+from utils.oversample import oversample
+from utils.symbol_conversion import pam_to_qam4_2
+"""
+    Reproducible synthetic signals shared by the benchmark scripts.
+
+    Every generator takes a 'seed' so that repeated runs, and runs on different commits, process
+    exactly the same samples.
+"""
+
+
+def random_qam4_2_symbols(number_of_symbols, seed=0):
+    """
+    Generate random QAM4_2 symbols.
+
+    Args:
+        number_of_symbols (int): Number of symbols to generate.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        symbols(numpy.ndarray): Complex QAM4_2 symbols.
+    """
+    rng = default_rng(seed)
+    symbols_PAM = 2 * rng.integers(0, 4, number_of_symbols) - 3
+    return pam_to_qam4_2(symbols_PAM)
+
+
+def qam4_2_baseband(number_of_samples, oversampling_factor=16,
+                    half_number_of_symbols=6, beta=0.75, seed=0):
+    """
+    Generate an SRRC pulse shaped QAM4_2 baseband signal.
+
+    Args:
+        number_of_samples (int): Length of the generated signal.
+        oversampling_factor (int): Number of samples in one symbol.
+        half_number_of_symbols (int): Number of symbols in half length of SRRC Pulse.
+        beta (float): Roll-off factor of SRRC Pulse.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        baseband(numpy.ndarray): Complex baseband signal with 'number_of_samples' samples.
+    """
+    number_of_symbols = number_of_samples // oversampling_factor + 1
+    symbols = random_qam4_2_symbols(number_of_symbols, seed)
+    pulse = srrc(half_number_of_symbols, beta, oversampling_factor)
+    baseband = zeros(number_of_symbols * oversampling_factor, dtype=complex)
+    baseband.real = convolve(oversample(real(symbols), oversampling_factor),
+                             pulse, 'same')
+    baseband.imag = convolve(oversample(symbols.imag, oversampling_factor),
+                             pulse, 'same')
+    return baseband[:number_of_samples]
+
+
+def costas_loop_input(number_of_samples, fs=10e6, fc=2e6, phase_offset=0.3,
+                      amplitude=0.5, seed=0):
+    """
+    Generate the real band-shifted signal 'operation_RX' passes into the Costas loop.
+
+    Args:
+        number_of_samples (int): Length of the generated signal.
+        fs (float): Sampling frequency.
+        fc (float): Frequency the baseband signal is shifted to.
+        phase_offset (float): Carrier phase offset in radians.
+        amplitude (float): Peak amplitude of the generated signal.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        signal(numpy.ndarray): Real valued band-shifted QAM4_2 signal.
+    """
+    baseband = qam4_2_baseband(number_of_samples, seed=seed)
+    t = arange(number_of_samples) / fs
+    shifted = real(baseband * exp(1j * (2 * pi * fc * t + phase_offset)))
+    return amplitude * shifted / max(abs(shifted))
+
+
+def matched_filtered_qam4_2(number_of_samples, oversampling_factor=16,
+                            half_number_of_symbols=6, beta=0.75, seed=0):
+    """
+    Generate the matched filtered QAM4_2 baseband signal 'operation_RX' passes into clock recovery.
+
+    Args:
+        number_of_samples (int): Length of the generated signal.
+        oversampling_factor (int): Number of samples in one symbol.
+        half_number_of_symbols (int): Number of symbols in half length of SRRC Pulse.
+        beta (float): Roll-off factor of SRRC Pulse.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        matched_filtered(numpy.ndarray): Complex matched filtered baseband signal.
+    """
+    baseband = qam4_2_baseband(number_of_samples, oversampling_factor,
+                               half_number_of_symbols, beta, seed)
+    pulse = srrc(half_number_of_symbols, beta, oversampling_factor)
+    return convolve(baseband, pulse, 'same') * max(pulse)
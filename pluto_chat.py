@@ -1,8 +1,9 @@
 import threading
-import time
 from utils.my_radio import MyRadio
 from transmission_module.operation_TX import operation_TX
 from receiver_module.operation_RX import operation_RX
+from receiver_module.message_handler import ReassemblyStore
+from utils.rx_capture import RXCapture
 import queue
 
 MHZ = int(1e6)
@@ -11,7 +12,7 @@ MHZ = int(1e6)
 # Function to transmit the message
 def transmit_message(message, mySDR):
     msg = message
-    operation_TX(mySDR, msg, False, False)
+    operation_TX(mySDR, msg, False, False, frame_format='binary')
 
 
 # Function to handle user input
@@ -33,15 +34,33 @@ def input_and_transmit(input_queue, exit_event, mySDR):
             pass
 
 
-# Function to print a message every second
+# Function to print received messages, buffers are captured in the background
 def print_message(exit_event, mySDR):
-    while not exit_event.is_set():
-        receivedMessage = operation_RX(mySDR, False)
-        if receivedMessage == None:
-            pass
-        else:
-            print(f'user: {receivedMessage}')
-        time.sleep(1)
+    capture = RXCapture(mySDR)
+    # Frames are collected over buffers, every message is printed once
+    store = ReassemblyStore()
+    capture.start()
+    try:
+        while not exit_event.is_set():
+            try:
+                sequence, samples = capture.get(timeout=1)
+            except queue.Empty:
+                continue
+            try:
+                receivedMessage = operation_RX(mySDR, False, samples,
+                                               reassembly_store=store, frame_format='binary')
+            except Exception as error:
+                # e.g. clock recovery on a noise-only buffer, the next buffer is decoded
+                print(f'Receive error: {error!r}')
+                continue
+            finally:
+                capture.release(sequence)
+            if receivedMessage == None:
+                pass
+            else:
+                print(f'user: {receivedMessage}')
+    finally:
+        capture.stop()
 
 
 # Function to add a radio
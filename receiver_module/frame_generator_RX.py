@@ -1,6 +1,8 @@
-from numpy import real, imag, sign
-from utils.symbol_conversion import pam_to_letters, qam_to_pam, qam4_2_to_pam
+from numpy import arange, empty, flatnonzero, imag, maximum, minimum, real, sign, unique
+from utils.symbol_conversion import pam_to_bytes_lut, pam_to_letters_lut, qam_to_pam_lut, qam4_2_to_pam_lut
 from utils.barker_generator import barker_generator
+from utils.frame_header import unpack_frame
+from utils.fec import FEC_CODES, FEC_FIELD_LENGTH, coded_length, detect_fec, fec_decode
 
 ### FUNCTION DESCRIPTION
 """ 
@@ -55,10 +57,208 @@ def frame_generator_RX(quantized_symbols, correlation_indices,
             quantized_symbols[starting_index_imag:end_index_imag]) * value_imag
         symbols = symbols_real + 1j * symbols_imag
         if mod_type == '4QAM':
-            msg = pam_to_letters(qam_to_pam(symbols))
+            msg = pam_to_letters_lut(qam_to_pam_lut(symbols))
         elif mod_type == 'QAM4_2':
-            msg = pam_to_letters(qam4_2_to_pam(symbols))
+            msg = pam_to_letters_lut(qam4_2_to_pam_lut(symbols))
         else:
-            msg = pam_to_letters(symbols)
+            msg = pam_to_letters_lut(real(symbols))
         my_msg += msg
     return my_msg
+
+
+def frame_windows(quantized_symbols, correlation_indices, correlation_values, data_length):
+    """
+    Gather the symbols following every correlation peak into one 2-D array.
+
+    The real and imaginary symbols of all frames are read with one fancy index each, from their
+    own peak index, and the phase ambiguity is removed by broadcasting the signs of the
+    correlation values over the rows.
+
+    Args:
+        quantized_symbols (numpy.ndarray): Quantized symbols received from the communication channel.
+        correlation_indices (numpy.ndarray): Indices of correlation peaks in the received signal.
+        correlation_values (numpy.ndarray): Values of correlation peaks in the received signal.
+        data_length (int): Number of symbols of a frame after its header.
+
+    Returns:
+        tuple: A tuple containing:
+        windows (numpy.ndarray): (number_of_frames, data_length) array of frame symbols.
+        peaks (numpy.ndarray):   Positions in 'correlation_indices' of the peaks whose frame lies
+                                 completely in 'quantized_symbols', one per row of 'windows'.
+    """
+    starts_real = real(correlation_indices).astype(int) + 1
+    starts_imag = imag(correlation_indices).astype(int) + 1
+    peaks = flatnonzero(maximum(starts_real, starts_imag) + data_length <= len(quantized_symbols))
+    offsets = arange(data_length)
+    windows = empty((len(peaks), data_length), dtype=complex)
+    windows.real = real(quantized_symbols)[starts_real[peaks, None] + offsets]
+    windows.real *= sign(real(correlation_values[peaks]))[:, None]
+    windows.imag = imag(quantized_symbols)[starts_imag[peaks, None] + offsets]
+    windows.imag *= sign(imag(correlation_values[peaks]))[:, None]
+    return windows, peaks
+
+
+def select_frame_peaks(correlation_indices, data_length, number_of_symbols):
+    """
+    Select the correlation peaks which start a complete frame outside of the previous frame.
+
+    A peak whose header starts inside the data of the previously selected frame is a correlation
+    of the header with payload symbols and is skipped, and the selection stops at the first
+    frame which does not lie completely in the symbols.
+
+    Args:
+        correlation_indices (numpy.ndarray): Indices of correlation peaks in the received signal.
+        data_length (int): Number of symbols of a frame after its header.
+        number_of_symbols (int): Number of quantized symbols.
+
+    Returns:
+        tuple: A tuple containing:
+        peaks (list):       Positions of the selected peaks in 'correlation_indices'.
+        decoded_end (int):  Index of the symbol after the last selected frame, 0 without frames.
+    """
+    first_indices = minimum(real(correlation_indices), imag(correlation_indices)).astype(int)
+    last_indices = maximum(real(correlation_indices), imag(correlation_indices)).astype(int)
+    peaks = []
+    decoded_end = 0
+    for idx, (first_index, last_index) in enumerate(zip(first_indices.tolist(),
+                                                        last_indices.tolist())):
+        if first_index + 1 < decoded_end:
+            continue
+        if last_index + 1 + data_length > number_of_symbols:
+            break
+        peaks.append(idx)
+        decoded_end = last_index + 1 + data_length
+    return peaks, decoded_end
+
+
+def frame_windows_to_pam(windows, modulation_type):
+    """
+    Convert the frame windows of 'frame_windows' into PAM symbols with one codec call.
+
+    Returns:
+        numpy.ndarray: PAM symbols of the same shape as 'windows'.
+    """
+    symbols = windows.ravel()
+    if modulation_type == '4QAM':
+        symbols_PAM = qam_to_pam_lut(symbols)
+    elif modulation_type == 'QAM4_2':
+        symbols_PAM = qam4_2_to_pam_lut(symbols)
+    else:
+        symbols_PAM = real(symbols)
+    return symbols_PAM.reshape(windows.shape)
+
+
+def frame_pam_to_bytes(symbols_PAM):
+    """
+    Convert the PAM symbols of every frame, one frame per row, into bytes with one codec call.
+
+    Returns:
+        list: Bytes of every frame, symbols_PAM.shape[1] // 4 bytes each.
+    """
+    number_of_frames, data_length = symbols_PAM.shape
+    frame_bytes_length = data_length // 4
+    decoded = pam_to_bytes_lut(symbols_PAM[:, :4 * frame_bytes_length].ravel())
+    return [decoded[row * frame_bytes_length:(row + 1) * frame_bytes_length]
+            for row in range(number_of_frames)]
+
+
+def frame_windows_to_bytes(windows, modulation_type):
+    """
+    Convert the frame windows of 'frame_windows' into bytes with one codec call.
+
+    Returns:
+        list: Bytes of every frame, len(windows[0]) // 4 bytes each.
+    """
+    return frame_pam_to_bytes(frame_windows_to_pam(windows, modulation_type))
+
+
+def frame_generator_RX_batched(quantized_symbols, correlation_indices,
+                               correlation_values, single_frame_length, header,
+                               modulation_type):
+    """
+    Batched deframer returning one record per frame.
+
+    Every correlation peak is followed by one frame of 'single_frame_length' - header length
+    symbols, like the last frame of 'frame_generator_RX'. All frames are gathered at once by
+    'frame_windows' and decoded with one codec call, so the cost grows with the number of frames
+    instead of with string rebuilding. Frames are not cut at the next peak, so a false peak
+    inside a payload does not corrupt the frame around it.
+
+    Args:
+        quantized_symbols (numpy.ndarray): Quantized symbols received from the communication channel.
+        correlation_indices (numpy.ndarray): Indices of correlation peaks in the received signal.
+        correlation_values (numpy.ndarray): Values of correlation peaks in the received signal.
+        single_frame_length (int): Length of a single frame in symbols, header included.
+        header (str): Header used for frame synchronization.
+        modulation_type (str): Modulation type used for transmission ('4QAM', 'QAM4_2', etc.).
+
+    Returns:
+        list: (symbol_index, frame) tuples in reception order, with the index of the first
+              symbol of the header correlation peak, the smaller of the real and imaginary peak
+              indices, and the frame decoded as a Latin-1 string. Frames which do not lie
+              completely in 'quantized_symbols' are dropped. ''.join of the frames is the string
+              of 'frame_generator_RX' when the peaks are one frame apart.
+    """
+    header_len = len(barker_generator(header, modulation_type))
+    windows, peaks = frame_windows(quantized_symbols, correlation_indices, correlation_values,
+                                   single_frame_length - header_len)
+    first_indices = minimum(real(correlation_indices[peaks]),
+                            imag(correlation_indices[peaks])).astype(int).tolist()
+    frames = frame_windows_to_bytes(windows, modulation_type)
+    return [(index, frame.decode('latin-1')) for index, frame in zip(first_indices, frames)]
+
+
+def frame_generator_RX_binary(quantized_symbols, correlation_indices,
+                              correlation_values, data_length_with_header, header,
+                              modulation_type):
+    """
+    Deframer for the binary frame format of 'utils.frame_header'.
+
+    Every correlation peak is followed by the FEC field of 'utils.fec' and one coded frame of
+    'data_length_with_header' bytes. The phase ambiguity is removed with the signs of the
+    correlation values like in 'frame_generator_RX'. The code of every frame is detected from
+    its field, then the frames of each code are gathered by 'frame_windows' and decoded in one
+    batch, and a frame is kept when its CRC and header fields are valid. Frames are not cut at
+    the next peak, so a false peak inside a payload only adds one frame which fails the CRC, and
+    no string is built or parsed.
+
+    With QAM4_2, the PAM value of a symbol is the mean of its two axes, which carry the same
+    level, so a symbol with one wrong axis reaches the FEC decoder between two levels.
+
+    Args:
+        quantized_symbols (numpy.ndarray): Quantized symbols received from the communication channel.
+        correlation_indices (numpy.ndarray): Indices of correlation peaks in the received signal.
+        correlation_values (numpy.ndarray): Values of correlation peaks in the received signal.
+        data_length_with_header (int): Length of a frame in bytes, header and CRC included, as
+                                       returned by 'frame_generator_TX_binary'.
+        header (str): Header used for frame synchronization.
+        modulation_type (str): Modulation type used for transmission ('4QAM', 'QAM4_2', etc.).
+
+    Returns:
+        list: (sequence, total, payload) tuples of the valid frames in reception order.
+    """
+    fields, peaks = frame_windows(quantized_symbols, correlation_indices, correlation_values,
+                                  FEC_FIELD_LENGTH)
+    codes = detect_fec(_fec_input(fields, modulation_type))
+    records = []
+    for code in unique(codes):
+        fec = FEC_CODES[code]
+        code_peaks = peaks[codes == code]
+        windows, kept = frame_windows(quantized_symbols, correlation_indices[code_peaks],
+                                      correlation_values[code_peaks],
+                                      FEC_FIELD_LENGTH + coded_length(fec, data_length_with_header))
+        if fec == 'none':
+            frames = frame_windows_to_bytes(windows[:, FEC_FIELD_LENGTH:], modulation_type)
+        else:
+            frames = frame_pam_to_bytes(fec_decode(
+                _fec_input(windows[:, FEC_FIELD_LENGTH:], modulation_type), fec))
+        records.extend((peak, unpack_frame(frame))
+                       for peak, frame in zip(code_peaks[kept].tolist(), frames))
+    return [record for _, record in sorted(records, key=lambda item: item[0])
+            if record is not None]
+
+
+def _fec_input(windows, modulation_type):
+    if modulation_type == 'QAM4_2':
+        return (real(windows) + imag(windows)) / 2
+    return frame_windows_to_pam(windows, modulation_type)
@@ -1,133 +1,365 @@
-from numpy import array, append, zeros, hstack, flipud, isin, max, any
-from math import ceil
+from collections import Counter
+from time import monotonic
 """
-    Process received messages, extract headers and messages, and reconstruct the complete message.
+    Reassemble the text message from the frames decoded by 'frame_generator_RX'.
+
+    Every frame of 'frame_generator_TX' reads '0X' + ID + text + '0X' + ID, where the ID is the
+    frame number as two hexadecimal digits, and the last frame is padded after its suffix with the
+    start of 'FRAME_FILLER'. Frames of the binary format of 'utils.frame_header' are added as
+    records, with their sequence number as ID. The TX buffer is cyclic, so one capture holds a
+    frame zero, one or several times, text frames partly corrupted by symbol errors.
+"""
+
+FRAME_ID_PREFIX = '0X'
+FRAME_ID_LENGTH = 2
+FRAME_FILLER = "ABCDEFGHIJKLMNOPQRSTUVWXYZ01234567890ABCDEFGHIJKLMNOPQRSTUVWXYZ01234567890ABCDEFGHIJKLMNOPQRSTUVWXYZ01234567890ABCDEFGHIJKLMNOPQRSTUVWXYZ01234567890"
+HEX_DIGITS = frozenset('0123456789ABCDEF')
+
+
+def parse_frames(received_message):
+    """
+    Extract the frames of a decoded string in one pass.
+
+    After splitting at '0X', a frame is a part made of an ID and the text, followed by a part
+    made of the same ID and, for the last frame, the start of the filler. The last frame of a
+    message whose length is a multiple of the data length is empty, its ID part is kept when the
+    filler follows. Parts which do not follow this pattern, e.g. frames cut at the buffer edges or
+    with a corrupted ID, are skipped.
+
+    A frame is known to be the last frame of its message when filler follows its suffix, or when
+    it is directly followed by frame 0, i.e. the cyclic TX buffer starts the message again.
 
     Args:
-        received_message (str): Received message as a string.
-        display_outputs (bool): Flag to display intermediate outputs.
+        received_message (str): Concatenated frames as returned by 'frame_generator_RX'.
 
     Returns:
-    message_output(str): Reconstructed complete message.
+        list: (frame_id, text, is_last) tuples in reception order.
     """
+    parts = received_message.split(FRAME_ID_PREFIX)
+    frames = []
+    previous_part = None
+    for index, (part, next_part) in enumerate(zip(parts, parts[1:])):
+        frame_id = part[:FRAME_ID_LENGTH]
+        is_last = len(next_part) > FRAME_ID_LENGTH
+        if ((len(part) > FRAME_ID_LENGTH or is_last) and len(frame_id) == FRAME_ID_LENGTH
+                and HEX_DIGITS.issuperset(frame_id)
+                and next_part[:FRAME_ID_LENGTH] == frame_id
+                and FRAME_FILLER.startswith(next_part[FRAME_ID_LENGTH:])):
+            frame_id = int(frame_id, 16)
+            if frame_id == 0 and previous_part == index - 2:
+                previous_id, previous_text, _ = frames[-1]
+                frames[-1] = (previous_id, previous_text, True)
+            frames.append((frame_id, part[FRAME_ID_LENGTH:], is_last))
+            previous_part = index
+    return frames
 
-FRAME_FILLER = "00ABCDEFGHIJKLMNOPQRSTUVWXYZ01234567890ABCDEFGHIJKLMNOPQRSTUVWXYZ01234567890ABCDEFGHIJKLMNOPQRSTUVWXYZ01234567890ABCDEFGHIJKLMNOPQRSTUVWXYZ01234567890"
 
+def binary_frames(records):
+    """
+    (frame_id, text, is_last, total) tuples of binary frame records, the payload as Latin-1 text.
+    """
+    return [(sequence, payload.decode('latin-1'), False, total)
+            for sequence, total, payload in records]
 
-def message_handler(received_message, display_outputs: bool):
 
-    split_array = received_message.split('0X')
-    id_array = array([], dtype=int)
-    frame_array = array([], dtype=str)
-    id_and_substrings = array([], dtype=tuple)
-    equal_flag = False
-
-    for idx in range(len(split_array)):
-        if (idx <= len(split_array) - 2) and (split_array[idx] != ''):
-            if (split_array[idx][:2] == split_array[idx + 1][:2]) and (
-                    not (split_array[idx] in FRAME_FILLER)):
-                substring = split_array[idx]
-                frame_array = append(frame_array, substring)
-            else:
-                pass
-                
-
-    for idx in range(len(frame_array)):
-        if idx != len(frame_array) - 1:
-            current_substring = frame_array[idx]
-            next_substring = frame_array[idx + 1]
-            try:
-                current_id = int("0X" + current_substring[:2], 16)
-            except:
-                continue
-            else:
-                next_id = int("0X" + next_substring[:2], 16)
-            if not equal_flag:
-                if current_id != next_id:
-                    id_array = append(id_array, current_id)
-                    trimmed_string = current_substring[2:]
-                    id_and_substrings = append(
-                        id_and_substrings, tuple([current_id, trimmed_string]))
-                else:
-                    equal_flag = True
-            else:
-                previous_substring = frame_array[idx - 1]
-                try:
-                    previous_id = int("0X" + previous_substring[:2], 16)
-                except:
-                    continue
-                else:
-                    id_array = append(id_array, previous_id)
-                    trimmed_prev_string = previous_substring[2:]
-                    id_and_substrings = append(
-                        id_and_substrings,
-                        tuple([previous_id, trimmed_prev_string]))
-                    equal_flag = False
-        else:
-            if not equal_flag:
-                current_substring = frame_array[idx]
-                try:
-                    current_id = int("0X" + current_substring[:2], 16)
-                except:
-                    continue
-                else:
-                    id_array = append(id_array, current_id)
-                    trimmed_string = current_substring[2:]
-                    id_and_substrings = append(
-                        id_and_substrings, tuple([current_id, trimmed_string]))
-            else:
-                current_substring = frame_array[idx - 1]
-                try:
-                    current_id = int("0X" + current_substring[:2], 16)
-                except:
-                    continue
-                else:
-                    id_array = append(id_array, current_id)
-                    trimmed_string = current_substring[2:]
-                    id_and_substrings = append(
-                        id_and_substrings, tuple([current_id, trimmed_string]))
-
-    max_id = max(id_array)
-    id_and_substrings_len = len(id_and_substrings)
-    storage_matrix_columns = max_id + 1
-    storage_matrix_rows = ceil(
-        id_and_substrings_len / 2 / storage_matrix_columns) + 1
-    message_storage_matrix = zeros(
-        (storage_matrix_rows, storage_matrix_columns), dtype=object)
-    row_counter = 0
-    for i in range(0, id_and_substrings_len - 1, 2):
-        prefix = int(id_and_substrings[i])
-        if i != id_and_substrings_len - 2:
-            next_prefix = int(id_and_substrings[i + 2])
+class MessageReassembler:
+    """
+    Reassembly buffer collecting frame texts by frame ID.
+
+    Each ID keeps a count of the texts received for it, so that copies of a frame from the cyclic
+    TX buffer are resolved by majority vote, the first received text winning a tie. The message
+    is complete as soon as every ID from 0 to the last ID is present. The last ID is the most
+    often received ID of a last frame, see 'parse_frames', or the total of a binary frame minus
+    one, so a message is never complete before a last frame has been received. Adding a frame
+    costs two dictionary updates, so reassembly is linear in the number of received frames.
+
+    Example:
+        reassembler = MessageReassembler()
+        reassembler.add_message(received_message)
+        if reassembler.is_complete:
+            print(reassembler.message())
         else:
-            next_prefix = prefix
-        text_part = id_and_substrings[i + 1]
-
-        if prefix <= max_id:
-            message_storage_matrix[row_counter, prefix] = text_part
-            if (prefix == max_id) or (abs(next_prefix - prefix) > 1):
-                row_counter += 1
-
-    final_message = zeros(max_id + 1, dtype=object)
-    flipped_storage_matrix = flipud(message_storage_matrix)
-    row_text_vector = hstack(flipped_storage_matrix)
-    row_vector_len = len(row_text_vector)
-    message_part_counter = 0
-    for i in range(row_vector_len):
-        message_partition = row_text_vector[i]
-        if (not any(isin(final_message, message_partition))) and (
-                message_part_counter <= max_id) and (
-                    message_partition != '0') and (not (message_partition[:5]
-                                                        in FRAME_FILLER)):
-            final_message[message_part_counter] = str(message_partition)
-            message_part_counter += 1
+            print(f'Missing frames {reassembler.missing_ids()}')
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def __repr__(self):
+        return (f'MessageReassembler(frames={len(self._fragments)}, last_id={self.last_id}, '
+                f'missing={self.missing_ids()})')
+
+    def __len__(self):
+        return len(self._fragments)
+
+    def __contains__(self, frame_id):
+        return frame_id in self._fragments
+
+    @property
+    def max_id(self):
+        """
+        Largest received frame ID, None before the first frame.
+        """
+        return self._max_id
+
+    @property
+    def last_id(self):
+        """
+        ID of the last frame of the message, None until a last frame has been received.
+        """
+        return self._last_ids.most_common(1)[0][0] if self._last_ids else None
+
+    @property
+    def is_complete(self):
+        last_id = self.last_id
+        return last_id is not None and all(
+            frame_id in self._fragments for frame_id in range(last_id + 1))
+
+    def add(self, frame_id, text, is_last=False, total=None):
+        """
+        Add the text of one received frame.
+
+        Args:
+            frame_id (int): ID of the frame.
+            text (str): Text of the frame.
+            is_last (bool): Flag indicating that the frame is the last frame of the message.
+            total (int, optional): Number of frames of the message, carried by binary frames.
+        """
+        self._fragments.setdefault(frame_id, Counter())[text] += 1
+        if self._max_id is None or frame_id > self._max_id:
+            self._max_id = frame_id
+        if is_last:
+            self._last_ids[frame_id] += 1
+        if total is not None:
+            self._last_ids[total - 1] += 1
+
+    def add_message(self, received_message):
+        """
+        Add every frame of a string decoded by 'frame_generator_RX'.
+
+        Returns:
+            int: Number of frames found in 'received_message'.
+        """
+        frames = parse_frames(received_message)
+        for frame_id, text, is_last in frames:
+            self.add(frame_id, text, is_last)
+        return len(frames)
+
+    def add_records(self, records):
+        """
+        Add the binary frames returned by 'frame_generator_RX_binary'.
+
+        Returns:
+            int: Number of records.
+        """
+        for frame_id, text, is_last, total in binary_frames(records):
+            self.add(frame_id, text, is_last, total)
+        return len(records)
+
+    def missing_ids(self):
+        """
+        IDs up to the last ID without any received frame, up to the largest received ID while
+        the last ID is unknown.
+        """
+        final_id = self._final_id()
+        if final_id is None:
+            return []
+        return [frame_id for frame_id in range(final_id + 1)
+                if frame_id not in self._fragments]
+
+    def text(self, frame_id):
+        """
+        Majority text of a frame, None if the frame has not been received.
+        """
+        votes = self._fragments.get(frame_id)
+        return votes.most_common(1)[0][0] if votes else None
+
+    def message(self):
+        """
+        Reassembled message, None while frames are missing.
+        """
+        if not self.is_complete:
+            return None
+        return ''.join(self.text(frame_id) for frame_id in range(self._final_id() + 1))
+
+    def clear(self):
+        self._fragments = {}
+        self._last_ids = Counter()
+        self._max_id = None
+
+    def _final_id(self):
+        return self.last_id if self._last_ids else self._max_id
+
+
+class _Session:
+    # Frames of the message in reception and the time it last gained a new ID, frame texts of
+    # the last emitted message and of the last partial message cleared without progress, and
+    # messages emitted recently, by their emission time
+
+    def __init__(self, now):
+        self.reassembler = MessageReassembler()
+        self.updated = now
+        self.progress = now
+        self.last_frames = {}
+        self.stale_frames = {}
+        self.emitted = {}
+
+
+class ReassemblyStore:
+    """
+    Persistent reassembly of messages from frames received over many buffers.
+
+    A capture of 'rx_buffer_size' samples only holds a few frames, so a long message is collected
+    over several calls of 'operation_RX'. The store keeps one 'MessageReassembler' per session,
+    e.g. per peer radio. A message is complete once its last ID is known, from the total of any
+    binary frame or from a last text frame, see 'parse_frames', and all frames up to it have been
+    received. It is then emitted and the reassembler is cleared for the next message. The cyclic TX
+    buffer repeats the message until a new one is sent, so a message is emitted once. Frames equal
+    to those of the last emitted message are skipped while no other frame has started a new
+    message, so repeats do not mix into the next message, and a message completed again less than
+    'timeout' seconds after it was emitted is dropped.
+
+    A partial message which gained no new frame ID for 'timeout' seconds, e.g. because one of its
+    frames is never received, is cleared, and so is a partial message when a frame disagrees with
+    its last ID or a binary frame differs from the partial one, i.e. a frame of the next message,
+    so a lost frame does not hold up the messages after it. Sessions that received no frame for
+    'timeout' seconds are evicted with their partial message, so the memory of the store is bounded
+    by the number of active sessions.
+
+    Args:
+        timeout (float): Seconds without frames after which a session is evicted.
+        clock (callable): Function returning the current time in seconds.
+
+    Example:
+        store = ReassemblyStore()
+        while True:
+            for message in store.add(frame_generator_RX(...)):
+                print(message)
+    """
+
+    DEFAULT_SESSION = 'default'
+
+    def __init__(self, timeout: float = 30.0, clock=monotonic):
+        self.timeout = timeout
+        self._clock = clock
+        self._sessions = {}
+
+    def __repr__(self):
+        return f'ReassemblyStore(sessions={len(self._sessions)}, timeout={self.timeout})'
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def add(self, received_message, session=DEFAULT_SESSION):
+        """
+        Add the frames of a string decoded by 'frame_generator_RX'.
+
+        Args:
+            received_message (str): Concatenated frames of one buffer.
+            session (optional): Key of the session the frames belong to.
+
+        Returns:
+            list: Messages completed by these frames and not emitted before, in completion order.
+        """
+        return self._add([frame + (None,) for frame in parse_frames(received_message)],
+                         session)
+
+    def add_records(self, records, session=DEFAULT_SESSION):
+        """
+        Add the binary frames returned by 'frame_generator_RX_binary', see 'add'.
+        """
+        return self._add(binary_frames(records), session)
+
+    def _add(self, frames, session):
+        now = self._clock()
+        self.evict(now)
+        if not frames:
+            return []
+        state = self._sessions.get(session)
+        if state is None:
+            state = self._sessions[session] = _Session(now)
+        state.updated = now
+
+        completed = []
+        reassembler = state.reassembler
+        for frame_id, text, is_last, total in frames:
+            if not len(reassembler) and state.last_frames.get(frame_id) == text:
+                continue
+            if self._is_other_message(reassembler, frame_id, text, is_last, total):
+                reassembler.clear()
+            if frame_id not in reassembler and state.stale_frames.get(frame_id) != text:
+                state.progress = now
+            reassembler.add(frame_id, text, is_last, total)
+            if not reassembler.is_complete:
+                continue
+            message = reassembler.message()
+            state.last_frames = {
+                frame_id: reassembler.text(frame_id) for frame_id in range(reassembler.last_id + 1)
+            }
+            reassembler.clear()
+            state.stale_frames = {}
+            if message not in state.emitted:
+                completed.append(message)
+            state.emitted[message] = now
+        return completed
+
+    @staticmethod
+    def _is_other_message(reassembler, frame_id, text, is_last, total):
+        # A frame beyond or disagreeing with the known last ID, or a binary frame, whose text is
+        # protected by its CRC, with another text than the partial message
+        last_id = reassembler.last_id
+        if last_id is not None and (frame_id > last_id or (is_last and frame_id != last_id) or
+                                    (total is not None and total - 1 != last_id)):
+            return True
+        return total is not None and frame_id in reassembler and \
+            reassembler.text(frame_id) != text
+
+    def missing_ids(self, session=DEFAULT_SESSION):
+        """
+        Missing frame IDs of the message in reception, see 'MessageReassembler.missing_ids'.
+        """
+        state = self._sessions.get(session)
+        return state.reassembler.missing_ids() if state is not None else []
+
+    def evict(self, now=None):
+        """
+        Drop the sessions and emitted messages older than 'timeout', and the partial messages
+        which gained no new frame ID for 'timeout'.
+        """
+        now = self._clock() if now is None else now
+        for session, state in list(self._sessions.items()):
+            if now - state.updated > self.timeout:
+                del self._sessions[session]
+                continue
+            if now - state.progress > self.timeout and len(state.reassembler):
+                # Repeats of the cleared frames do not count as progress
+                reassembler = state.reassembler
+                state.stale_frames = {frame_id: reassembler.text(frame_id)
+                                      for frame_id in range(reassembler.max_id + 1)
+                                      if frame_id in reassembler}
+                reassembler.clear()
+            for message, emitted in list(state.emitted.items()):
+                if now - emitted > self.timeout:
+                    del state.emitted[message]
+
+    def clear(self):
+        self._sessions.clear()
+
+
+def message_handler(received_message, display_outputs: bool):
+    """
+    Reassemble the message of one decoded string.
+
+    Args:
+        received_message (str): Received message as a string.
+        display_outputs (bool): Flag to display intermediate outputs.
+
+    Returns:
+        message_output(str): Reconstructed complete message, None if frames are missing.
+    """
+    reassembler = MessageReassembler()
+    reassembler.add_message(received_message)
     if display_outputs:
-        print(f'splitArray:\n {split_array}')
-        print(f'frameArray:\n {frame_array}')
-        print(f'idAndText Array: \n {id_and_substrings}')
-        print(f'msgStorage Array: \n {message_storage_matrix}')
-        print(f'flippedArray: \n {flipped_storage_matrix}')
-        print(f'rowTextVector: \n {row_text_vector}')
-
-    message_output = "".join(final_message)
-    return message_output
+        print(f'Frames:\n {parse_frames(received_message)}')
+        print(f'Missing frame IDs:\n {reassembler.missing_ids()}')
+    return reassembler.message()
@@ -1,107 +1,258 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from utils.visualization import plot_spectrum, constellation_plot_with_threshold, sampling_visualize
-from utils.pulse_shape import srrc
-from scipy import signal
-from receiver_module.frame_generator_RX import frame_generator_RX
-from receiver_module.symbol_correlation import symbol_correlation
-from receiver_module.quantization import quantalph_distance
-from adaptive_algorithms.costas_loop import costas_loop_QAM
-from receiver_module.message_handler import message_handler
+from utils.pulse_shape import srrc_cached
+from receiver_module.frame_generator_RX import frame_generator_RX_batched, frame_generator_RX_binary, \
+    select_frame_peaks
+from receiver_module.symbol_correlation import symbol_correlation_vectorized
+from receiver_module.quantization import quantalph_distance_vectorized
+from adaptive_algorithms.costas_loop import costas_loop_QAM_ring_buffer
+from adaptive_algorithms.baseband_pll import baseband_pll_QAM4_2
+from receiver_module.message_handler import message_handler, MessageReassembler
+from utils.frame_header import DATA_LENGTH, FRAME_OVERHEAD
 from utils.maximum_frequency import maximum_frequency
-from adaptive_algorithms.costas_loop import costas_loop_QAM
-from adaptive_algorithms.clock_recovery import clock_recovery_OP_max
-from utils.my_radio import MyRadio
+from adaptive_algorithms.clock_recovery import clock_recovery_OP_max, clock_recovery_OP_max_IQ
+from utils.instrumentation import INSTRUMENTATION, NULL_STAGE_TIMER
+from utils.work_buffers import work_buffers
+from utils.nco import NCO
+from utils.fir_filter import OverlapSaveFilter
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    # 'adi' is only needed for real hardware, 'SimulatedRadio' runs without it
+    from utils.my_radio import MyRadio
 """
     Perform signal processing operations on received samples and extract messages.
 
     Args:
-        my_SDR (MyRadio): Custom software-defined radio object.
+        my_SDR (MyRadio): Custom software-defined radio object, or a SimulatedRadio.
         plot_graphs (bool): Flag to indicate whether to plot intermediate graphs.
+        samples (numpy.ndarray, optional): Received samples, e.g. a buffer of 'RXCapture'. Read
+                                           with 'my_SDR.receive_samples()' when None.
+        carrier_recovery (str): 'costas' for the band-shifted Costas loop, 'pll' for the
+                                fourth-power phase-locked loop at baseband.
+        reassembly_store (ReassemblyStore, optional): Store collecting the frames over successive
+                                                      calls. Without it, the message has to be
+                                                      complete in this buffer.
+        frame_format (str): 'text' for the '0X..' text IDs, 'binary' for the frame header with
+                            CRC of 'utils.frame_header', as sent by 'operation_TX'. The FEC of
+                            binary frames is detected from every frame.
 
     Returns:
-        str: Extracted and reconstructed message.
+        str: Extracted and reconstructed message. With 'reassembly_store', the messages completed
+             by this buffer and not returned before, separated by new lines, or None. None when
+             the frames of the buffer cannot be decoded.
     """
 
 
-def operation_RX(my_SDR: MyRadio, plot_graphs: bool):
+def operation_RX(my_SDR: 'MyRadio', plot_graphs: bool, samples=None,
+                 carrier_recovery='costas', reassembly_store=None, frame_format='text'):
+
+    HEADER_LENGTH = 13
+    FRAME_LENGTH_SYMBOLS = 365
+    BINARY_DATA_LENGTH_WITH_HEADER = DATA_LENGTH + FRAME_OVERHEAD
+    if frame_format not in ('text', 'binary'):
+        raise ValueError(f'Unknown frame format {frame_format!r}, expected '
+                         f"'text' or 'binary'")
+
+    # ++++++++++++++++++++++ RX +++++++++++++++++++++++++++
+
+    timer = INSTRUMENTATION.timer('operation_RX', my_SDR.rx_buffer_size)
+    rx = my_SDR.receive_samples() if samples is None else samples
+    timer.lap('receive_samples', len(rx))
+    quantized_symbols, correlation_indices, correlation_values = symbol_detection_RX(
+        rx, my_SDR.sample_rate, plot_graphs, timer, carrier_recovery)
+
+    # MESSAGE GENERATION
+    try:
+        if frame_format == 'binary':
+            records = frame_generator_RX_binary(
+                quantized_symbols=quantized_symbols,
+                correlation_indices=correlation_indices,
+                correlation_values=correlation_values,
+                data_length_with_header=BINARY_DATA_LENGTH_WITH_HEADER,
+                header='barker13',
+                modulation_type='QAM4_2')
+            timer.lap('frame_generator_RX', len(quantized_symbols))
+            if reassembly_store is None:
+                reassembler = MessageReassembler()
+                reassembler.add_records(records)
+                message_output = reassembler.message()
+            else:
+                message_output = '\n'.join(reassembly_store.add_records(records)) or None
+            timer.lap('message_handler', len(records))
+        else:
+            peaks, _ = select_frame_peaks(correlation_indices,
+                                          FRAME_LENGTH_SYMBOLS - HEADER_LENGTH,
+                                          len(quantized_symbols))
+            records = frame_generator_RX_batched(
+                quantized_symbols=quantized_symbols,
+                correlation_indices=correlation_indices[peaks],
+                correlation_values=correlation_values[peaks],
+                single_frame_length=FRAME_LENGTH_SYMBOLS,
+                header='barker13',
+                modulation_type='QAM4_2')
+            received_message = ''.join(frame for _, frame in records)
+            timer.lap('frame_generator_RX', len(quantized_symbols))
+            if reassembly_store is None:
+                message_output = message_handler(received_message,
+                                                 display_outputs=False)
+            else:
+                message_output = '\n'.join(reassembly_store.add(received_message)) or None
+            timer.lap('message_handler', len(received_message))
+        return message_output
+    except Exception:
+        # Frames which cannot be decoded drop the buffer, in both frame formats
+        return None
+    finally:
+        timer.finish()
+
+
+def symbol_detection_RX(rx, sampling_rate, plot_graphs: bool,
+                        timer=NULL_STAGE_TIMER, carrier_recovery='costas'):
+    """
+    Run the stages of 'operation_RX' from coarse frequency correction up to frame correlation.
+
+    The stages run in the precision of 'rx', complex64 samples stay complex64 up to the quantized
+    symbols. The mixer phase is accumulated in double precision in both cases.
+
+    Args:
+        rx (numpy.ndarray): Received samples.
+        sampling_rate (float): Sampling rate of 'rx'.
+        plot_graphs (bool): Flag to indicate whether to plot intermediate graphs.
+        timer (StageTimer, optional): Timer of 'INSTRUMENTATION' which records the stages.
+        carrier_recovery (str): 'costas' shifts the signal to fc and runs
+                                'costas_loop_QAM_ring_buffer' on the real part, 'pll' runs
+                                'baseband_pll_QAM4_2' on the complex baseband.
+
+    Returns:
+        tuple: Quantized symbols, correlation indices and correlation values, as expected by
+               'frame_generator_RX'.
+    """
 
     #Correlation
     TRIGGER = 80
     HEADER_LENGTH = 13
-    FRAME_LENGTH_SYMBOLS = 365
 
     #SRRC Generation
     OVERSAMPLING_RATE = 16
     HALF_NO_OF_SYMBOLS = 6
     ROLLOFF_FACTOR = 0.75
-    Ts = 1 / my_SDR.sample_rate
-    sampling_rate = my_SDR.sample_rate
-    pulse = srrc(syms=HALF_NO_OF_SYMBOLS,
-                 beta=ROLLOFF_FACTOR,
-                 P=OVERSAMPLING_RATE)
-
-    # ++++++++++++++++++++++ RX +++++++++++++++++++++++++++
-
-    rx = my_SDR.receive_samples()
-    t = np.arange(0, len(rx) * Ts, Ts)
+    #Carrier Recovery
+    PLL_LOOP_BANDWIDTH = 0.01
+    PLL_BLOCK_LENGTH = 16
+    #Clock Recovery
+    NUMBER_OF_PHASES = 256
+    JOINT_IQ_CLOCK_RECOVERY = True
+    Ts = 1 / sampling_rate
+    complex_dtype = np.promote_types(rx.dtype, np.complex64)
+    pulse = srrc_cached(syms=HALF_NO_OF_SYMBOLS,
+                        beta=ROLLOFF_FACTOR,
+                        P=OVERSAMPLING_RATE,
+                        dtype=np.finfo(complex_dtype).dtype)
+    # Full-length intermediate arrays are reused from call to call, stages write with 'out='
+    work = work_buffers()
+    n = len(rx)
 
     # COARSE FREQUENCY CORRECTION
-    r4th = rx**4
+    r4th = work.get('r4th', n, complex_dtype)
+    np.multiply(rx, rx, out=r4th)
+    np.multiply(r4th, r4th, out=r4th)
     coarse_frequency = (maximum_frequency(r4th, sampling_rate) / 4)
     # print(f'coarse1 = {coarseF}')
-    coarse_demodulated = np.exp(-1j * 2 * np.pi * coarse_frequency * t)
-    coarse_baseband = rx * coarse_demodulated
 
-    # BAND SHIFTING BEFORE PHASE CORRECTION
-    fc = int(2e6)
-    shifted_before_CL = coarse_baseband * np.exp(1j * 2 * np.pi * fc * t)
+    if carrier_recovery == 'costas':
+        # BAND SHIFTING BEFORE PHASE CORRECTION
+        # The coarse correction and the band shift are fused into one mixer at fc - coarse_frequency
+        fc = int(2e6)
+        shifted_before_CL = NCO(fc - coarse_frequency, sampling_rate).mix(
+            rx, out=work.get('shifted_before_CL', n, complex_dtype))
+        timer.lap('coarse_frequency', len(rx))
+
+        carrier_est, theta, complex_exp_est = costas_loop_QAM_ring_buffer(
+            np.real(shifted_before_CL), sampling_rate, 0.2, fc, np.pi / 6,
+            plot_graphs, dtype=complex_dtype)
+        baseband_signal = np.multiply(complex_exp_est,
+                                      shifted_before_CL,
+                                      out=complex_exp_est)
+        timer.lap('costas_loop', len(rx))
+    elif carrier_recovery == 'pll':
+        coarse_baseband = NCO(-coarse_frequency, sampling_rate).mix(
+            rx, out=work.get('coarse_baseband', n, complex_dtype))
+        timer.lap('coarse_frequency', len(rx))
 
-    carrier_est, theta, complex_exp_est = costas_loop_QAM(
-        np.real(shifted_before_CL), sampling_rate, 0.2, fc, np.pi / 6,
-        plot_graphs)
-    baseband_signal = complex_exp_est * shifted_before_CL
+        theta, baseband_signal = baseband_pll_QAM4_2(
+            coarse_baseband, sampling_rate, PLL_LOOP_BANDWIDTH, PLL_BLOCK_LENGTH,
+            plot_graphs, out=work.get('baseband_signal', n, complex_dtype))
+        timer.lap('baseband_pll', len(rx))
+    else:
+        raise ValueError(f'Unknown carrier recovery {carrier_recovery!r}, '
+                         f"expected 'costas' or 'pll'")
 
     # MATCHED FILTERING
-    matched_filtered_baseband = signal.convolve(baseband_signal, pulse,
-                                                'same') * np.max(pulse)
+    # Overlap-save with the spectrum of the scaled pulse cached per FFT length
+    matched_filtered_baseband = OverlapSaveFilter(pulse * np.max(pulse)).filter(
+        baseband_signal, 'same', out=work.get('matched_filtered_baseband', n, complex_dtype))
+    timer.lap('matched_filter', len(rx))
 
     # CLOCK RECOVERY - WITH OUTPUT POWER MAXIMIZATION
     tnow = 2 * HALF_NO_OF_SYMBOLS * OVERSAMPLING_RATE
-    tau1, downsampled_real = clock_recovery_OP_max(
-        baseband_signal=np.real(matched_filtered_baseband),
-        t_now=tnow,
-        half_number_of_symbols=HALF_NO_OF_SYMBOLS,
-        oversampling_factor=OVERSAMPLING_RATE,
-        mu=0.6,
-        delta=2,
-        beta=ROLLOFF_FACTOR)
-    tau2, downsampled_imag = clock_recovery_OP_max(
-        baseband_signal=np.imag(matched_filtered_baseband),
-        t_now=tnow,
-        half_number_of_symbols=HALF_NO_OF_SYMBOLS,
-        oversampling_factor=OVERSAMPLING_RATE,
-        mu=0.6,
-        delta=2,
-        beta=ROLLOFF_FACTOR)
-    downsampled_signal = downsampled_real + 1j * downsampled_imag
+    if JOINT_IQ_CLOCK_RECOVERY:
+        tau1, downsampled_signal = clock_recovery_OP_max_IQ(
+            baseband_signal=matched_filtered_baseband,
+            t_now=tnow,
+            half_number_of_symbols=HALF_NO_OF_SYMBOLS,
+            oversampling_factor=OVERSAMPLING_RATE,
+            mu=0.6,
+            delta=2,
+            beta=ROLLOFF_FACTOR,
+            number_of_phases=NUMBER_OF_PHASES)
+        tau2 = tau1
+        timer.lap('clock_recovery', len(rx))
+    else:
+        tau1, downsampled_real = clock_recovery_OP_max(
+            baseband_signal=np.real(matched_filtered_baseband),
+            t_now=tnow,
+            half_number_of_symbols=HALF_NO_OF_SYMBOLS,
+            oversampling_factor=OVERSAMPLING_RATE,
+            mu=0.6,
+            delta=2,
+            beta=ROLLOFF_FACTOR,
+            number_of_phases=NUMBER_OF_PHASES)
+        timer.lap('clock_recovery_real', len(rx))
+        tau2, downsampled_imag = clock_recovery_OP_max(
+            baseband_signal=np.imag(matched_filtered_baseband),
+            t_now=tnow,
+            half_number_of_symbols=HALF_NO_OF_SYMBOLS,
+            oversampling_factor=OVERSAMPLING_RATE,
+            mu=0.6,
+            delta=2,
+            beta=ROLLOFF_FACTOR,
+            number_of_phases=NUMBER_OF_PHASES)
+        downsampled_signal = downsampled_real + 1j * downsampled_imag
+        timer.lap('clock_recovery_imag', len(rx))
 
     # QUANTIZATION
-    quantized_symbols, threshold = quantalph_distance(downsampled_signal,
-                                                      np.array([1, 3]))
+    quantized_symbols, threshold = quantalph_distance_vectorized(
+        downsampled_signal, np.array([1, 3]), return_threshold=plot_graphs)
+    timer.lap('quantization', len(downsampled_signal))
 
     # CORRELATION
-    correlation_indices, correlation_values = symbol_correlation(
+    correlation_indices, correlation_values = symbol_correlation_vectorized(
         symbols=quantized_symbols,
         modulation_type="QAM4_2",
         trigger=TRIGGER,
         header_length=HEADER_LENGTH,
         visualize=plot_graphs)
+    timer.lap('correlation', len(quantized_symbols))
     if plot_graphs:
+        from utils.visualization import plot_spectrum, constellation_plot_with_threshold, \
+            sampling_visualize
         plot_spectrum(rx, Ts)
-        plot_spectrum(coarse_baseband, Ts)
-        plot_spectrum(r4th, Ts)
-        plot_spectrum(shifted_before_CL, Ts)
+        if carrier_recovery == 'costas':
+            plot_spectrum(NCO(-coarse_frequency, sampling_rate).mix(rx), Ts)
+            plot_spectrum(r4th, Ts)
+            plot_spectrum(shifted_before_CL, Ts)
+        else:
+            plot_spectrum(coarse_baseband, Ts)
+            plot_spectrum(r4th, Ts)
         plot_spectrum(baseband_signal, Ts)
         plot_spectrum(matched_filtered_baseband, Ts)
         sampling_visualize(baseband_signal=matched_filtered_baseband,
@@ -114,17 +265,5 @@ def operation_RX(my_SDR: MyRadio, plot_graphs: bool):
                            constellation_display=False,
                            signal_and_samples=True)
         constellation_plot_with_threshold(downsampled_signal, threshold)
-    # MESSAGE GENERATION
-    try:
-        received_message = frame_generator_RX(
-            quantized_symbols=quantized_symbols,
-            correlation_indices=correlation_indices,
-            correlation_values=correlation_values,
-            single_frame_length=FRAME_LENGTH_SYMBOLS,
-            header='barker13',
-            modulation_type='QAM4_2')
-        message_output = message_handler(received_message,
-                                         display_outputs=False)
-        return message_output
-    except:
-        pass
+        timer.lap('visualization')
+    return quantized_symbols, correlation_indices, correlation_values
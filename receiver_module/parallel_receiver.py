@@ -0,0 +1,275 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from os import cpu_count
+import sys
+import numpy as np
+from receiver_module.operation_RX import symbol_detection_RX
+from receiver_module.frame_generator_RX import frame_generator_RX_batched, frame_generator_RX_binary, \
+    select_frame_peaks
+from receiver_module.message_handler import message_handler, MessageReassembler
+from utils.frame_header import DATA_LENGTH, FRAME_OVERHEAD
+from utils.precision import PRECISION
+
+#Frame
+FRAME_LENGTH_SYMBOLS = 365
+HEADER_LENGTH = 13
+BINARY_DATA_LENGTH_WITH_HEADER = DATA_LENGTH + FRAME_OVERHEAD
+OVERSAMPLING_RATE = 16
+HALF_NO_OF_SYMBOLS = 6
+
+# Window pool of the worker process, attached once by '_attach_windows'
+_worker_memory = None
+_worker_windows = None
+
+
+def _attach_windows(name, shape, dtype):
+    global _worker_memory, _worker_windows
+    _worker_memory = _attach_untracked(name)
+    _worker_windows = np.ndarray(shape, dtype=dtype, buffer=_worker_memory.buf)
+
+
+def _attach_untracked(name):
+    # The receiver owns and unlinks the segment. Attaching registers it with the resource
+    # tracker, which warns about a leak or unlinks it again at shutdown when the worker has a
+    # tracker of its own, and a later unregister would drop the registration of the receiver
+    # from a shared tracker. Before 'track=False' of Python 3.13 the registration is skipped
+    # instead, the initializer runs before any task of the worker.
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def decode_window(slot, length, start_sample, sampling_rate, frame_format='text'):
+    """
+    Decode the complete frames of one window of the shared window pool.
+
+    Runs in a worker process. The samples are read in place from shared memory.
+
+    Args:
+        slot (int): Row of the window pool holding the samples.
+        length (int): Number of valid samples in the row.
+        start_sample (int): Absolute sample index of the first sample of the window.
+        sampling_rate (float): Sampling rate of the samples.
+        frame_format (str): 'text' or 'binary', see 'operation_RX'.
+
+    Returns:
+        frames(list): (Absolute sample index, frame string) of every decoded frame, in order.
+                      With binary frames, the (sequence, total, payload) records of
+                      'frame_generator_RX_binary'.
+    """
+    rx = _worker_windows[slot, :length]
+    quantized_symbols, correlation_indices, correlation_values = symbol_detection_RX(
+        rx, sampling_rate, False)
+    if frame_format == 'binary':
+        return frame_generator_RX_binary(
+            quantized_symbols=quantized_symbols,
+            correlation_indices=correlation_indices,
+            correlation_values=correlation_values,
+            data_length_with_header=BINARY_DATA_LENGTH_WITH_HEADER,
+            header='barker13',
+            modulation_type='QAM4_2')
+    # Symbol k of clock recovery is taken near sample t_now + k * P
+    t_now = 2 * HALF_NO_OF_SYMBOLS * OVERSAMPLING_RATE
+    peaks, _ = select_frame_peaks(correlation_indices, FRAME_LENGTH_SYMBOLS - HEADER_LENGTH,
+                                  len(quantized_symbols))
+    records = frame_generator_RX_batched(
+        quantized_symbols=quantized_symbols,
+        correlation_indices=correlation_indices[peaks],
+        correlation_values=correlation_values[peaks],
+        single_frame_length=FRAME_LENGTH_SYMBOLS,
+        header='barker13',
+        modulation_type='QAM4_2')
+    frames = [(start_sample + t_now + first_index * OVERSAMPLING_RATE, frame)
+              for first_index, frame in records]
+    return frames
+
+
+class ParallelReceiver:
+    """
+    Run the 'operation_RX' pipeline on a 'ProcessPoolExecutor', one window per captured buffer.
+
+    Every buffer is prefixed with the last 'margin' samples of the previous buffer, so that a
+    frame which straddles two buffers is complete in the window of the second one and the Costas
+    loop of each window has settled before the frames of its own buffer. Windows are written to a
+    pool of rows in shared memory, only the row index and a few numbers are pickled to the
+    workers, and only the decoded frame strings are pickled back. The windows have the
+    'PRECISION' set when the receiver is created, and are decoded in that precision.
+
+    Results are collected in submission order. Frames are placed on the absolute sample axis of
+    the stream, a frame decoded from the overlap of two windows is kept once. For each window the
+    frames lying in the window are handed to 'message_handler', exactly like the frames of one
+    buffer in 'operation_RX'. Binary frames carry their sequence number, the valid frames of a
+    window are reassembled by a 'MessageReassembler' like in 'operation_RX'.
+
+    Args:
+        sample_rate (float): Sampling rate of the buffers.
+        buffer_size (int): Number of samples in every buffer, e.g. 'rx_buffer_size'.
+        margin (int): Number of samples of the previous buffer prefixed to each window, at most
+                      'buffer_size'.
+        max_workers (int, optional): Number of worker processes, all cores when None.
+        slots (int, optional): Number of windows in shared memory, which bounds the number of
+                               windows in flight. Twice the number of workers when None.
+        mp_context (optional): Multiprocessing context of the pool.
+        frame_format (str): 'text' for the '0X..' text IDs, 'binary' for the frame header with
+                            CRC of 'utils.frame_header', as sent by 'operation_TX'.
+
+    Example:
+        capture = RXCapture(my_SDR)
+        capture.start()
+        with ParallelReceiver(my_SDR.sample_rate, my_SDR.rx_buffer_size) as receiver:
+            while chatting:
+                sequence, samples = capture.get(timeout=1)
+                results = receiver.submit(sequence, samples)
+                capture.release(sequence)
+                for sequence, message in results:
+                    print(message)
+    """
+
+    def __init__(self,
+                 sample_rate,
+                 buffer_size,
+                 margin: int = int(2**13),
+                 max_workers=None,
+                 slots=None,
+                 mp_context=None,
+                 frame_format='text'):
+        if frame_format not in ('text', 'binary'):
+            raise ValueError(f'Unknown frame format {frame_format!r}, expected '
+                             f"'text' or 'binary'")
+        self._sample_rate = sample_rate
+        self._frame_format = frame_format
+        self._buffer_size = buffer_size
+        self._margin = margin
+        max_workers = max_workers if max_workers is not None else cpu_count()
+        self._number_of_slots = slots if slots is not None else 2 * max_workers
+        shape = (self._number_of_slots, margin + buffer_size)
+        dtype = PRECISION.complex_dtype
+        self._memory = SharedMemory(create=True, size=int(np.prod(shape)) * dtype.itemsize)
+        self._windows = np.ndarray(shape, dtype=dtype, buffer=self._memory.buf)
+        self._executor = ProcessPoolExecutor(max_workers=max_workers,
+                                             mp_context=mp_context,
+                                             initializer=_attach_windows,
+                                             initargs=(self._memory.name, shape, dtype.str))
+        self._free_slots = deque(range(self._number_of_slots))
+        self._in_flight = deque()
+        self._previous_sequence = None
+        self._tail = np.zeros(margin, dtype=dtype)
+        # Recently emitted frames, for deduplication of the overlaps
+        self._recent_frames = deque()
+        # Frames closer than half a frame are the same frame
+        self._frame_tolerance = FRAME_LENGTH_SYMBOLS * OVERSAMPLING_RATE // 2
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def in_flight(self):
+        return len(self._in_flight)
+
+    def submit(self, sequence, samples):
+        """
+        Queue one buffer and collect the windows completed so far.
+
+        Blocks while all window slots are in flight.
+
+        Args:
+            sequence (int): Sequence number of the buffer, e.g. from 'RXCapture'. Consecutive
+                            numbers mark consecutive buffers of the stream.
+            samples (numpy.ndarray): Received samples, copied before returning.
+
+        Returns:
+            results(list): (Sequence number, message) of every completed window, in order. The
+                           message is None when the window holds no complete message or its
+                           decoding failed.
+        """
+        results = []
+        if not self._free_slots:
+            results += self._collect(block=True)
+        slot = self._free_slots.popleft()
+        window = self._windows[slot]
+        start_sample = sequence * self._buffer_size
+        if self._previous_sequence is not None and sequence == self._previous_sequence + 1:
+            window[:self._margin] = self._tail
+            window[self._margin:self._margin + len(samples)] = samples
+            start_sample -= self._margin
+            length = self._margin + len(samples)
+        else:
+            # No contiguous previous buffer, the window starts with this buffer
+            window[:len(samples)] = samples
+            length = len(samples)
+        self._tail[:] = samples[len(samples) - self._margin:]
+        self._previous_sequence = sequence
+        future = self._executor.submit(decode_window, slot, length, start_sample,
+                                       self._sample_rate, self._frame_format)
+        self._in_flight.append((sequence, slot, start_sample, future))
+        results += self._collect(block=False)
+        return results
+
+    def flush(self):
+        """
+        Wait for every window in flight.
+
+        Returns:
+            results(list): (Sequence number, message) of the remaining windows, in order.
+        """
+        return self._collect(block=True, until_empty=True)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            self._windows = None
+            self._memory.close()
+            self._memory.unlink()
+
+    def _collect(self, block, until_empty=False):
+        results = []
+        while self._in_flight:
+            sequence, slot, start_sample, future = self._in_flight[0]
+            if not (future.done() or block):
+                break
+            self._in_flight.popleft()
+            self._free_slots.append(slot)
+            try:
+                frames = future.result()
+            except Exception:
+                # A window failing to decode, e.g. noise only in clock recovery, yields no message
+                results.append((sequence, None))
+            else:
+                results.append((sequence, self._message(frames, start_sample)))
+            if not until_empty:
+                block = False
+        return results
+
+    def _message(self, frames, start_sample):
+        if self._frame_format == 'binary':
+            reassembler = MessageReassembler()
+            reassembler.add_records(frames)
+            return reassembler.message()
+        window_frames = [
+            frame for frame in self._recent_frames if frame[0] >= start_sample
+        ]
+        for position, frame in frames:
+            if all(abs(position - known) > self._frame_tolerance
+                   for known, _ in window_frames):
+                window_frames.append((position, frame))
+                self._recent_frames.append((position, frame))
+        window_frames.sort()
+        # Frames older than one window can no longer overlap with a coming window
+        while self._recent_frames and self._recent_frames[0][0] < start_sample:
+            self._recent_frames.popleft()
+        received_message = ''.join(frame for _, frame in window_frames)
+        try:
+            return message_handler(received_message, display_outputs=False)
+        except Exception:
+            return None
@@ -1,4 +1,5 @@
-from numpy import min, max, abs, zeros, exp, arange, sign, real, imag, pi,angle
+from numpy import min, max, abs, zeros, exp, arange, sign, real, imag, pi, angle, asarray, where, empty, broadcast_to, \
+    promote_types, complex64
 """
     The quantalph_distance function quantizes a set of symbols based on a given alphabet. It calculates the distance between the minimum and maximum 
     values in the alphabet and uses this distance to determine a threshold. Symbols within this threshold are quantized to the minimum values in the 
@@ -40,5 +41,46 @@ def quantalph_distance(symbol_array, alphabet):
                 symbol_array[i])) * max_alphabet + 1j * sign(
                     imag(symbol_array[i])) * max_alphabet
     return quantized_symbols, threshold_array
-  
-    
+
+
+def quantalph_distance_vectorized(symbol_array,
+                                  alphabet,
+                                  return_threshold=False):
+    """
+    Vectorized decision engine producing the same quantized symbols as 'quantalph_distance'.
+
+    The per-symbol loop is replaced by NumPy masks. The threshold circle is only built when it is
+    requested for visualization. A 2-D input is treated as a batch of independent symbol blocks,
+    one per row, each sliced with the threshold derived from its own minimum and maximum.
+
+    Args:
+        symbol_array (numpy.ndarray): 1-D array of symbols, or 2-D array with one block per row.
+        alphabet (numpy.ndarray): Coded alphabet used for quantization.
+        return_threshold (bool): Flag to build the threshold array used for visualization.
+
+    Returns:
+        tuple: A tuple containing:
+        quantized_symbols(numpy.ndarray): Quantized symbols, same shape as 'symbol_array',
+                                          complex64 for complex64 input.
+        threshold_array(numpy.ndarray): Threshold array used for quantization, None unless
+                                        'return_threshold' is set.
+    """
+    symbol_array = asarray(symbol_array)
+    min_alphabet = min(alphabet)
+    max_alphabet = max(alphabet)
+    min_point = min(symbol_array, axis=-1, keepdims=True)
+    max_point = max(symbol_array, axis=-1, keepdims=True)
+    distance = abs(min_point) + abs(max_point)
+    threshold = 1 * distance / 4
+    level = where(abs(symbol_array) < threshold, min_alphabet, max_alphabet)
+    quantized_symbols = empty(symbol_array.shape,
+                              dtype=promote_types(symbol_array.dtype, complex64))
+    quantized_symbols.real = sign(real(symbol_array)) * level
+    quantized_symbols.imag = sign(imag(symbol_array)) * level
+    threshold_array = None
+    if return_threshold:
+        length = symbol_array.shape[-1]
+        threshold_array = threshold * broadcast_to(
+            exp(1j * 2 * pi * arange(0, 1, 1 / length))[:length],
+            symbol_array.shape)
+    return quantized_symbols, threshold_array
@@ -0,0 +1,269 @@
+import numpy as np
+from utils.pulse_shape import srrc_cached
+from utils.maximum_frequency import maximum_frequency
+from utils.interpolation_with_sinc import polyphase_filter_bank
+from adaptive_algorithms.costas_loop import costas_loop_filter, costas_loop_QAM_block
+from adaptive_algorithms.clock_recovery import clock_recovery_OP_max_IQ_block
+from receiver_module.quantization import quantalph_distance_vectorized
+from receiver_module.symbol_correlation import symbol_correlation_vectorized
+from receiver_module.frame_generator_RX import frame_generator_RX_batched, frame_generator_RX_binary, \
+    select_frame_peaks
+from utils.precision import PRECISION
+from utils.nco import NCO
+from utils.fir_filter import OverlapSaveFilter
+from utils.fec import FEC_CODES, FEC_FIELD_LENGTH, coded_length
+from utils.frame_header import DATA_LENGTH, FRAME_OVERHEAD
+
+
+class Receiver:
+    """
+    Stateful, streaming counterpart of 'operation_RX'.
+
+    'operation_RX' processes every buffer from scratch. A Receiver instead keeps the state of
+    every stage between successive calls of 'process', so that consecutive 'rx()' buffers are
+    treated as one continuous stream:
+        - the sample counter, so the mixers stay phase continuous,
+        - the coarse frequency estimate, made once on the first buffer,
+        - the Costas loop phase and its low-pass delay line,
+        - the matched filter tail,
+        - the clock recovery time reference, timing offset and interpolation history,
+        - the tail of quantized symbols which may hold the start of a frame.
+    Filter designs and the SRRC pulse are generated once in the constructor, so every buffer
+    costs a fixed amount of work. Frames that straddle two buffers are decoded once the second
+    buffer arrives. The stream is processed in the 'PRECISION' set when the receiver is created,
+    the phases and the Costas and clock recovery loops are always double precision.
+
+    Binary frames are decoded by 'frame_generator_RX_binary'. Their length depends on the FEC
+    detected per frame, so a peak is decoded once the frame of the longest code would be complete
+    after it.
+
+    Args:
+        sample_rate (float): Sampling rate of the received samples.
+        coarse_frequency (float, optional): Coarse frequency offset. Estimated from the first
+                                            buffer when None.
+        frame_format (str): 'text' for the '0X..' text IDs, 'binary' for the frame header with
+                            CRC of 'utils.frame_header', as sent by 'operation_TX'.
+
+    Example:
+        receiver = Receiver(my_SDR.sample_rate)
+        while True:
+            for frame in receiver.process(my_SDR.receive_samples()):
+                print(frame)
+
+        receiver = Receiver(my_SDR.sample_rate, frame_format='binary')
+        store = ReassemblyStore()
+        while True:
+            for message in store.add_records(receiver.process(my_SDR.receive_samples())):
+                print(message)
+    """
+
+    #Correlation
+    TRIGGER = 80
+    HEADER_LENGTH = 13
+    FRAME_LENGTH_SYMBOLS = 365
+    BINARY_DATA_LENGTH_WITH_HEADER = DATA_LENGTH + FRAME_OVERHEAD
+    # Symbols after the header of the longest binary frame, of any FEC
+    BINARY_DATA_LENGTH_SYMBOLS = FEC_FIELD_LENGTH + max(
+        coded_length(fec, DATA_LENGTH + FRAME_OVERHEAD) for fec in FEC_CODES)
+
+    #SRRC Generation
+    OVERSAMPLING_RATE = 16
+    HALF_NO_OF_SYMBOLS = 6
+    ROLLOFF_FACTOR = 0.75
+
+    #Carrier Recovery
+    BAND_SHIFT_FREQUENCY = int(2e6)
+    COSTAS_MU = 0.2
+    THETA_INIT = np.pi / 6
+
+    #Clock Recovery
+    NUMBER_OF_PHASES = 256
+    CLOCK_RECOVERY_MU = 0.6
+    DELTA = 2
+
+    def __init__(self, sample_rate, coarse_frequency=None, frame_format='text'):
+        if frame_format not in ('text', 'binary'):
+            raise ValueError(f'Unknown frame format {frame_format!r}, expected '
+                             f"'text' or 'binary'")
+        self._sample_rate = sample_rate
+        self._frame_format = frame_format
+        self._initial_coarse_frequency = coarse_frequency
+        self._dtype = PRECISION.complex_dtype
+        self._pulse = srrc_cached(syms=self.HALF_NO_OF_SYMBOLS,
+                                  beta=self.ROLLOFF_FACTOR,
+                                  P=self.OVERSAMPLING_RATE,
+                                  dtype=PRECISION.real_dtype)
+        self._pulse_scale = np.max(self._pulse)
+        self._pulse_filter = OverlapSaveFilter(self._pulse * self._pulse_scale)
+        # Oldest sample first in the Costas delay window, therefore taps are reversed
+        self._costas_taps = costas_loop_filter(sample_rate)[::-1].copy()
+        self._filter_bank = polyphase_filter_bank(
+            self.HALF_NO_OF_SYMBOLS, self.OVERSAMPLING_RATE, self.ROLLOFF_FACTOR,
+            self.NUMBER_OF_PHASES).astype(PRECISION.real_dtype, copy=False)
+        self.reset()
+
+    def reset(self):
+        """
+        Drop all stream state, the next call of 'process' starts a new stream.
+        """
+        self.coarse_frequency = self._initial_coarse_frequency
+        self._mixer = None
+        self._sample_count = 0
+        self._theta = self.THETA_INIT
+        self._costas_delay_line = np.zeros((2 * len(self._costas_taps), 4))
+        self._costas_position = 0
+        self._pulse_filter.reset()
+        self._clock_history = np.zeros(0, dtype=self._dtype)
+        self._t_now = 2 * self.HALF_NO_OF_SYMBOLS * self.OVERSAMPLING_RATE
+        self._tau = 0.0
+        self._symbols = np.zeros(0, dtype=complex)
+
+    @property
+    def sample_rate(self):
+        return self._sample_rate
+
+    @property
+    def tau(self):
+        return self._tau
+
+    @property
+    def theta(self):
+        return self._theta
+
+    def process(self, chunk):
+        """
+        Push one buffer of received samples through the receiver chain.
+
+        Args:
+            chunk (numpy.ndarray): Complex received samples, scaled as returned by
+                                   'MyRadio.receive_samples'.
+
+        Returns:
+            frames(list): Decoded frame strings, including their ID prefix and suffix, of every
+                          frame completed by this buffer, in reception order. With binary
+                          frames, the (sequence, total, payload) records of the valid frames, for
+                          'add_records' of 'MessageReassembler' or 'ReassemblyStore'.
+        """
+        baseband_signal = self._carrier_recovery(chunk)
+        matched_filtered_baseband = self._matched_filter(baseband_signal)
+        downsampled_signal = self._clock_recovery(matched_filtered_baseband)
+        if len(downsampled_signal) == 0:
+            return []
+        quantized_symbols, _ = quantalph_distance_vectorized(
+            downsampled_signal, np.array([1, 3]))
+        return self._extract_frames(quantized_symbols)
+
+    def _phase(self, frequency, sample_index):
+        # Phase wrapped to one turn before scaling keeps precision on long streams
+        return 2 * np.pi * np.mod(frequency / self._sample_rate * sample_index,
+                                  1.0)
+
+    def _carrier_recovery(self, chunk):
+        sample_index = self._sample_count + np.arange(len(chunk))
+        self._sample_count += len(chunk)
+
+        # COARSE FREQUENCY CORRECTION
+        if self.coarse_frequency is None:
+            self.coarse_frequency = maximum_frequency(
+                chunk**4, self._sample_rate) / 4
+        mixer_frequency = self.BAND_SHIFT_FREQUENCY - self.coarse_frequency
+        if self._mixer is None or self._mixer.frequency != mixer_frequency:
+            # Coarse correction and band shift fused into one phase continuous mixer
+            self._mixer = NCO(mixer_frequency, self._sample_rate,
+                              self._phase(mixer_frequency, sample_index[0]))
+
+        # BAND SHIFTING BEFORE PHASE CORRECTION
+        carrier_phase = self._phase(self.BAND_SHIFT_FREQUENCY, sample_index)
+        shifted_before_CL = self._mixer.mix(chunk.astype(self._dtype, copy=False))
+
+        theta, self._costas_position = costas_loop_QAM_block(
+            rx=np.real(shifted_before_CL),
+            carrier_phase=carrier_phase,
+            theta_init=self._theta,
+            mu=self.COSTAS_MU,
+            reversed_taps=self._costas_taps,
+            delay_line=self._costas_delay_line,
+            position=self._costas_position)
+        self._theta = theta[-1]
+        return np.multiply(np.exp(-1j * (carrier_phase + theta[:-1])),
+                           shifted_before_CL,
+                           dtype=self._dtype)
+
+    def _matched_filter(self, baseband_signal):
+        # The filter keeps the last len(pulse) - 1 samples of the previous buffer
+        return self._pulse_filter.process(baseband_signal)
+
+    def _clock_recovery(self, matched_filtered_baseband):
+        # The history is used as padded data, interpolation at time t reads
+        # history[floor(t) + 2:floor(t) + 2 + filter_length]
+        filter_length = self._filter_bank.shape[1]
+        history = np.concatenate((self._clock_history,
+                                  matched_filtered_baseband))
+        margin = self.DELTA + self.OVERSAMPLING_RATE + abs(self._tau)
+        t_end = len(history) - filter_length - margin
+        _, downsampled_signal, self._t_now, self._tau = clock_recovery_OP_max_IQ_block(
+            padded_iq=history.view(self._filter_bank.dtype).reshape(-1, 2),
+            filter_bank=self._filter_bank,
+            t_now=self._t_now,
+            t_end=t_end,
+            tau=self._tau,
+            oversampling_factor=self.OVERSAMPLING_RATE,
+            mu=self.CLOCK_RECOVERY_MU,
+            delta=self.DELTA)
+
+        consumed = int(self._t_now - abs(self._tau) - self.DELTA -
+                       self.OVERSAMPLING_RATE)
+        if consumed > 0:
+            history = history[consumed:]
+            self._t_now -= consumed
+        self._clock_history = history
+        return downsampled_signal
+
+    def _extract_frames(self, quantized_symbols):
+        symbols = np.concatenate((self._symbols, quantized_symbols))
+        correlation_indices, correlation_values = symbol_correlation_vectorized(
+            symbols=symbols,
+            modulation_type="QAM4_2",
+            trigger=self.TRIGGER,
+            header_length=self.HEADER_LENGTH,
+            visualize=False)
+        if self._frame_format == 'binary':
+            return self._extract_binary_frames(symbols, correlation_indices, correlation_values)
+
+        data_length = self.FRAME_LENGTH_SYMBOLS - self.HEADER_LENGTH
+        peaks, decoded_end = select_frame_peaks(correlation_indices, data_length, len(symbols))
+        records = frame_generator_RX_batched(
+            quantized_symbols=symbols,
+            correlation_indices=correlation_indices[peaks],
+            correlation_values=correlation_values[peaks],
+            single_frame_length=self.FRAME_LENGTH_SYMBOLS,
+            header='barker13',
+            modulation_type='QAM4_2')
+        frames = [frame for _, frame in records]
+
+        # Keep the symbols which may still hold the header of an incomplete frame
+        keep_from = max(decoded_end, len(symbols) - self.FRAME_LENGTH_SYMBOLS)
+        self._symbols = symbols[max(keep_from, 0):]
+        return frames
+
+    def _extract_binary_frames(self, symbols, correlation_indices, correlation_values):
+        # Peaks are decoded once a frame of any code is complete after them, false peaks fail the
+        # CRC, so no peaks are skipped like in 'select_frame_peaks'
+        last_indices = np.maximum(np.real(correlation_indices),
+                                  np.imag(correlation_indices)).astype(int)
+        peaks = np.flatnonzero(last_indices + 1 + self.BINARY_DATA_LENGTH_SYMBOLS <= len(symbols))
+        records = frame_generator_RX_binary(
+            quantized_symbols=symbols,
+            correlation_indices=correlation_indices[peaks],
+            correlation_values=correlation_values[peaks],
+            data_length_with_header=self.BINARY_DATA_LENGTH_WITH_HEADER,
+            header='barker13',
+            modulation_type='QAM4_2')
+
+        # Keep the symbols which may still hold the header of an undecoded peak, but no complete
+        # header of a decoded one
+        keep_from = len(symbols) - self.HEADER_LENGTH - self.BINARY_DATA_LENGTH_SYMBOLS
+        if len(peaks):
+            keep_from = max(keep_from, last_indices[peaks[-1]] + 1)
+        self._symbols = symbols[max(keep_from, 0):]
+        return records
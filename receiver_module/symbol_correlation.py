@@ -1,5 +1,6 @@
-from numpy import real, imag, correlate, zeros, ndenumerate, abs, trim_zeros
-import matplotlib.pyplot as plt
+from numpy import real, imag, correlate, zeros, ndenumerate, abs, trim_zeros, stack, flatnonzero, \
+    searchsorted, clip, minimum, unique, concatenate, diff
+from scipy.ndimage import maximum_filter1d
 from utils.barker_generator import barker_generator
 """
     The symbol_correlation function calculates the correlation between received symbols and a specified header sequence for both
@@ -54,6 +55,7 @@ def symbol_correlation(symbols, modulation_type, trigger, header_length,
             k += 1
 
     if visualize:
+        import matplotlib.pyplot as plt
         print(f'Header = {header}')
         fig2, axs = plt.subplots(2, 1, figsize=(12.8, 9.6))
         fig2.suptitle('Correlation Output of Real and Imaginary Symbols',
@@ -75,3 +77,96 @@ def symbol_correlation(symbols, modulation_type, trigger, header_length,
         real_correlation_values + 1j * imag_correlation_values, 'b')
 
     return correlation_indices, correlation_values
+
+
+def symbol_correlation_vectorized(symbols, modulation_type, trigger, header_length,
+                                  visualize):
+    """
+    Vectorized 'symbol_correlation' without a limit on the number of peaks.
+
+    The correlations of the real and imaginary rails are stacked into one (2, N) array, and
+    threshold and peak detection run on both rails at once. Peaks are the samples whose magnitude
+    reaches 'trigger' and is the maximum within one header length on either side. Each real peak
+    is paired with the nearest imaginary peak, peaks without a partner within half a header
+    length are dropped. The output arrays hold exactly one entry per detected frame, so long buffers
+    never overflow and a peak at index 0 is kept.
+
+    Note:
+        Direct correlation is used on purpose. For headers of at most 13 symbols it is faster than
+        FFT or overlap-add convolution for every buffer length up to 2**20 symbols.
+
+    Args:
+        symbols (numpy.ndarray): Received symbols to be correlated.
+        modulation_type (str): Modulation type ('QAM', 'QAM4_2', etc.).
+        trigger (float): Threshold for considering correlation values.
+        header_length (int): Length of the header sequence.
+        visualize (bool): Flag to indicate whether to display correlation plots.
+
+    Returns:
+        tuple: A tuple containing:
+        correlation_indices(numpy.ndarray): Correlation indices (complex numbers representing positions in the array).
+        correlation_values(numpy.ndarray): Correlation values (complex numbers representing correlation strengths).
+    """
+    header = barker_generator(barker_type=f'barker{header_length}',
+                              modulation_type=modulation_type)
+
+    correlation = stack((correlate(real(symbols), real(header), 'full'),
+                         correlate(imag(symbols), imag(header), 'full')))
+
+    magnitude = abs(correlation)
+    local_maximum = maximum_filter1d(magnitude,
+                                     size=2 * header_length - 1,
+                                     axis=1,
+                                     mode='constant')
+    real_indices = _peak_indices(magnitude[0], local_maximum[0], trigger,
+                                 header_length)
+    imag_indices = _peak_indices(magnitude[1], local_maximum[1], trigger,
+                                 header_length)
+
+    if visualize:
+        import matplotlib.pyplot as plt
+        print(f'Header = {header}')
+        fig2, axs = plt.subplots(2, 1, figsize=(12.8, 9.6))
+        fig2.suptitle('Correlation Output of Real and Imaginary Symbols',
+                      fontsize=20)
+        axs[0].stem(correlation[0], 'r')
+        axs[0].set_title("Real Part Correlation Output", fontsize=18)
+        axs[0].grid(True)
+        axs[0].set_ylabel("Correlation Value", fontsize=16)
+        axs[0].set_xlabel("Number Of Symbols", fontsize=16)
+        axs[1].stem(correlation[1], 'b')
+        axs[1].grid(True)
+        axs[1].set_title("Imaginary Part Correlation Output", fontsize=18)
+        axs[1].set_ylabel("Correlation Value", fontsize=16)
+        axs[1].set_xlabel("Number Of Symbols", fontsize=16)
+        fig2.tight_layout()
+
+    if len(real_indices) == 0 or len(imag_indices) == 0:
+        return zeros(0, dtype=complex), zeros(0, dtype=complex)
+
+    # Pair every real peak with the nearest imaginary peak
+    right = clip(searchsorted(imag_indices, real_indices), 0,
+                 len(imag_indices) - 1)
+    left = clip(right - 1, 0, len(imag_indices) - 1)
+    distance_left = abs(real_indices - imag_indices[left])
+    distance_right = abs(real_indices - imag_indices[right])
+    nearest = left
+    nearest[distance_right < distance_left] = right[distance_right <
+                                                    distance_left]
+    paired = minimum(distance_left, distance_right) <= header_length // 2
+    real_indices = real_indices[paired]
+    imag_indices, first = unique(imag_indices[nearest[paired]],
+                                 return_index=True)
+    real_indices = real_indices[first]
+
+    correlation_indices = real_indices + 1j * imag_indices
+    correlation_values = correlation[0, real_indices] + 1j * correlation[
+        1, imag_indices]
+    return correlation_indices, correlation_values
+
+
+def _peak_indices(magnitude, local_maximum, trigger, header_length):
+    peaks = flatnonzero((magnitude >= trigger) & (magnitude == local_maximum))
+    # Equal magnitudes within one header length are a single peak, keep the first one
+    keep = concatenate(([True], diff(peaks) >= header_length))
+    return peaks[keep[:len(peaks)]]
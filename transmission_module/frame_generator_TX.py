@@ -1,6 +1,8 @@
 import numpy as np
-from utils.symbol_conversion import letters_to_pam, pam_to_qam4_2, pam_to_qam
+from utils.symbol_conversion import letters_to_pam_lut, pam_to_qam4_2_lut, pam_to_qam_lut
 from utils.barker_generator import barker_generator
+from utils.frame_header import FRAME_OVERHEAD, FRAME_PADDING, pack_frames
+from utils.fec import FEC_FIELD_LENGTH, coded_length, fec_encode, fec_field
 """
 Function description:
         This function takes the arguments below so that it can generate symbol frames.data_length parameter defines the number of characters in a frame. According to that number
@@ -65,21 +67,21 @@ def frame_generator_TX(data_length, text_message, header_type, modulation_type,
                     data = data + encoding[i]
                 # print(data)
                 if mod_type == '4QAM':
-                    data_symbols = pam_to_qam(letters_to_pam(data))
+                    data_symbols = pam_to_qam_lut(letters_to_pam_lut(data))
                 elif mod_type == 'QAM4_2':
-                    data_symbols = pam_to_qam4_2(letters_to_pam(data))
+                    data_symbols = pam_to_qam4_2_lut(letters_to_pam_lut(data))
                 else:
-                    data_symbols = letters_to_pam(data)
+                    data_symbols = letters_to_pam_lut(data)
                 data_symbols_with_barker = np.append(header, data_symbols)
             else:
                 data = f'{i:#04X}' + msg[i * data_length:(
                     (i + 1) * data_length)] + f'{i:#04X}'
                 if mod_type == '4QAM':
-                    data_symbols = pam_to_qam(letters_to_pam(data))
+                    data_symbols = pam_to_qam_lut(letters_to_pam_lut(data))
                 elif mod_type == 'QAM4_2':
-                    data_symbols = pam_to_qam4_2(letters_to_pam(data))
+                    data_symbols = pam_to_qam4_2_lut(letters_to_pam_lut(data))
                 else:
-                    data_symbols = letters_to_pam(data)
+                    data_symbols = letters_to_pam_lut(data)
                 data_symbols_with_barker = np.append(header, data_symbols)
 
             if info:
@@ -95,11 +97,11 @@ def frame_generator_TX(data_length, text_message, header_type, modulation_type,
         if info:
             print(data)
         if mod_type == '4QAM':
-            data_symbols = pam_to_qam(letters_to_pam(data))
+            data_symbols = pam_to_qam_lut(letters_to_pam_lut(data))
         elif mod_type == 'QAM4_2':
-            data_symbols = pam_to_qam4_2(letters_to_pam(data))
+            data_symbols = pam_to_qam4_2_lut(letters_to_pam_lut(data))
         else:
-            data_symbols = letters_to_pam(data)
+            data_symbols = letters_to_pam_lut(data)
         data_symbols_with_barker = np.append(header, data_symbols)
         symbol_frames = data_symbols_with_barker
 
@@ -113,12 +115,131 @@ def frame_generator_TX(data_length, text_message, header_type, modulation_type,
         if info:
             print(data)
         if mod_type == '4QAM':
-            data_symbols = pam_to_qam(letters_to_pam(data))
+            data_symbols = pam_to_qam_lut(letters_to_pam_lut(data))
         elif mod_type == 'QAM4_2':
-            data_symbols = pam_to_qam4_2(letters_to_pam(data))
+            data_symbols = pam_to_qam4_2_lut(letters_to_pam_lut(data))
         else:
-            data_symbols = letters_to_pam(data)
+            data_symbols = letters_to_pam_lut(data)
         data_symbols_with_barker = np.append(header, data_symbols)
         symbol_frames = data_symbols_with_barker
 
     return symbol_frames, single_frame_length, header, data_length_with_id
+
+
+MODULATION_MAPPERS = {'4QAM': pam_to_qam_lut, 'QAM4_2': pam_to_qam4_2_lut}
+
+
+def frame_generator_TX_preallocated(data_length, text_message, header_type,
+                                    modulation_type, info):
+    """
+    Byte-oriented frame builder producing the same symbol frames as 'frame_generator_TX'.
+
+    The message is encoded to bytes once and every frame payload, ID prefix, ID suffix and
+    padding is produced by slicing. All payloads are converted into symbols with one codec call
+    and written, together with the headers, into a single preallocated complex array whose size
+    is computed up front. Building the frames is therefore linear in the message length.
+
+    Args:
+        data_length (int): Length of each data frame.
+        text_message (str): Text message to be transmitted. Characters outside Latin-1 are
+                            replaced by '?'.
+        header_type (str): Type of header to be added to each frame.
+        modulation_type (str): Modulation type for encoding symbols (e.g., "4QAM", "QAM4_2").
+        info (bool): Flag indicating whether to display additional information.
+
+    Returns:
+        Tuple[np.ndarray, int, np.ndarray, int]: Tuple containing:
+            symbol_frames (np.ndarray): Generated symbol frames for transmission.
+            single_frame_length (int): Length of a single frame in symbols.
+            header (np.ndarray): Header symbols used in the frames.
+            data_length_with_id (int): Length of data frames with ID and header symbols.
+    """
+    header = barker_generator(header_type, modulation_type=modulation_type)
+    msg = text_message.encode('latin-1', errors='replace')
+    symbols_per_char = 4
+    id_length_in_char = 4
+    id_len_in_symbols = id_length_in_char * symbols_per_char
+    data_length_with_id = id_length_in_char + data_length + id_length_in_char
+    single_frame_length = len(
+        header) + id_len_in_symbols + data_length * symbols_per_char + id_len_in_symbols
+
+    if len(msg) > data_length:
+        number_of_frames = len(msg) // data_length + 1
+    else:
+        number_of_frames = 1
+    frames = []
+    for i in range(number_of_frames):
+        frame_id = f'{i:#04X}'.encode()
+        payload = msg[i * data_length:(i + 1) * data_length]
+        data = frame_id + payload + frame_id + FRAME_PADDING[:data_length -
+                                                             len(payload)]
+        if info:
+            print(f'Data frame is generated: {data.decode("latin-1")}')
+        frames.append(data)
+
+    data_symbols = letters_to_pam_lut(b''.join(frames))
+    if modulation_type in MODULATION_MAPPERS:
+        data_symbols = MODULATION_MAPPERS[modulation_type](data_symbols)
+
+    frame_lengths = [len(header) + symbols_per_char * len(data) for data in frames]
+    symbol_frames = np.empty(sum(frame_lengths), dtype=complex)
+    frame_start = 0
+    data_start = 0
+    for frame_length in frame_lengths:
+        data_end = data_start + frame_length - len(header)
+        symbol_frames[frame_start:frame_start + len(header)] = header
+        symbol_frames[frame_start + len(header):frame_start +
+                      frame_length] = data_symbols[data_start:data_end]
+        frame_start += frame_length
+        data_start = data_end
+
+    return symbol_frames, single_frame_length, header, data_length_with_id
+
+
+def frame_generator_TX_binary(data_length, text_message, header_type,
+                              modulation_type, info, fec='none'):
+    """
+    Frame builder for the binary frame format of 'utils.frame_header'.
+
+    Each frame carries a sequence number, the total number of frames, the payload length and a
+    CRC-16 instead of the '0X..' text IDs, see 'pack_frames'. With a data length of 80 a frame is
+    85 bytes instead of 88. The frames are converted into PAM symbols with one codec call, coded
+    with the forward error correction 'fec' of 'utils.fec', and written after the header and the
+    FEC field signalling the code into a preallocated array like in
+    'frame_generator_TX_preallocated'.
+
+    Args:
+        data_length (int): Number of payload bytes per frame, at most 255.
+        text_message (str): Text message to be transmitted. Characters outside Latin-1 are
+                            replaced by '?'.
+        header_type (str): Type of header to be added to each frame.
+        modulation_type (str): Modulation type for encoding symbols (e.g., "4QAM", "QAM4_2").
+        info (bool): Flag indicating whether to display additional information.
+        fec (str): Forward error correction of 'utils.fec.FEC_CODES'.
+
+    Returns:
+        Tuple[np.ndarray, int, np.ndarray, int]: Tuple containing:
+            symbol_frames (np.ndarray): Generated symbol frames for transmission.
+            single_frame_length (int): Length of a single frame in symbols, FEC field included.
+            header (np.ndarray): Header symbols used in the frames.
+            data_length_with_header (int): Length of a frame in bytes, header and CRC included.
+    """
+    header = barker_generator(header_type, modulation_type=modulation_type)
+    frames = pack_frames(text_message.encode('latin-1', errors='replace'), data_length)
+    data_length_with_header = data_length + FRAME_OVERHEAD
+    single_frame_length = len(header) + FEC_FIELD_LENGTH + coded_length(fec, data_length_with_header)
+    if info:
+        for frame in frames:
+            print(f'Data frame is generated: {frame.hex()}')
+
+    data_symbols = fec_encode(letters_to_pam_lut(b''.join(frames)).reshape(len(frames), -1), fec)
+    field_symbols = fec_field(fec)
+    if modulation_type in MODULATION_MAPPERS:
+        data_symbols = MODULATION_MAPPERS[modulation_type](data_symbols.ravel())
+        field_symbols = MODULATION_MAPPERS[modulation_type](field_symbols)
+
+    symbol_frames = np.empty((len(frames), single_frame_length), dtype=complex)
+    symbol_frames[:, :len(header)] = header
+    symbol_frames[:, len(header):len(header) + FEC_FIELD_LENGTH] = field_symbols
+    symbol_frames[:, len(header) + FEC_FIELD_LENGTH:] = data_symbols.reshape(len(frames), -1)
+    return symbol_frames.ravel(), single_frame_length, header, data_length_with_header
@@ -1,33 +1,80 @@
-from transmission_module.signal_generator_TX import signal_generator
-from transmission_module.frame_generator_TX import frame_generator_TX
-from utils.my_radio import MyRadio
+from transmission_module.signal_generator_TX import signal_generator_cached
+from transmission_module.frame_generator_TX import frame_generator_TX_preallocated, \
+    frame_generator_TX_binary
+from utils.frame_header import DATA_LENGTH
+from utils.instrumentation import INSTRUMENTATION
+from utils.precision import PRECISION
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    # 'adi' is only needed for real hardware, 'SimulatedRadio' runs without it
+    from utils.my_radio import MyRadio
 
 
 
-def operation_TX(my_SDR: MyRadio, msg: str, plotGraphs: bool, info: bool):
+FRAME_GENERATORS = {
+    'text': frame_generator_TX_preallocated,
+    'binary': frame_generator_TX_binary
+}
+
+
+def operation_TX(my_SDR: 'MyRadio', msg: str, plotGraphs: bool, info: bool,
+                 frame_format='text', fec='none'):
+    """
+    Frame, pulse shape and transmit a message in the cyclic TX buffer.
+
+    Args:
+        my_SDR (MyRadio): Custom software-defined radio object, or a SimulatedRadio.
+        msg (str): Message to be transmitted.
+        plotGraphs (bool): Flag to indicate whether to plot the TX signal.
+        info (bool): Flag indicating whether to print additional data.
+        frame_format (str): 'text' for the '0X..' text IDs, 'binary' for the frame header with
+                            CRC of 'utils.frame_header'. The receiver has to use the same format.
+        fec (str): Forward error correction of 'utils.fec' for binary frames. The code is
+                   signalled in every frame, the receiver detects it.
+
+    Raises:
+        ValueError: When the frames of the message do not fit into the cyclic TX buffer, which
+                    would repeat only the start of the message.
+    """
     buffer_length_TX = int(2**18)
     #PULSE
     OVERSAMPLING_RATE = 16
     HALF_NO_OF_SYMBOLS = 6
     ROLLOFF_FACTOR = 0.75
-    DATA_LENGTH = 80
-    my_frames, single_frame_length, my_header, data_len_with_id = frame_generator_TX(
+    if frame_format not in FRAME_GENERATORS:
+        raise ValueError(f'Unknown frame format {frame_format!r}, expected '
+                         f"{' or '.join(repr(name) for name in FRAME_GENERATORS)}")
+    if fec != 'none' and frame_format != 'binary':
+        raise ValueError(f'FEC {fec!r} needs binary frames, not {frame_format!r} frames')
+    options = {'fec': fec} if frame_format == 'binary' else {}
+    timer = INSTRUMENTATION.timer('operation_TX', buffer_length_TX)
+    my_frames, single_frame_length, my_header, data_len_with_id = FRAME_GENERATORS[frame_format](
         data_length=DATA_LENGTH,
         text_message=msg,
         header_type='barker13',
         modulation_type='QAM4_2',
-        info=False)
+        info=False,
+        **options)
+    timer.lap('frame_generator_TX', len(msg))
+    if len(my_frames) * OVERSAMPLING_RATE > buffer_length_TX:
+        number_of_frames = len(my_frames) // single_frame_length
+        frames_in_buffer = buffer_length_TX // (single_frame_length * OVERSAMPLING_RATE)
+        raise ValueError(f'A message of {len(msg)} characters needs {number_of_frames} frames, '
+                         f'the TX buffer holds {frames_in_buffer} {frame_format} frames')
 
-    my_signal = signal_generator(symbol_frames=my_frames,
-                                 buffer_len_TX=buffer_length_TX,
-                                 oversampling_rate=OVERSAMPLING_RATE,
-                                 half_number_of_symbols=HALF_NO_OF_SYMBOLS,
-                                 beta=ROLLOFF_FACTOR,
-                                 signal_or_symbols=1,
-                                 visualize=plotGraphs,
-                                 print_data=False)
+    my_signal = signal_generator_cached(
+        symbol_frames=my_frames,
+        buffer_len_TX=buffer_length_TX,
+        oversampling_rate=OVERSAMPLING_RATE,
+        half_number_of_symbols=HALF_NO_OF_SYMBOLS,
+        beta=ROLLOFF_FACTOR,
+        signal_or_symbols=1,
+        visualize=plotGraphs,
+        print_data=False,
+        dtype=PRECISION.complex_dtype)
 
     my_signal = my_signal[:buffer_length_TX]
+    timer.lap('signal_generator', buffer_length_TX)
     if info:
         print(f'Appended Symbol Frames Length = {len(my_frames)}')
         print(f'Symbol Frames = {my_frames[:50]}')
@@ -37,3 +84,5 @@ def operation_TX(my_SDR: MyRadio, msg: str, plotGraphs: bool, info: bool):
         
 
     my_SDR.transmit_samples(my_signal)
+    timer.lap('transmit_samples', buffer_length_TX)
+    timer.finish()
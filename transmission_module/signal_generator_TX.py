@@ -1,8 +1,8 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from utils.pulse_shape import srrc
+from utils.pulse_shape import srrc, srrc_cached
 from scipy import signal
 from utils.oversample import oversample
+from utils.fir_filter import OverlapSaveFilter
 import sys as sys
 
 """
@@ -55,52 +55,127 @@ def signal_generator(symbol_frames, buffer_len_TX, oversampling_rate,
         )
 
     if signal_or_symbols:
-        signal_real = signal.convolve(appended_oversampled_symbols_real,
-                                      my_pulse, 'full')
-        signal_imag = signal.convolve(appended_oversampled_symbols_imag,
-                                      my_pulse, 'full')
-        my_signal = signal_real + 1j * signal_imag
+        # Real and imaginary parts are shaped together in one complex overlap-save pass
+        my_signal = OverlapSaveFilter(my_pulse).filter(
+            appended_oversampled_symbols_real + 1j * appended_oversampled_symbols_imag, 'full')
     else:
         my_signal = appended_oversampled_symbols_real + 1j * appended_oversampled_symbols_imag
 
     # DISPLAY
     if visualize:
+        signal_generator_visualize(pulse, appended_oversampled_symbols_real,
+                                   appended_oversampled_symbols_imag,
+                                   my_signal)
+    return my_signal
 
-        fig0, axs = plt.subplots(figsize=(12.8, 9.6))
-        fig0.suptitle("SRRC Pulse Shape", fontsize=20)
-        axs.set_ylabel("Amplitude", fontsize=16)
-        axs.set_xlabel("Samples", fontsize=16)
-        axs.stem(pulse)
-        fig0.tight_layout()
-
-        fig1, axs = plt.subplots(3, 1, figsize=(12.8, 9.6))
-        n = np.linspace(0, len(my_signal), len(my_signal), endpoint=True)
-        axs[0].set_title('Real Oversampled and Appended Symbol Frames', fontsize=18)
-        axs[0].plot(appended_oversampled_symbols_real,
-                    'r',
-                    label='Real',
-                    marker='^',
-                    linestyle='None',
-                    markersize=6)
-        axs[1].set_title('Imaginary Oversampled and Appended Symbol Frames', fontsize=18)
-        axs[1].plot(appended_oversampled_symbols_imag,
-                    'b',
-                    label='Imag',
-                    marker='v',
-                    linestyle='None',
-                    markersize=6)
-        axs[0].legend()
-        axs[0].set_xlabel("Samples", fontsize=16)
-        axs[0].set_ylabel("Amplitude", fontsize=16)
-        axs[0].grid(markevery=2)
-        axs[1].legend()
-        axs[1].set_xlabel("Samples", fontsize=16)
-        axs[1].set_ylabel("Amplitude", fontsize=16)
-        axs[1].grid(markevery=2)
-        axs[2].plot(n, np.real(my_signal), 'r', label='Real')
-        axs[2].plot(n, np.imag(my_signal), 'b', label='Imag')
-        axs[2].set_xlabel("Samples", fontsize=16)
-        axs[2].set_ylabel("Amplitude", fontsize=16)
-        axs[2].set_title('Tx Signal', fontsize=18)
-        fig1.tight_layout()
-    return my_signal
\ No newline at end of file
+
+def signal_generator_visualize(pulse, appended_oversampled_symbols_real,
+                               appended_oversampled_symbols_imag, my_signal):
+    import matplotlib.pyplot as plt
+
+    fig0, axs = plt.subplots(figsize=(12.8, 9.6))
+    fig0.suptitle("SRRC Pulse Shape", fontsize=20)
+    axs.set_ylabel("Amplitude", fontsize=16)
+    axs.set_xlabel("Samples", fontsize=16)
+    axs.stem(pulse)
+    fig0.tight_layout()
+
+    fig1, axs = plt.subplots(3, 1, figsize=(12.8, 9.6))
+    n = np.linspace(0, len(my_signal), len(my_signal), endpoint=True)
+    axs[0].set_title('Real Oversampled and Appended Symbol Frames', fontsize=18)
+    axs[0].plot(appended_oversampled_symbols_real,
+                'r',
+                label='Real',
+                marker='^',
+                linestyle='None',
+                markersize=6)
+    axs[1].set_title('Imaginary Oversampled and Appended Symbol Frames', fontsize=18)
+    axs[1].plot(appended_oversampled_symbols_imag,
+                'b',
+                label='Imag',
+                marker='v',
+                linestyle='None',
+                markersize=6)
+    axs[0].legend()
+    axs[0].set_xlabel("Samples", fontsize=16)
+    axs[0].set_ylabel("Amplitude", fontsize=16)
+    axs[0].grid(markevery=2)
+    axs[1].legend()
+    axs[1].set_xlabel("Samples", fontsize=16)
+    axs[1].set_ylabel("Amplitude", fontsize=16)
+    axs[1].grid(markevery=2)
+    axs[2].plot(n, np.real(my_signal), 'r', label='Real')
+    axs[2].plot(n, np.imag(my_signal), 'b', label='Imag')
+    axs[2].set_xlabel("Samples", fontsize=16)
+    axs[2].set_ylabel("Amplitude", fontsize=16)
+    axs[2].set_title('Tx Signal', fontsize=18)
+    fig1.tight_layout()
+
+
+def signal_generator_cached(symbol_frames, buffer_len_TX, oversampling_rate,
+                            half_number_of_symbols, beta, signal_or_symbols,
+                            visualize, print_data, dtype=complex):
+    """
+    Generate the transmit signal by shaping one period of symbols and tiling it into the buffer.
+
+    Instead of zero-stuffing, tiling the oversampled symbols up to 'buffer_len_TX' and convolving
+    the real and imaginary parts over the full buffer, the complex symbols of one period are
+    shaped directly with a polyphase 'upfirdn' filter. The last symbols of the period are
+    prepended so that the shaped period is the circular convolution of the cyclic symbol stream,
+    and the shaped period is then repeated up to 'buffer_len_TX'. The SRRC pulse is taken from
+    'srrc_cached', so it is generated once per parameter set.
+
+    Args:
+        symbol_frames (np.ndarray): Symbol frames generated by `frame_generator_TX`.
+        buffer_len_TX (int): Length of the transmit samples in SDR.
+        oversampling_rate (int): Number of samples in one symbol.
+        half_number_of_symbols (int): Number of symbols in half length of SRRC Pulse.
+        beta (float): Beta parameter of SRRC Pulse.
+        signal_or_symbols (int): Flag to indicate whether to return the signal or symbols.
+                                 1 for signal, 0 for symbols.
+        visualize (bool): Flag indicating whether to display visualization plots.
+        print_data (bool): Flag indicating whether to print additional data.
+        dtype (optional): Complex data type of the signal, complex by default. With complex64
+                          the symbols are shaped with a float32 pulse.
+
+    Returns:
+        my_signal(np.ndarray): Generated transmit signal or symbols of length 'buffer_len_TX'.
+
+    Note:
+        Apart from the first pulse length of samples, where 'signal_generator' has the start-up
+        transient of its linear convolution, the output equals the first 'buffer_len_TX'
+        samples of 'signal_generator'.
+    """
+    P = oversampling_rate
+    symbol_frames = np.asarray(symbol_frames, dtype=dtype)
+    pulse = srrc_cached(half_number_of_symbols, beta, P,
+                        dtype=symbol_frames.real.dtype)
+    block_len_TX = len(symbol_frames) * P
+    if print_data:
+        print(f'Oversampled Symbol Array Length = {block_len_TX}')
+        print(f'Oversampled and Repeated Symbol Array Length = {buffer_len_TX}')
+
+    if signal_or_symbols:
+        # Symbols of the previous period whose pulses reach into this period
+        history = -(-(len(pulse) - 1) // P)
+        # A period longer than the buffer is only shaped as far as it is transmitted
+        shaped_length = min(block_len_TX, buffer_len_TX)
+        extended_symbols = np.take(symbol_frames,
+                                   np.arange(-history, -(-shaped_length // P)),
+                                   mode='wrap')
+        shaped_period = signal.upfirdn(pulse, extended_symbols, up=P)
+        my_signal = np.resize(
+            shaped_period[history * P:history * P + shaped_length],
+            buffer_len_TX)
+    else:
+        oversampled_symbols = np.zeros(block_len_TX, dtype=symbol_frames.dtype)
+        oversampled_symbols[::P] = symbol_frames
+        my_signal = np.resize(oversampled_symbols, buffer_len_TX)
+
+    if visualize:
+        oversampled_symbols = np.zeros(block_len_TX, dtype=complex)
+        oversampled_symbols[::P] = symbol_frames
+        oversampled_symbols = np.resize(oversampled_symbols, buffer_len_TX)
+        signal_generator_visualize(pulse, np.real(oversampled_symbols),
+                                   np.imag(oversampled_symbols), my_signal)
+    return my_signal
@@ -0,0 +1,129 @@
+from ast import literal_eval
+from collections import OrderedDict
+from threading import Lock
+from numpy import load, savez
+
+
+class DesignCache:
+    """
+    Process-wide, bounded LRU cache for filter and pulse designs.
+
+    Designs are keyed by a tuple of the design name and its parameters. Cached arrays are made
+    read-only, so a caller cannot corrupt the design shared with every other caller. Once
+    'maxsize' designs are held, the least recently used one is evicted. The cache can be saved
+    to and loaded from a '.npz' file, so that a cold start does not pay for Remez designs.
+
+    Args:
+        maxsize (int): Maximum number of designs held in the cache.
+
+    Example:
+        taps = DESIGN_CACHE.get(('lp', fs, 201), lambda: remez(...))
+        print(DESIGN_CACHE)   # hits, misses, evictions and size
+    """
+
+    def __init__(self, maxsize: int = 64):
+        self._maxsize = maxsize
+        self._designs = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        return (f'DesignCache(size={len(self)}, maxsize={self._maxsize}, '
+                f'hits={self.hits}, misses={self.misses}, '
+                f'evictions={self.evictions})')
+
+    def __len__(self):
+        return len(self._designs)
+
+    def __contains__(self, key):
+        return key in self._designs
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    def info(self):
+        """
+        Return the hit/miss counters of the cache.
+
+        Returns:
+            dict: hits, misses, evictions, size and maxsize.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._designs),
+                'maxsize': self._maxsize
+            }
+
+    def get(self, key, design):
+        """
+        Return the cached design for 'key', calling 'design()' to generate it on a miss.
+
+        Args:
+            key (tuple): Design name followed by the design parameters.
+            design (callable): Function without arguments returning the design as an array.
+
+        Returns:
+            numpy.ndarray: Read-only design array.
+        """
+        with self._lock:
+            if key in self._designs:
+                self._designs.move_to_end(key)
+                self.hits += 1
+                return self._designs[key]
+            self.misses += 1
+        value = design()
+        value.setflags(write=False)
+        with self._lock:
+            self._insert(key, value)
+        return value
+
+    def clear(self):
+        """
+        Drop every design and reset the counters.
+        """
+        with self._lock:
+            self._designs.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def save(self, path):
+        """
+        Save every cached design to a '.npz' file.
+
+        Args:
+            path (str): File path of the cache file.
+        """
+        with self._lock:
+            designs = {repr(key): value for key, value in self._designs.items()}
+        savez(path, **designs)
+
+    def load(self, path):
+        """
+        Load designs saved with 'save'. Loaded designs do not count as hits or misses.
+
+        Args:
+            path (str): File path of the cache file.
+        """
+        with load(path) as designs:
+            loaded = [(literal_eval(key), designs[key]) for key in designs.files]
+        with self._lock:
+            for key, value in loaded:
+                value.setflags(write=False)
+                self._insert(key, value)
+
+    def _insert(self, key, value):
+        self._designs[key] = value
+        self._designs.move_to_end(key)
+        while len(self._designs) > self._maxsize:
+            self._designs.popitem(last=False)
+            self.evictions += 1
+
+
+DESIGN_CACHE = DesignCache()
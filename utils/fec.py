@@ -0,0 +1,215 @@
+from numpy import abs, add, arange, array, argmin, asarray, clip, concatenate, empty, empty_like, \
+    float32, full, inf, less, minimum, rint, stack, uint8, zeros
+from .symbol_conversion import PAM_LEVELS
+"""
+    Forward error correction of the PAM symbols of binary frames.
+
+    The codes work on the PAM symbols of 'letters_to_pam_lut', four per byte, and return PAM
+    symbols, so they sit between 'letters_to_pam_lut' and the QAM mapper on TX and between the
+    slicer and 'pam_to_bytes_lut' on RX. Every row of the 2-D arrays is one frame, coded and
+    decoded independently, and all frames of a buffer are handled in one call.
+
+        'none':          No coding, four symbols per byte.
+        'hamming':       Hamming(7,4) code, seven symbols per byte. The two nibbles of a byte are
+                         coded into two codewords and symbol i carries bit i of both codewords,
+                         so any single symbol error per seven symbols is corrected.
+        'convolutional': Rate 1/2 convolutional code of constraint length 7, generators 133 and
+                         171 octal, terminated with six zero bits, eight symbols per byte plus
+                         six per frame. The two coded bits of a step are Gray mapped to one PAM
+                         symbol and decoded with a Viterbi decoder vectorized over frames and
+                         states, using the distance to the received PAM value as branch metric.
+
+    The code of a frame is signalled by the 'FEC_FIELD_LENGTH' uncoded symbols of 'fec_field'
+    after the Barker header. The fields of the codes differ in half of their symbols, so the
+    receiver detects the code of every frame with 'detect_fec' before decoding it.
+"""
+
+FEC_CODES = ('none', 'hamming', 'convolutional')
+FEC_FIELD_LENGTH = 8
+FEC_FIELDS = array([[3, 3, 3, 3, 3, 3, 3, 3],
+                    [3, -3, 3, -3, 3, -3, 3, -3],
+                    [3, 3, -3, -3, 3, 3, -3, -3]])
+
+HAMMING_GENERATOR = array([[1, 0, 0, 0, 1, 1, 0],
+                           [0, 1, 0, 0, 1, 0, 1],
+                           [0, 0, 1, 0, 0, 1, 1],
+                           [0, 0, 0, 1, 1, 1, 1]])
+# Row n holds the codeword of nibble n, most significant bit first
+HAMMING_CODEWORDS = ((arange(16)[:, None] >> arange(3, -1, -1)) & 1) @ HAMMING_GENERATOR % 2
+# Entry w holds the nibble of the codeword nearest to the 7-bit word w
+HAMMING_DECODE = argmin(
+    (((arange(128)[:, None] >> arange(6, -1, -1)) & 1)[:, None, :] !=
+     HAMMING_CODEWORDS[None, :, :]).sum(axis=2), axis=1)
+
+CONSTRAINT_LENGTH = 7
+MEMORY = CONSTRAINT_LENGTH - 1
+NUMBER_OF_STATES = 2**MEMORY
+GENERATORS = (0o133, 0o171)
+# PAM symbol of the coded bit pair 2 * b0 + b1, neighbouring levels differ in one bit
+GRAY_PAM = array([-3, -1, 3, 1])
+
+
+def _parity(values):
+    return array([bin(value).count('1') & 1 for value in values])
+
+
+def _trellis():
+    # State s holds the last six input bits, the latest one in bit 5. Input b moves state s to
+    # (b << 5) | (s >> 1), and the coded bits are the parities of the register (b << 6) | s
+    # masked with the generators. The predecessors of state (b << 5) | j are the states 2j and
+    # 2j + 1, entry [b, j, x] holds the PAM level index of the branch from state 2j + x.
+    inputs = arange(2)[:, None, None]
+    halves = arange(NUMBER_OF_STATES // 2)[:, None]
+    registers = ((inputs << MEMORY) | (halves << 1) | arange(2)).ravel()
+    coded = [_parity(registers & generator) for generator in GENERATORS]
+    return ((GRAY_PAM[2 * coded[0] + coded[1]] + 3) // 2).reshape(2, NUMBER_OF_STATES // 2, 2)
+
+
+TRELLIS_BRANCHES = _trellis()
+
+
+def fec_field(fec):
+    """
+    PAM symbols signalling the code 'fec'.
+    """
+    return FEC_FIELDS[fec_index(fec)]
+
+
+def fec_index(fec):
+    """
+    Index of the code 'fec' in 'FEC_CODES', ValueError for an unknown code.
+    """
+    if fec not in FEC_CODES:
+        raise ValueError(f'Unknown FEC {fec!r}, expected '
+                         f"{' or '.join(repr(name) for name in FEC_CODES)}")
+    return FEC_CODES.index(fec)
+
+
+def detect_fec(fields):
+    """
+    Detect the code of every frame from its received field.
+
+    Args:
+        fields (numpy.ndarray): (number_of_frames, FEC_FIELD_LENGTH) received PAM values.
+
+    Returns:
+        numpy.ndarray: Index in 'FEC_CODES' of the field nearest to every row.
+    """
+    distances = abs(asarray(fields)[:, None, :] - FEC_FIELDS[None, :, :]).sum(axis=2)
+    return argmin(distances, axis=1)
+
+
+def coded_length(fec, number_of_bytes):
+    """
+    Number of coded PAM symbols of a frame of 'number_of_bytes' bytes.
+    """
+    symbols_per_byte = (4, 7, 8)[fec_index(fec)]
+    return symbols_per_byte * number_of_bytes + (MEMORY if fec == 'convolutional' else 0)
+
+
+def fec_encode(symbols_PAM, fec):
+    """
+    Encode the PAM symbols of every frame.
+
+    Args:
+        symbols_PAM (numpy.ndarray): (number_of_frames, 4 * number_of_bytes) PAM symbols.
+        fec (str): Code of 'FEC_CODES'.
+
+    Returns:
+        numpy.ndarray: (number_of_frames, coded_length(fec, number_of_bytes)) PAM symbols.
+    """
+    symbols_PAM = asarray(symbols_PAM)
+    index = fec_index(fec)
+    if index == 0:
+        return symbols_PAM
+    digits = ((symbols_PAM.astype(int) + 3) // 2) & 3
+    if index == 1:
+        return _hamming_encode(digits)
+    return _convolutional_encode(digits)
+
+
+def fec_decode(symbols_PAM, fec):
+    """
+    Decode the received PAM values of every frame.
+
+    Args:
+        symbols_PAM (numpy.ndarray): (number_of_frames, coded_length) received PAM values. Values
+                                     between the levels, e.g. the mean of two disagreeing axes,
+                                     are used as they are by the Viterbi decoder and rounded to
+                                     the nearest level by the other codes.
+        fec (str): Code of 'FEC_CODES'.
+
+    Returns:
+        numpy.ndarray: (number_of_frames, 4 * number_of_bytes) decoded PAM symbols.
+    """
+    symbols_PAM = asarray(symbols_PAM)
+    index = fec_index(fec)
+    if index == 2:
+        return _viterbi_decode(symbols_PAM)
+    levels = 2 * clip(rint((symbols_PAM + 3) / 2), 0, 3).astype(int) - 3
+    if index == 0:
+        return levels
+    return _hamming_decode((levels + 3) // 2)
+
+
+def _hamming_encode(digits):
+    number_of_frames = len(digits)
+    nibbles = (digits[:, 0::2] << 2) | digits[:, 1::2]
+    codewords = HAMMING_CODEWORDS[nibbles].reshape(number_of_frames, -1, 2, 7)
+    coded_digits = 2 * codewords[:, :, 0] + codewords[:, :, 1]
+    return 2 * coded_digits.reshape(number_of_frames, -1) - 3
+
+
+def _hamming_decode(digits):
+    number_of_frames = len(digits)
+    digits = digits.reshape(number_of_frames, -1, 7)
+    weights = 1 << arange(6, -1, -1)
+    high = HAMMING_DECODE[(digits >> 1) @ weights]
+    low = HAMMING_DECODE[(digits & 1) @ weights]
+    decoded = stack((high >> 2, high & 3, low >> 2, low & 3), axis=2)
+    return 2 * decoded.reshape(number_of_frames, -1) - 3
+
+
+def _convolutional_encode(digits):
+    number_of_frames = len(digits)
+    bits = stack((digits >> 1, digits & 1), axis=2).reshape(number_of_frames, -1)
+    steps = bits.shape[1] + MEMORY
+    # MEMORY zeros of initial state, the bits and MEMORY zeros of termination
+    padded = concatenate((zeros((number_of_frames, MEMORY), dtype=int), bits,
+                          zeros((number_of_frames, MEMORY), dtype=int)), axis=1)
+    coded = []
+    for generator in GENERATORS:
+        output = zeros((number_of_frames, steps), dtype=int)
+        for delay in range(CONSTRAINT_LENGTH):
+            if generator >> (MEMORY - delay) & 1:
+                output ^= padded[:, MEMORY - delay:MEMORY - delay + steps]
+        coded.append(output)
+    return GRAY_PAM[2 * coded[0] + coded[1]]
+
+
+def _viterbi_decode(symbols_PAM):
+    # One add-compare-select over all frames and states per step, on the even and odd
+    # predecessors of the butterflies, then one traceback from the terminating state 0
+    number_of_frames, steps = symbols_PAM.shape
+    branch_metrics = abs(symbols_PAM.T[:, :, None].astype(float32) - PAM_LEVELS.astype(float32))
+    even_branches, odd_branches = TRELLIS_BRANCHES[:, :, 0], TRELLIS_BRANCHES[:, :, 1]
+    metrics = full((number_of_frames, NUMBER_OF_STATES), inf, dtype=float32)
+    metrics[:, 0] = 0
+    decisions = empty((steps, number_of_frames, 2, NUMBER_OF_STATES // 2), dtype=uint8)
+    from_even = empty((number_of_frames, 2, NUMBER_OF_STATES // 2), dtype=float32)
+    from_odd = empty_like(from_even)
+    for step in range(steps):
+        add(metrics[:, None, 0::2], branch_metrics[step][:, even_branches], out=from_even)
+        add(metrics[:, None, 1::2], branch_metrics[step][:, odd_branches], out=from_odd)
+        less(from_odd, from_even, out=decisions[step], casting='unsafe')
+        metrics = minimum(from_even, from_odd).reshape(number_of_frames, NUMBER_OF_STATES)
+
+    decisions = decisions.reshape(steps, -1)
+    offsets = arange(number_of_frames) * NUMBER_OF_STATES
+    states = zeros(number_of_frames, dtype=int)
+    bits = empty((steps, number_of_frames), dtype=int)
+    for step in range(steps - 1, -1, -1):
+        bits[step] = states >> (MEMORY - 1)
+        states = ((states & (NUMBER_OF_STATES // 2 - 1)) << 1) | decisions[step, offsets + states]
+    digits = 2 * bits[0:steps - MEMORY:2] + bits[1:steps - MEMORY:2]
+    return 2 * digits.T - 3
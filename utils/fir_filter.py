@@ -0,0 +1,162 @@
+from numpy import asarray, complex64, empty, promote_types, result_type, zeros
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.fft import fft, ifft
+from .design_cache import DESIGN_CACHE
+
+
+class OverlapSaveFilter:
+    """
+    Streaming FIR filter evaluated in the frequency domain with overlap-save.
+
+    The input is cut into segments of 'fft_length' samples overlapping by len(taps) - 1 samples.
+    All segments of a call are transformed with one batched FFT, multiplied with the spectrum of
+    the taps and transformed back, and the first len(taps) - 1 outputs of every segment, which
+    hold the circular wrap-around, are discarded. The spectrum of the taps is computed once per
+    FFT length and kept in 'DESIGN_CACHE', so filters with the same taps share it.
+
+    'filter' convolves one buffer like 'scipy.signal.convolve'. 'process' treats consecutive
+    buffers as one stream: the last len(taps) - 1 input samples are kept as the tail of the next
+    call, so the outputs of consecutive calls equal the causal filter output of the whole stream.
+
+    Args:
+        taps (numpy.ndarray): Real or complex filter taps, e.g. an SRRC pulse.
+        fft_length (int, optional): FFT length, longer than the taps and preferably a power of
+                                    two. Chosen per call from the number of outputs when None.
+
+    Example:
+        matched_filter = OverlapSaveFilter(pulse * np.max(pulse))
+        while True:
+            matched_filtered = matched_filter.process(baseband_signal)
+    """
+
+    def __init__(self, taps, fft_length=None):
+        self._taps = asarray(taps)
+        if fft_length is not None and fft_length < len(self._taps):
+            raise ValueError(f'FFT length {fft_length} is shorter than the '
+                             f'{len(self._taps)} taps')
+        self._fft_length = fft_length
+        self.reset()
+
+    def __repr__(self):
+        return f'OverlapSaveFilter(taps={len(self._taps)}, fft_length={self._fft_length})'
+
+    @property
+    def taps(self):
+        return self._taps
+
+    def reset(self):
+        """
+        Clear the tail, the next call of 'process' starts a new stream.
+        """
+        self._tail = zeros(len(self._taps) - 1, dtype=promote_types(self._taps.dtype, complex64))
+
+    def filter(self, samples, mode='full', out=None):
+        """
+        Convolve one buffer with the taps, without touching the tail of the stream.
+
+        Args:
+            samples (numpy.ndarray): Input samples.
+            mode (str): 'full', 'same' or 'valid', as in 'scipy.signal.convolve'.
+            out (numpy.ndarray, optional): Array for the output, of the length given by 'mode'.
+
+        Returns:
+            numpy.ndarray: Filtered samples.
+        """
+        samples = asarray(samples)
+        number_of_taps = len(self._taps)
+        if mode == 'full':
+            start, count = 0, len(samples) + number_of_taps - 1
+        elif mode == 'same':
+            start, count = (number_of_taps - 1) // 2, len(samples)
+        elif mode == 'valid':
+            start, count = number_of_taps - 1, max(len(samples) - number_of_taps + 1, 0)
+        else:
+            raise ValueError(f"Unknown mode {mode!r}, expected 'full', 'same' or 'valid'")
+        return self._convolve(None, samples, start, count, out)
+
+    def process(self, samples, out=None):
+        """
+        Filter the next buffer of the stream.
+
+        Args:
+            samples (numpy.ndarray): Input samples of the buffer.
+            out (numpy.ndarray, optional): Array of len(samples) elements for the output.
+
+        Returns:
+            numpy.ndarray: One output per input sample, delayed by the filter like a causal FIR.
+        """
+        samples = asarray(samples)
+        tail_dtype = promote_types(self._tail.dtype, samples.dtype)
+        if tail_dtype != self._tail.dtype:
+            self._tail = self._tail.astype(tail_dtype)
+        out = self._convolve(self._tail, samples, 0, len(samples), out)
+
+        history = len(self._tail)
+        if len(samples) >= history:
+            self._tail[:] = samples[len(samples) - history:]
+        elif len(samples):
+            self._tail[:history - len(samples)] = self._tail[len(samples):]
+            self._tail[history - len(samples):] = samples
+        return out
+
+    def _convolve(self, history, samples, start, count, out):
+        # The stream is len(taps) - 1 samples of history, zeros when None, followed by the
+        # samples and by zeros. Output n is sum(taps[j] * stream[n + len(taps) - 1 - j]), so
+        # output 0 is the first output of the full convolution of the samples, and outputs
+        # start to start + count are computed.
+        number_of_taps = len(self._taps)
+        dtype = result_type(samples.dtype, self._taps.dtype, complex64)
+        if out is None:
+            out = empty(count, dtype=dtype)
+        if count == 0:
+            return out
+        fft_length = self._fft_length or self.fft_length_for(count)
+        step = fft_length - number_of_taps + 1
+        number_of_segments = -(-count // step)
+
+        # Segment k starts at stream sample start + k * step
+        extended = zeros((number_of_segments - 1) * step + fft_length, dtype=dtype)
+        history_length = number_of_taps - 1
+        if history is not None:
+            history_used = history[start:]
+            extended[:len(history_used)] = history_used
+        position = history_length - start
+        used = samples[max(-position, 0):len(extended) - position]
+        extended[max(position, 0):max(position, 0) + len(used)] = used
+
+        segments = sliding_window_view(extended, fft_length)[::step]
+        spectrum = fft(segments, axis=1)
+        spectrum *= self._spectrum(fft_length, dtype)
+        filtered = ifft(spectrum, axis=1, overwrite_x=True)
+        out[:] = filtered[:, number_of_taps - 1:].reshape(-1)[:count]
+        return out
+
+    def _spectrum(self, fft_length, dtype):
+        key = ('overlap_save_spectrum', self._taps.dtype.str, self._taps.tobytes(),
+               int(fft_length), dtype.str)
+        return DESIGN_CACHE.get(key, lambda: fft(self._taps.astype(dtype), fft_length))
+
+    def fft_length_for(self, count):
+        """
+        FFT length used for 'count' outputs when none is fixed.
+
+        Args:
+            count (int): Number of outputs of the call.
+
+        Returns:
+            int: The power of two with the fewest FFT operations for all outputs, no longer than
+                 needed to hold the outputs in one segment.
+        """
+        number_of_taps = len(self._taps)
+        fft_length = 2
+        while fft_length < 2 * number_of_taps:
+            fft_length *= 2
+        best, best_cost = fft_length, None
+        while True:
+            step = fft_length - number_of_taps + 1
+            cost = fft_length * fft_length.bit_length() * -(-count // step)
+            if best_cost is None or cost < best_cost:
+                best, best_cost = fft_length, cost
+            if step >= count:
+                return best
+            fft_length *= 2
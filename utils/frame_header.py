@@ -0,0 +1,79 @@
+from binascii import crc_hqx
+"""
+    Binary frame format carried between the Barker headers.
+
+    Every frame is a header of three bytes, the sequence number of the frame, the total number
+    of frames of the message and the number of payload bytes, followed by 'data_length' payload
+    bytes, padded with 'FRAME_PADDING', and the CRC-16 of header and payload, big endian. The
+    CRC is the CCITT polynomial 0x1021 with the initial value 0xFFFF. Compared with the text IDs
+    '0X..' before and after the text, the overhead is five bytes instead of eight, frame
+    boundaries do not depend on the content, and corrupted frames are rejected by the CRC.
+"""
+
+FRAME_HEADER_LENGTH = 3
+FRAME_CRC_LENGTH = 2
+FRAME_OVERHEAD = FRAME_HEADER_LENGTH + FRAME_CRC_LENGTH
+# The total number of frames is one byte of the header
+MAX_FRAMES = 255
+MAX_DATA_LENGTH = 255
+# Payload bytes of a binary frame and payload characters of a text frame sent by 'operation_TX'
+DATA_LENGTH = 80
+CRC_INIT = 0xFFFF
+# Filler of the last frame of a message, binary and text frames, for up to 'MAX_DATA_LENGTH'
+FRAME_PADDING = b"ABCDEFGHIJKLMNOPQRSTUVWXYZ01234567890" * 7
+
+
+def crc16(data):
+    """
+    CRC-16/CCITT of 'data', computed in C by 'binascii.crc_hqx'.
+    """
+    return crc_hqx(data, CRC_INIT)
+
+
+def pack_frames(message, data_length):
+    """
+    Split a message into binary frames.
+
+    Args:
+        message (bytes): Message to be transmitted.
+        data_length (int): Number of payload bytes per frame, at most 'MAX_DATA_LENGTH'.
+
+    Returns:
+        list: Frames as bytes of data_length + FRAME_OVERHEAD bytes each, at least one frame.
+    """
+    if not 0 < data_length <= MAX_DATA_LENGTH:
+        raise ValueError(f'Data length {data_length} is not in 1..{MAX_DATA_LENGTH}')
+    number_of_frames = max(-(-len(message) // data_length), 1)
+    if number_of_frames > MAX_FRAMES:
+        raise ValueError(f'A message of {len(message)} bytes needs {number_of_frames} frames, '
+                         f'at most {MAX_FRAMES} frames of {data_length} bytes can be sent')
+    frames = []
+    for sequence in range(number_of_frames):
+        payload = message[sequence * data_length:(sequence + 1) * data_length]
+        frame = bytes((sequence, number_of_frames, len(payload))) + payload + \
+            FRAME_PADDING[:data_length - len(payload)]
+        frames.append(frame + crc16(frame).to_bytes(FRAME_CRC_LENGTH, 'big'))
+    return frames
+
+
+def unpack_frame(frame):
+    """
+    Check and split one received binary frame.
+
+    Args:
+        frame (bytes): Received frame of data_length + FRAME_OVERHEAD bytes.
+
+    Returns:
+        tuple: (sequence, total, payload) of the frame, None when the CRC or a header field is
+               invalid.
+    """
+    if len(frame) <= FRAME_OVERHEAD:
+        return None
+    body = frame[:-FRAME_CRC_LENGTH]
+    if crc16(body) != int.from_bytes(frame[-FRAME_CRC_LENGTH:], 'big'):
+        return None
+    sequence, total, length = body[:FRAME_HEADER_LENGTH]
+    if sequence >= total or length > len(body) - FRAME_HEADER_LENGTH:
+        return None
+    return sequence, total, body[FRAME_HEADER_LENGTH:FRAME_HEADER_LENGTH + length]
+
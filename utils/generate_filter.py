@@ -1,5 +1,6 @@
 from numpy import zeros
 from scipy.signal import remez
+from .design_cache import DESIGN_CACHE
 
 
 def generate_filter(fs, filter_type, center_freq, bandwidth, transition_width,
@@ -59,4 +60,25 @@ def generate_filter(fs, filter_type, center_freq, bandwidth, transition_width,
             0.5 * sampling_freq
         ]
         taps = remez(number_of_taps, edges, [0, 1, 0], fs=sampling_freq)
-    return taps
\ No newline at end of file
+    return taps
+
+
+def generate_filter_cached(fs, filter_type, center_freq, bandwidth,
+                           transition_width, number_of_taps):
+    """
+    Memoized 'generate_filter'.
+
+    The Remez design runs once per parameter set and is then served from the process-wide
+    'DESIGN_CACHE'. The returned array is read-only and shared by every caller.
+
+    Parameters:
+    Same as 'generate_filter'.
+
+    Returns:
+        taps(numpy.ndarray): Read-only array of filter tap coefficients.
+    """
+    key = ('generate_filter', float(fs), filter_type, float(center_freq),
+           float(bandwidth), float(transition_width), int(number_of_taps))
+    return DESIGN_CACHE.get(
+        key, lambda: generate_filter(fs, filter_type, center_freq, bandwidth,
+                                     transition_width, number_of_taps))
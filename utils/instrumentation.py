@@ -0,0 +1,236 @@
+import json
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from time import perf_counter
+from numpy import percentile
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class StageStatistics:
+    """
+    Counters and a rolling window of durations for one stage of one operation.
+
+    Args:
+        window (int): Number of most recent durations used for the percentiles.
+    """
+
+    def __init__(self, window):
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.total_samples = 0
+        self.last_buffer_size = 0
+        self.durations = deque(maxlen=window)
+
+    def record(self, duration, samples, buffer_size):
+        self.calls += 1
+        self.total_seconds += duration
+        self.total_samples += samples
+        self.last_buffer_size = buffer_size
+        self.durations.append(duration)
+
+    def summary(self):
+        quantiles = percentile(list(self.durations),
+                               [100 * q for q in QUANTILES]) if self.durations else []
+        return {
+            'calls': self.calls,
+            'total_seconds': self.total_seconds,
+            'total_samples': self.total_samples,
+            'last_buffer_size': self.last_buffer_size,
+            'quantiles': {str(q): float(value) for q, value in zip(QUANTILES, quantiles)}
+        }
+
+
+class StageTimer:
+    """
+    Time consecutive stages of one 'operation_RX' or 'operation_TX' call.
+
+    Each 'lap' closes the stage running since the previous lap, or since the timer was created.
+    'finish' records the whole call as the stage 'total'.
+    """
+
+    def __init__(self, instrumentation, operation, buffer_size):
+        self._instrumentation = instrumentation
+        self._operation = operation
+        self._buffer_size = buffer_size
+        self._laps = []
+        self._start = self._last = perf_counter()
+
+    def lap(self, stage, samples=0):
+        now = perf_counter()
+        self._laps.append((stage, now - self._last, samples))
+        self._last = now
+
+    def finish(self):
+        self._laps.append(('total', perf_counter() - self._start, self._buffer_size))
+        self._instrumentation.record(self._operation, self._laps, self._buffer_size)
+
+
+class NullStageTimer:
+    """
+    Stage timer handed out while instrumentation is off, every method is a no-op.
+    """
+
+    def lap(self, stage, samples=0):
+        pass
+
+    def finish(self):
+        pass
+
+
+NULL_STAGE_TIMER = NullStageTimer()
+
+
+class Instrumentation:
+    """
+    Opt-in per-stage timing of 'operation_RX' and 'operation_TX'.
+
+    While disabled, 'timer' returns a shared no-op timer, so an instrumented call only pays for a
+    few empty method calls. While enabled, every call records the duration and the number of
+    processed samples of each stage, together with the buffer size of the call. Counters are kept
+    since 'enable' and percentiles over the last 'window' calls. The statistics can be exported
+    as a dictionary, as JSON or in the Prometheus text format, and served on localhost.
+
+    Args:
+        window (int): Number of most recent calls used for the rolling percentiles.
+
+    Example:
+        INSTRUMENTATION.enable()
+        server = INSTRUMENTATION.serve(port=9464)   # http://127.0.0.1:9464/metrics
+        operation_RX(my_SDR, False)
+        print(INSTRUMENTATION.to_json())
+    """
+
+    def __init__(self, window: int = 256):
+        self.enabled = False
+        self._window = window
+        self._lock = Lock()
+        self._statistics = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._statistics.clear()
+
+    def timer(self, operation, buffer_size=0):
+        """
+        Return the stage timer for one call of 'operation'.
+
+        Args:
+            operation (str): Name of the instrumented operation, e.g. 'operation_RX'.
+            buffer_size (int): Number of samples handled by the call.
+
+        Returns:
+            StageTimer or NullStageTimer: No-op timer while instrumentation is disabled.
+        """
+        if not self.enabled:
+            return NULL_STAGE_TIMER
+        return StageTimer(self, operation, buffer_size)
+
+    def record(self, operation, laps, buffer_size):
+        with self._lock:
+            for stage, duration, samples in laps:
+                key = (operation, stage)
+                if key not in self._statistics:
+                    self._statistics[key] = StageStatistics(self._window)
+                self._statistics[key].record(duration, samples, buffer_size)
+
+    def summary(self):
+        """
+        Returns:
+            dict: Statistics of every stage, keyed by operation and then by stage.
+        """
+        with self._lock:
+            items = [(key, statistics.summary())
+                     for key, statistics in self._statistics.items()]
+        summary = {}
+        for (operation, stage), statistics in items:
+            summary.setdefault(operation, {})[stage] = statistics
+        return summary
+
+    def to_json(self):
+        return json.dumps(self.summary(), indent=2)
+
+    def to_prometheus(self):
+        """
+        Returns:
+            str: Statistics in the Prometheus text exposition format.
+        """
+        lines = [
+            '# HELP pluto_chat_stage_seconds Duration of a stage of one call.',
+            '# TYPE pluto_chat_stage_seconds summary'
+        ]
+        samples_lines = [
+            '# HELP pluto_chat_stage_samples_total Samples processed by a stage.',
+            '# TYPE pluto_chat_stage_samples_total counter'
+        ]
+        buffer_lines = [
+            '# HELP pluto_chat_buffer_size Buffer size of the latest call.',
+            '# TYPE pluto_chat_buffer_size gauge'
+        ]
+        for operation, stages in self.summary().items():
+            for stage, statistics in stages.items():
+                labels = f'operation="{operation}",stage="{stage}"'
+                for q, value in statistics['quantiles'].items():
+                    lines.append(
+                        f'pluto_chat_stage_seconds{{{labels},quantile="{q}"}} {value}')
+                lines.append(
+                    f'pluto_chat_stage_seconds_sum{{{labels}}} {statistics["total_seconds"]}')
+                lines.append(
+                    f'pluto_chat_stage_seconds_count{{{labels}}} {statistics["calls"]}')
+                samples_lines.append(
+                    f'pluto_chat_stage_samples_total{{{labels}}} {statistics["total_samples"]}')
+                if stage == 'total':
+                    buffer_lines.append(
+                        f'pluto_chat_buffer_size{{operation="{operation}"}} {statistics["last_buffer_size"]}')
+        return '\n'.join(lines + samples_lines + buffer_lines) + '\n'
+
+    def serve(self, port=9464, host='127.0.0.1'):
+        """
+        Serve the statistics over HTTP from a daemon thread.
+
+        '/metrics' returns the Prometheus text format, '/metrics.json' returns JSON.
+
+        Args:
+            port (int): TCP port.
+            host (str): Address to bind, localhost by default.
+
+        Returns:
+            ThreadingHTTPServer: Running server, stopped with 'shutdown()'.
+        """
+        instrumentation = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body = instrumentation.to_prometheus()
+                    content_type = 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body = instrumentation.to_json()
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                payload = body.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+INSTRUMENTATION = Instrumentation()
@@ -1,6 +1,7 @@
 from scipy.signal import convolve
-from numpy import fix
+from numpy import fix, zeros, dot, concatenate
 from .pulse_shape import srrc
+from .design_cache import DESIGN_CACHE
 
 """
     Interpolate sampled data using a sinc-based interpolation filter.
@@ -51,4 +52,81 @@ def interpolation_with_sinc(sampledData,
     s_tau = srrc(l, beta, 1, tau)
     x_tau = convolve(sampledData[tnow - l:tnow + l + 1], s_tau, 'full')
     y = x_tau[(2 * l) + 2]
-    return y
\ No newline at end of file
+    return y
+
+
+def polyphase_filter_bank(one_sided_length, os_factor, beta, number_of_phases):
+    """
+    Precompute the interpolation filters of 'interpolation_with_sinc' for quantized fractional delays.
+
+    The fractional delay 'tau' in [0, 1] is quantized to 'number_of_phases' equally spaced phases.
+    Row 'p' of the bank holds the time reversed SRRC taps for 'tau = p / number_of_phases', trimmed
+    to the taps which contribute to the output sample picked by 'interpolation_with_sinc'. An extra
+    row for 'tau = 1' is stored so that rounding never wraps into the next sample.
+
+    Args:
+        one_sided_length (int): Half of the number of symbols in the SRRC pulse.
+        os_factor (int): Oversampling factor.
+        beta (float): Roll-off factor for the SRRC pulse.
+        number_of_phases (int): Number of fractional delay phases, e.g. 64 or 256.
+
+    Returns:
+        filter_bank(numpy.ndarray): Read-only array of shape (number_of_phases + 1, 2 * l - 1) where
+                                    l = os_factor * one_sided_length. Banks are served from
+                                    'DESIGN_CACHE'.
+    """
+    def design():
+        l = os_factor * one_sided_length
+        filter_bank = zeros((number_of_phases + 1, 2 * l - 1))
+        for phase in range(number_of_phases + 1):
+            s_tau = srrc(l, beta, 1, phase / number_of_phases)
+            filter_bank[phase] = s_tau[2 * l:1:-1]
+        return filter_bank
+
+    key = ('polyphase_filter_bank', int(one_sided_length), int(os_factor),
+           float(beta), int(number_of_phases))
+    return DESIGN_CACHE.get(key, design)
+
+
+def pad_for_polyphase(sampledData, filter_bank):
+    """
+    Zero pad sampled data on both sides so that 'interpolation_with_polyphase' never slices out of bounds.
+
+    Args:
+        sampledData (numpy.ndarray): Array containing sampled data to be interpolated.
+        filter_bank (numpy.ndarray): Filter bank generated by 'polyphase_filter_bank'.
+
+    Returns:
+        padded_data(numpy.ndarray): Sampled data with (filter_length + 1) / 2 zeros on each side.
+    """
+    pad = zeros((filter_bank.shape[1] + 1) // 2, dtype=sampledData.dtype)
+    return concatenate((pad, sampledData, pad))
+
+
+def interpolation_with_polyphase(padded_data, t: float, filter_bank):
+    """
+    Interpolate sampled data with a precomputed polyphase filter bank.
+
+    This is the quantized counterpart of 'interpolation_with_sinc'. Instead of regenerating the SRRC
+    kernel and convolving a full window, the fractional part of 't' selects a row of the filter bank
+    and the interpolant is evaluated as a single dot product.
+
+    Args:
+        padded_data (numpy.ndarray): Sampled data padded with 'pad_for_polyphase'.
+        t (float): Time at which interpolation is performed, relative to the unpadded data.
+        filter_bank (numpy.ndarray): Filter bank generated by 'polyphase_filter_bank'.
+
+    Returns:
+        y(float): Interpolated value at the specified time 't'.
+
+    Note:
+        The interpolation error is bounded by the quantization of the fractional delay to
+        1 / number_of_phases of a sample.
+    """
+    number_of_phases = filter_bank.shape[0] - 1
+    filter_length = filter_bank.shape[1]
+    tnow = int(fix(t))
+    phase = int(round((t - tnow) * number_of_phases))
+    # Unpadded window starts at tnow - l + 2, padding shifts it by l
+    start = tnow + 2
+    return dot(filter_bank[phase], padded_data[start:start + filter_length])
@@ -1,4 +1,5 @@
-from numpy import fft, argmax, arange, abs
+from numpy import argmax, arange, abs
+from scipy.fft import fft, fftshift
 
 
 def maximum_frequency(rx_nth_power, fs):
@@ -19,7 +20,7 @@ def maximum_frequency(rx_nth_power, fs):
     Note:
         This function uses the Fast Fourier Transform (FFT) to calculate magnitude of
         the n powered received signal. The frequency corresponding to the maximum amplitude is determined
-        .
+        . 'scipy.fft' is used, it keeps complex64 input in single precision.
 
     Example:
         receivedSignalSquared = np.array([...])  # Squared received signal
@@ -27,7 +28,7 @@ def maximum_frequency(rx_nth_power, fs):
         maxFrequency = maxFreq(receivedSignalSquared, samplingFrequency)
         # Returns the frequency corresponding to the maximum amplitude.
     """
-    psd = fft.fftshift(abs(fft.fft(rx_nth_power)))
+    psd = fftshift(abs(fft(rx_nth_power)))
     f = arange(-fs / 2.0, fs / 2.0, fs / len(psd))
     max_freq = f[argmax(psd)]
     return max_freq
@@ -1,8 +1,13 @@
 import adi
+from numpy import divide
+from utils.precision import PRECISION
 
 
 class MyRadio(adi.Pluto):
 
+    TX_SCALE = 2**14
+    RX_SCALE = 2**11
+
     def __init__(self, uri: str, user_name: str, tx_length: int = int(2**18),ongoing_transmission = False):
         super().__init__(f'ip:{uri}')
         self._user_name = user_name
@@ -59,7 +64,7 @@ loopback:                {self.loopback:<12} 0=Disabled, 1=Digital, 2=RF
         if self.tx_cyclic_buffer and self._ongoing_transmission:
             self.kill_tranmission()
         self.tx_cyclic_buffer = True
-        tx_samples = (samples) * (2**14)
+        tx_samples = (samples) * (self.TX_SCALE)
         self.tx(tx_samples)
         self._ongoing_transmission = True
 
@@ -68,8 +73,12 @@ loopback:                {self.loopback:<12} 0=Disabled, 1=Digital, 2=RF
         self._ongoing_transmission = False
 
     def receive_samples(self):
-        for i in range(5):
-            samples = self.rx()
-        return samples / (2**11)
+        # One buffer per call, 'RXCapture' keeps the RX DMA drained between the calls
+        samples = self.rx()
+        if samples.dtype != PRECISION.complex_dtype:
+            return divide(samples, self.RX_SCALE, dtype=PRECISION.complex_dtype)
+        # A new array is returned by 'rx', so it is scaled in place
+        samples /= self.RX_SCALE
+        return samples
 
 
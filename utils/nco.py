@@ -0,0 +1,149 @@
+from numpy import arange, abs, cumprod, dtype as as_dtype, empty, exp, full, multiply, pi
+
+
+class NCO:
+    """
+    Numerically controlled oscillator producing exp(1j * phase) for consecutive samples.
+
+    The oscillator is phase continuous across calls, so consecutive buffers of a stream can be
+    mixed one after the other. The phase is held in a float64 accumulator, wrapped to one turn
+    after every call. Samples are processed in blocks of 'block_length'. The phasors within a
+    block are a table exp(1j * step * k), k < block_length, computed once per frequency. The
+    phasors of the block starts follow the recurrence start[b + 1] = start[b] * exp(1j * step *
+    block_length), renormalized to unit magnitude, and the recurrence restarts from the phase
+    accumulator on every call. Mixing a buffer therefore costs two complex multiplications per
+    sample and one complex exponential per call, instead of one complex exponential per sample.
+
+    Two mixers in a row are one mixer at the sum of their frequencies, e.g. the coarse frequency
+    correction at -coarse_frequency followed by the band shift at fc is a single NCO at
+    fc - coarse_frequency.
+
+    Args:
+        frequency (float): Frequency of the oscillator in Hz, negative for a down conversion.
+        sample_rate (float): Sampling rate in Hz.
+        phase (float): Phase of the first sample in radians.
+        block_length (int): Number of samples per block of the phasor table.
+
+    Example:
+        nco = NCO(fc - coarse_frequency, my_SDR.sample_rate)
+        while True:
+            shifted = nco.mix(my_SDR.receive_samples())
+    """
+
+    def __init__(self,
+                 frequency,
+                 sample_rate,
+                 phase: float = 0.0,
+                 block_length: int = 1024):
+        self._sample_rate = sample_rate
+        self._block_length = block_length
+        self._phase = phase % (2 * pi)
+        self.frequency = frequency
+
+    def __repr__(self):
+        return (f'NCO(frequency={self._frequency}, sample_rate={self._sample_rate}, '
+                f'phase={self._phase})')
+
+    @property
+    def frequency(self):
+        return self._frequency
+
+    @frequency.setter
+    def frequency(self, value):
+        # The phase is kept, a frequency change is phase continuous
+        self._frequency = value
+        self._step = 2 * pi * value / self._sample_rate
+        self._block_step = exp(1j * self._step * self._block_length)
+        self._tables = {
+            as_dtype(complex): exp(1j * self._step * arange(self._block_length))
+        }
+
+    @property
+    def sample_rate(self):
+        return self._sample_rate
+
+    @property
+    def phase(self):
+        """
+        Phase of the next sample in radians, in [0, 2 * pi).
+        """
+        return self._phase
+
+    def reset(self, phase=0.0):
+        self._phase = phase % (2 * pi)
+
+    def generate(self, length, out=None, dtype=complex):
+        """
+        Return the next 'length' oscillator samples.
+
+        Args:
+            length (int): Number of samples.
+            out (numpy.ndarray, optional): Array of 'length' elements to write into.
+            dtype (optional): Complex data type of the samples when 'out' is None.
+
+        Returns:
+            numpy.ndarray: exp(1j * phase) of every sample.
+        """
+        if out is None:
+            out = empty(length, dtype=dtype)
+        return self._rotate(None, out)
+
+    def mix(self, samples, out=None):
+        """
+        Multiply 'samples' with the next len(samples) oscillator samples.
+
+        Args:
+            samples (numpy.ndarray): Complex samples.
+            out (numpy.ndarray, optional): Array to write into, may be 'samples' itself.
+                                           Allocated with the dtype of 'samples' when None.
+
+        Returns:
+            numpy.ndarray: Mixed samples.
+        """
+        if out is None:
+            out = empty(len(samples), dtype=samples.dtype)
+        return self._rotate(samples, out)
+
+    def _rotate(self, samples, out):
+        # Without samples the phasors themselves are written to 'out'
+        length = len(out)
+        table = self._table(out.dtype)
+        number_of_blocks = -(-length // self._block_length)
+        starts = self._block_starts(number_of_blocks).astype(out.dtype, copy=False)
+
+        full_blocks = length // self._block_length
+        split = full_blocks * self._block_length
+        if full_blocks:
+            block_out = out[:split].view()
+            # Raises instead of silently writing into a copy when 'out' is not contiguous
+            block_out.shape = (full_blocks, self._block_length)
+            if samples is None:
+                multiply(starts[:full_blocks, None], table, out=block_out)
+            else:
+                block_samples = samples[:split].reshape(full_blocks, self._block_length)
+                multiply(block_samples, table, out=block_out)
+                multiply(block_out, starts[:full_blocks, None], out=block_out)
+        if split < length:
+            remainder = length - split
+            if samples is None:
+                multiply(table[:remainder], starts[-1], out=out[split:])
+            else:
+                multiply(samples[split:], table[:remainder], out=out[split:])
+                out[split:] *= starts[-1]
+
+        self._phase = (self._phase + self._step * length) % (2 * pi)
+        return out
+
+    def _table(self, dtype):
+        dtype = as_dtype(dtype)
+        if dtype not in self._tables:
+            self._tables[dtype] = self._tables[as_dtype(complex)].astype(dtype)
+        return self._tables[dtype]
+
+    def _block_starts(self, number_of_blocks):
+        starts = full(number_of_blocks, self._block_step)
+        if number_of_blocks:
+            starts[0] = exp(1j * self._phase)
+        cumprod(starts, out=starts)
+        starts /= abs(starts)
+        return starts
@@ -0,0 +1,48 @@
+from numpy import complex64, complex128, dtype as as_dtype, float32, float64
+
+PRECISION_MODES = {
+    'double': (float64, complex128),
+    'single': (float32, complex64)
+}
+
+
+class Precision:
+    """
+    Sample precision of the TX and RX chains.
+
+    In 'double' mode the samples are complex128, as in the original chain. In 'single' mode the
+    signal generator produces complex64 samples, and 'receive_samples', 'RXCapture' and
+    'ParallelReceiver' deliver complex64 buffers. The RX stages follow the dtype of the buffer
+    they are given, so the received samples stay complex64 up to the quantized symbols. The
+    Pluto converters have 12 bits, far below the 24 bit mantissa of float32.
+
+    The phase accumulators stay float64 in both modes: the mixer phases of the coarse frequency
+    correction and band shifting, the Costas loop theta and the clock recovery tau. Their values
+    grow with the buffer length, and float32 would lose the fractional part of the phase.
+
+    Args:
+        mode (str): 'double' or 'single'.
+
+    Example:
+        PRECISION.set('single')
+        operation_TX(my_SDR, message, False, False)
+        print(operation_RX(my_SDR, False))
+    """
+
+    def __init__(self, mode: str = 'double'):
+        self.set(mode)
+
+    def __repr__(self):
+        return f'Precision(mode={self.mode!r}, complex_dtype={self.complex_dtype})'
+
+    def set(self, mode):
+        if mode not in PRECISION_MODES:
+            raise ValueError(f'Unknown precision mode {mode!r}, expected one of '
+                             f'{", ".join(PRECISION_MODES)}')
+        real_type, complex_type = PRECISION_MODES[mode]
+        self.mode = mode
+        self.real_dtype = as_dtype(real_type)
+        self.complex_dtype = as_dtype(complex_type)
+
+
+PRECISION = Precision()
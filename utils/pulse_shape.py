@@ -1,4 +1,5 @@
-from numpy import arange, sqrt, cos, sin, pi
+from numpy import arange, sqrt, cos, sin, pi, dtype as as_dtype
+from .design_cache import DESIGN_CACHE
 
 """
     Generate a Square-Root Raised Cosine (SRRC) pulse with specified parameters.
@@ -45,4 +46,27 @@ def srrc(syms, beta, P, t_off=0):
     #     (1 - beta) * np.pi * k / P) / (4 * beta * k / P))) / denom
     s = (4 * beta / sqrt(P)) * (cos((1 + beta) * pi * k / P) + (sin(
         (1 - beta) * pi * k / P) / (4 * beta * k / P))) / denom
-    return s
\ No newline at end of file
+    return s
+
+
+def srrc_cached(syms, beta, P, t_off=0, dtype=float):
+    """
+    Memoized 'srrc'.
+
+    The pulse is generated once per (syms, beta, P, t_off, dtype) and then served from the
+    process-wide 'DESIGN_CACHE'. The returned array is read-only and shared by every caller.
+
+    Args:
+        syms (int): Half of Total Number of Symbols.
+        beta (float): Roll-off factor.
+        P (int): Oversampling factor.
+        t_off (float, optional): Time offset. Default is 0.
+        dtype (optional): Data type of the pulse, float by default. The pulse is always
+                          designed in double precision and then converted.
+
+    Returns:
+        s(numpy.ndarray): Read-only SRRC pulse waveform.
+    """
+    dtype = as_dtype(dtype)
+    key = ('srrc', int(syms), float(beta), int(P), float(t_off), dtype.str)
+    return DESIGN_CACHE.get(key, lambda: srrc(syms, beta, P, t_off).astype(dtype))
@@ -0,0 +1,135 @@
+from queue import Queue, Empty
+from threading import Event, Lock, Thread
+from numpy import multiply, zeros
+from utils.precision import PRECISION
+
+
+class RXCapture:
+    """
+    Background thread which keeps the RX DMA of a radio drained.
+
+    The thread calls 'rx()' back to back and scales every buffer in place into one slot of a pool
+    of preallocated arrays, in the units and the 'PRECISION' of 'receive_samples'. Filled slots
+    are handed to the consumer in capture order through a bounded queue. When the consumer falls
+    behind and no slot is free, the new buffer is still read but dropped, so the radio never
+    stalls and the order of the delivered buffers is kept. Every captured buffer gets a sequence
+    number, a gap in the sequence numbers seen by the consumer marks dropped buffers.
+
+    Since 'rx()' is called continuously, no stale buffers pile up in the radio, so
+    'MyRadio.receive_samples' reads a single buffer and no polling with a sleep is needed.
+
+    Args:
+        radio (MyRadio): Radio to capture from, 'rx_buffer_size' must not change while running.
+        number_of_buffers (int): Number of preallocated buffers in the pool.
+
+    Example:
+        capture = RXCapture(my_SDR)
+        capture.start()
+        while chatting:
+            sequence, samples = capture.get(timeout=1)
+            print(operation_RX(my_SDR, False, samples))
+            capture.release(sequence)
+        capture.stop()
+    """
+
+    def __init__(self, radio, number_of_buffers: int = 8):
+        self._radio = radio
+        self._number_of_buffers = number_of_buffers
+        self._pool = zeros((number_of_buffers, radio.rx_buffer_size),
+                           dtype=PRECISION.complex_dtype)
+        self._free = Queue(maxsize=number_of_buffers)
+        self._filled = Queue(maxsize=number_of_buffers)
+        for slot in range(number_of_buffers):
+            self._free.put(slot)
+        self._in_use = {}
+        self._lock = Lock()
+        self._stop_event = Event()
+        self._thread = None
+        self.captured = 0
+        self.dropped = 0
+
+    def __repr__(self):
+        return (f'RXCapture(buffers={self._number_of_buffers}, '
+                f'captured={self.captured}, dropped={self.dropped}, '
+                f'queued={self.queued})')
+
+    @property
+    def queued(self):
+        return self._filled.qsize()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def statistics(self):
+        """
+        Returns:
+            dict: Captured, dropped and queued buffer counts.
+        """
+        with self._lock:
+            return {
+                'captured': self.captured,
+                'dropped': self.dropped,
+                'queued': self.queued
+            }
+
+    def start(self):
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = Thread(target=self._capture, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def get(self, timeout=None):
+        """
+        Return the oldest captured buffer, waiting up to 'timeout' seconds.
+
+        The returned array is a slot of the pool, it must be handed back with 'release' once it
+        is processed and must not be used afterwards.
+
+        Args:
+            timeout (float, optional): Seconds to wait, waits forever when None.
+
+        Returns:
+            tuple: Sequence number of the buffer and its samples.
+
+        Raises:
+            queue.Empty: No buffer was captured within 'timeout'.
+        """
+        sequence, slot = self._filled.get(timeout=timeout)
+        with self._lock:
+            self._in_use[sequence] = slot
+        return sequence, self._pool[slot]
+
+    def release(self, sequence):
+        """
+        Hand the buffer with 'sequence' back to the pool.
+        """
+        with self._lock:
+            slot = self._in_use.pop(sequence)
+        self._free.put(slot)
+
+    def _capture(self):
+        rx_scale = 1 / self._radio.RX_SCALE
+        while not self._stop_event.is_set():
+            try:
+                slot = self._free.get_nowait()
+            except Empty:
+                slot = None
+            samples = self._radio.rx()
+            with self._lock:
+                sequence = self.captured
+                self.captured += 1
+                if slot is None:
+                    self.dropped += 1
+            if slot is None:
+                # The read kept the DMA drained, the buffer itself is lost
+                continue
+            multiply(samples, rx_scale, out=self._pool[slot])
+            self._filled.put((sequence, slot))
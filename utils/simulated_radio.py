@@ -0,0 +1,262 @@
+from numpy import arange, clip, divide, exp, mean, pi, rint, sinc, sqrt, take, zeros, hamming, floor
+from numpy.random import default_rng
+from time import perf_counter, sleep
+from scipy.signal import convolve
+from utils.precision import PRECISION
+
+
+class SimulatedChannel:
+    """
+    Baseband channel between the cyclic TX buffer of one radio and the RX buffers of another.
+
+    The channel applies, in this order, a timing offset, a gain, a carrier frequency offset with
+    a phase offset, and additive white Gaussian noise. The timing offset may be fractional, the
+    fractional part is applied with a windowed sinc interpolator. All impairments are evaluated
+    at absolute sample indices, so consecutive RX buffers are continuous in time and phase.
+
+    Args:
+        frequency_offset (float): Carrier frequency offset in Hz.
+        phase_offset (float): Carrier phase offset in radians.
+        timing_offset (float): Delay of the received signal in samples.
+        snr_db (float): Signal to noise ratio in dB, relative to the power of the transmitted
+                        buffer after the gain.
+        gain (float): Linear amplitude gain of the channel.
+        seed (int, optional): Seed of the noise generator.
+    """
+
+    INTERPOLATOR_HALF_LENGTH = 8
+
+    def __init__(self,
+                 frequency_offset: float = 0.0,
+                 phase_offset: float = 0.0,
+                 timing_offset: float = 0.0,
+                 snr_db: float = 30.0,
+                 gain: float = 0.5,
+                 seed=None):
+        self.frequency_offset = frequency_offset
+        self.phase_offset = phase_offset
+        self.timing_offset = timing_offset
+        self.snr_db = snr_db
+        self.gain = gain
+        self._rng = default_rng(seed)
+
+    def __repr__(self):
+        return (f'SimulatedChannel(frequency_offset={self.frequency_offset}, '
+                f'phase_offset={self.phase_offset}, '
+                f'timing_offset={self.timing_offset}, snr_db={self.snr_db}, '
+                f'gain={self.gain})')
+
+    def _interpolator(self, fraction):
+        n = arange(-self.INTERPOLATOR_HALF_LENGTH,
+                   self.INTERPOLATOR_HALF_LENGTH + 1)
+        taps = sinc(n - fraction) * hamming(len(n))
+        return taps / taps.sum()
+
+    def apply(self, tx_buffer, start, length, sample_rate, signal_power,
+              lo_offset=0.0):
+        """
+        Return 'length' received samples starting at absolute sample index 'start'.
+
+        Args:
+            tx_buffer (numpy.ndarray): Cyclic transmit buffer, None while nothing is transmitted.
+            start (int): Absolute sample index of the first received sample.
+            length (int): Number of received samples.
+            sample_rate (float): Sampling rate in Hz.
+            signal_power (float): Mean power of 'tx_buffer', used to scale the noise.
+            lo_offset (float, optional): LO frequency difference in Hz, added to the frequency offset.
+
+        Returns:
+            received(numpy.ndarray): Complex received samples, in the units of 'tx_buffer'.
+        """
+        received = zeros(length, dtype=complex)
+        if tx_buffer is not None:
+            delay = floor(self.timing_offset)
+            fraction = self.timing_offset - delay
+            half = self.INTERPOLATOR_HALF_LENGTH
+            first = start - int(delay) - half
+            window = take(tx_buffer, arange(first, first + length + 2 * half),
+                          mode='wrap')
+            received += convolve(window, self._interpolator(fraction), 'valid')
+            sample_index = start + arange(length)
+            frequency_offset = self.frequency_offset + lo_offset
+            phase = 2 * pi * ((frequency_offset / sample_rate * sample_index) %
+                              1.0) + self.phase_offset
+            received *= self.gain * exp(1j * phase)
+        noise_std = self.gain * sqrt(signal_power * 10**(-self.snr_db / 10) / 2)
+        received += noise_std * (self._rng.standard_normal(length) +
+                                 1j * self._rng.standard_normal(length))
+        return received
+
+
+class SimulatedRadio:
+    """
+    Hardware-free stand-in for 'MyRadio'.
+
+    Offers the surface used by 'operation_TX', 'operation_RX' and 'pluto_chat.py':
+    'transmit_samples', 'receive_samples', 'kill_tranmission', 'sample_rate', 'rx_buffer_size'
+    and 'tx_cyclic_buffer', together with the 'adi.Pluto' attributes changed by the chat menu.
+    'adi' is not imported. The cyclic TX buffer of the peer radio, by default the radio itself,
+    is played back through a 'SimulatedChannel' into the RX buffers. Samples are scaled to the
+    DAC and ADC ranges exactly as on the hardware, and the ADC clips at full scale.
+
+    The LO frequencies take part in the link: the difference between the TX LO of the peer and
+    the RX LO of this radio adds to the channel frequency offset, and no signal is received when
+    it exceeds half of the sample rate.
+
+    Args:
+        uri (str): Name of the radio, only used in 'repr'.
+        user_name (str): User name.
+        tx_length (int): Number of samples in the TX buffer.
+        ongoing_transmission (bool): Initial transmission flag.
+        channel (SimulatedChannel, optional): Channel from the peer to this radio.
+        real_time (bool): Pace 'rx()' to the sample rate like the hardware, otherwise every buffer
+                          is returned as fast as it is simulated.
+
+    Example:
+        alice = SimulatedRadio('sim-a', 'alice')
+        bob = SimulatedRadio('sim-b', 'bob', channel=SimulatedChannel(frequency_offset=3e3))
+        alice.connect(bob)
+        operation_TX(alice, 'Hello Bob', False, False)
+        print(operation_RX(bob, False))
+    """
+
+    TX_SCALE = 2**14
+    RX_SCALE = 2**11
+
+    def __init__(self,
+                 uri: str = 'simulated',
+                 user_name: str = '',
+                 tx_length: int = int(2**18),
+                 ongoing_transmission=False,
+                 channel: SimulatedChannel = None,
+                 real_time: bool = False):
+        self.uri = uri
+        self.real_time = real_time
+        self._user_name = user_name
+        self._tx_length = tx_length
+        self._ongoing_transmission = ongoing_transmission
+        self.channel = channel if channel is not None else SimulatedChannel()
+        self.peer = self
+
+        # Attributes of adi.Pluto used by the chat application
+        self.sample_rate = int(10e6)
+        self.rx_buffer_size = int(2**16)
+        self.tx_cyclic_buffer = False
+        self.rx_lo = int(900e6)
+        self.tx_lo = int(900e6)
+        self.rx_rf_bandwidth = int(10e6)
+        self.tx_rf_bandwidth = int(10e6)
+        self.rx_hardwaregain_chan0 = 0
+        self.tx_hardwaregain_chan0 = 0
+        self.gain_control_mode_chan0 = 'slow_attack'
+        self.filter = None
+        self.loopback = 0
+
+        self._tx_buffer = None
+        self._tx_power = 1.0
+        self._rx_position = 0
+        self._stream_start = None
+
+    def __repr__(self):
+        retstr = f"""SimulatedRadio(uri="{self.uri}") object for user "{self._user_name}" with following key properties:
+
+rx_lo:                   {self.rx_lo / 1000000:<12} MHz, Carrier frequency of RX path
+rx_buffer_size:          {self.rx_buffer_size} Samples for receive
+tx_lo:                   {self.tx_lo / 1000000:<12} MHz, Carrier frequency of TX path
+tx_cyclic_buffer:        {self.tx_cyclic_buffer:<12} Toggles cyclic buffer
+tx_length                {self._tx_length} Samples for transmission
+sample_rate:             {self.sample_rate / 1000000:<12} MSPS, Sample rate RX and TX paths
+peer:                    {self.peer.uri:<12} Radio whose TX buffer is received
+channel:                 {self.channel}
+
+"""
+        return retstr
+
+    @property
+    def user_name(self):
+        return self._user_name
+
+    @user_name.setter
+    def user_name(self, value):
+        self._user_name = value
+
+    @property
+    def tx_length(self):
+        return self._tx_length
+
+    @tx_length.setter
+    def tx_length(self, value):
+        self._tx_length = value
+
+    @property
+    def ongoing_transmission(self):
+        return self._ongoing_transmission
+
+    @ongoing_transmission.setter
+    def ongoing_transmission(self, value):
+        self._ongoing_transmission = value
+
+    def connect(self, other):
+        """
+        Link two radios, each one receives the TX buffer of the other through its own channel.
+
+        Args:
+            other (SimulatedRadio): Radio at the other end of the link.
+        """
+        self.peer = other
+        other.peer = self
+
+    def tx(self, tx_samples):
+        # Replacing the reference is atomic, a concurrent 'rx' sees the old or the new buffer
+        tx_buffer = tx_samples / self.TX_SCALE
+        self._tx_power = mean(abs(tx_buffer)**2)
+        self._tx_buffer = tx_buffer
+
+    def tx_destroy_buffer(self):
+        self._tx_buffer = None
+
+    def rx(self):
+        peer = self.peer
+        lo_offset = peer.tx_lo - self.rx_lo
+        tx_buffer = peer._tx_buffer
+        if abs(lo_offset) >= self.sample_rate / 2:
+            tx_buffer = None
+        received = self.channel.apply(tx_buffer, self._rx_position,
+                                      self.rx_buffer_size, self.sample_rate,
+                                      peer._tx_power, lo_offset)
+        self._rx_position += self.rx_buffer_size
+        if self.real_time:
+            self._wait_for_stream()
+        # 12 bit ADC
+        full_scale = self.RX_SCALE - 1
+        return (clip(rint(received.real * self.RX_SCALE), -full_scale, full_scale) +
+                1j * clip(rint(received.imag * self.RX_SCALE), -full_scale,
+                          full_scale))
+
+    def _wait_for_stream(self):
+        # Block until the hardware would have filled the buffer just returned
+        if self._stream_start is None:
+            self._stream_start = perf_counter() - self._rx_position / self.sample_rate
+        delay = self._stream_start + self._rx_position / self.sample_rate - perf_counter()
+        if delay > 0:
+            sleep(delay)
+
+    def transmit_samples(self, samples):
+        if self.tx_cyclic_buffer and self._ongoing_transmission:
+            self.kill_tranmission()
+        self.tx_cyclic_buffer = True
+        tx_samples = (samples) * (self.TX_SCALE)
+        self.tx(tx_samples)
+        self._ongoing_transmission = True
+
+    def kill_tranmission(self):
+        self.tx_destroy_buffer()
+        self._ongoing_transmission = False
+
+    def receive_samples(self):
+        samples = self.rx()
+        if samples.dtype != PRECISION.complex_dtype:
+            return divide(samples, self.RX_SCALE, dtype=PRECISION.complex_dtype)
+        # A new array is returned by 'rx', so it is scaled in place
+        samples /= self.RX_SCALE
+        return samples
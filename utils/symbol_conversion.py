@@ -1,6 +1,13 @@
-from numpy import zeros, mod, base_repr, floor, sqrt
+from numpy import zeros, mod, base_repr, floor, sqrt, array, arange, asarray, frombuffer, uint8, take, where, isin, argmax
 from numpy.random import rand
 
+# Lookup tables of the table-driven codec
+PAM_LEVELS = array([-3, -1, 1, 3])
+QAM_TABLE = array([-1 - 1j, -1 + 1j, 1 - 1j, 1 + 1j])
+QAM4_2_TABLE = array([-3 - 3j, -1 - 1j, 1 + 1j, 3 + 3j])
+# Row b holds the four PAM symbols of byte b, most significant base-4 digit first
+BYTE_TO_PAM = take(PAM_LEVELS, (arange(256)[:, None] >> array([6, 4, 2, 0])) & 3)
+
 
 def pam_to_letters(symbols_PAM):
     """
@@ -249,6 +256,121 @@ def pam_to_qam4_2(symbols_PAM):
     return symbols_QAM4_2
 
 
+def letters_to_pam_lut(text):
+    """
+    Table-driven counterpart of 'letters_to_pam'.
+
+    Every byte is mapped to its four PAM symbols with one lookup in the 256-entry 'BYTE_TO_PAM'
+    table, so a whole message converts in a few array operations.
+
+    Args:
+        text (str, bytes or numpy.ndarray): Message as a string, as bytes or as an array of byte values.
+                                            Strings are encoded as Latin-1, characters outside
+                                            Latin-1 are replaced by '?'.
+
+    Returns:
+       symbols_PAM(numpy.ndarray) : An array of PAM-encoded symbols, four per byte.
+
+    Note:
+        Unlike 'letters_to_pam', characters below 16 are also encoded with four symbols, so the
+        symbol count is always four times the byte count.
+    """
+    if isinstance(text, str):
+        text = text.encode('latin-1', errors='replace')
+    if isinstance(text, (bytes, bytearray)):
+        byte_values = frombuffer(text, dtype=uint8)
+    else:
+        byte_values = asarray(text, dtype=uint8)
+    return take(BYTE_TO_PAM, byte_values, axis=0).ravel()
+
+
+def pam_to_bytes_lut(symbols_PAM):
+    """
+    Convert PAM-encoded symbols to bytes with bit-shifts, four symbols per byte.
+
+    Args:
+        symbols_PAM (numpy.ndarray): Input array containing PAM-encoded symbols.
+
+    Returns:
+        converted_bytes(bytes): The bytes corresponding to the PAM-encoded symbols. Trailing
+                                symbols that do not fill a byte are dropped.
+    """
+    symbols_PAM = asarray(symbols_PAM)
+    N = len(symbols_PAM)
+    digits = ((symbols_PAM[:N - mod(N, 4)].astype(int) + 3) // 2) & 3
+    digits = digits.astype(uint8).reshape(-1, 4)
+    byte_values = (digits[:, 0] << 6) | (digits[:, 1] << 4) | (
+        digits[:, 2] << 2) | digits[:, 3]
+    return byte_values.tobytes()
+
+
+def pam_to_letters_lut(symbols_PAM):
+    """
+    Table-driven counterpart of 'pam_to_letters'.
+
+    Args:
+        symbols_PAM (numpy.ndarray): Input array containing PAM-encoded symbols.
+
+    Returns:
+        converted_string(str): The generated string of letters corresponding to the PAM-encoded symbols.
+    """
+    return pam_to_bytes_lut(symbols_PAM).decode('latin-1')
+
+
+def constellation_to_pam_lut(symbols, constellation):
+    """
+    Map constellation points to PAM symbols with a 4-entry lookup table.
+
+    Args:
+        symbols (numpy.ndarray): Input array containing complex symbols.
+        constellation (numpy.ndarray): The four constellation points mapped to PAM -3, -1, 1 and 3.
+
+    Returns:
+        symbols_PAM(numpy.ndarray): An array of PAM-encoded symbols. Points that are not in the
+                                    constellation map to PAM 3, like in 'qam_to_pam'.
+    """
+    matches = asarray(symbols)[:, None] == constellation[None, :]
+    index = where(matches.any(axis=1), argmax(matches, axis=1), 3)
+    return take(PAM_LEVELS, index)
+
+
+def pam_to_constellation_lut(symbols_PAM, constellation):
+    """
+    Map PAM symbols to constellation points with a 4-entry lookup table.
+
+    Args:
+        symbols_PAM (numpy.ndarray): Input array containing PAM-encoded symbols.
+        constellation (numpy.ndarray): The four constellation points for PAM -3, -1, 1 and 3.
+
+    Returns:
+        symbols(numpy.ndarray): An array of complex symbols. Symbols other than -3, -1 and 1
+                                map to the last point, like in 'pam_to_qam'.
+    """
+    symbols_PAM = asarray(symbols_PAM)
+    index = where(isin(symbols_PAM, PAM_LEVELS[:3]), (symbols_PAM + 3) // 2, 3)
+    return take(constellation, index.astype(int))
+
+
+def qam_to_pam_lut(symbols_QAM):
+    """Table-driven counterpart of 'qam_to_pam'."""
+    return constellation_to_pam_lut(symbols_QAM, QAM_TABLE)
+
+
+def pam_to_qam_lut(symbols_PAM):
+    """Table-driven counterpart of 'pam_to_qam'."""
+    return pam_to_constellation_lut(symbols_PAM, QAM_TABLE)
+
+
+def qam4_2_to_pam_lut(symbols_QAM4_2):
+    """Table-driven counterpart of 'qam4_2_to_pam'."""
+    return constellation_to_pam_lut(symbols_QAM4_2, QAM4_2_TABLE)
+
+
+def pam_to_qam4_2_lut(symbols_PAM):
+    """Table-driven counterpart of 'pam_to_qam4_2'."""
+    return pam_to_constellation_lut(symbols_PAM, QAM4_2_TABLE)
+
+
 def pam(len, M, var):
     """
     Generate a sequence of PAM-encoded symbols.
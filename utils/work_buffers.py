@@ -0,0 +1,68 @@
+from threading import local
+from numpy import dtype as as_dtype, empty
+
+
+class WorkBuffers:
+    """
+    Pool of preallocated work arrays, reused by consecutive calls of a processing chain.
+
+    Each array is identified by a name and a dtype. An array is allocated on first use and again
+    only when a longer one is requested, otherwise a view of the first 'length' elements of the
+    existing array is returned. Stages write into these arrays with 'out=' arguments, so a warm
+    pool does not allocate full-length arrays at all. An array stays valid until the same name is
+    requested again, so results which outlive a call must be copied.
+
+    The pool is not thread safe, use 'work_buffers()' to get the pool of the calling thread.
+    """
+
+    def __init__(self):
+        self._arrays = {}
+        self.allocations = 0
+        self.reuses = 0
+
+    def __repr__(self):
+        return (f'WorkBuffers(arrays={len(self._arrays)}, bytes={self.nbytes}, '
+                f'allocations={self.allocations}, reuses={self.reuses})')
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in self._arrays.values())
+
+    def get(self, name, length, dtype=complex):
+        """
+        Return a work array of 'length' elements, with undefined content.
+
+        Args:
+            name (str): Role of the array in the processing chain.
+            length (int): Number of elements.
+            dtype (optional): Data type of the array, complex by default.
+
+        Returns:
+            numpy.ndarray: Work array owned by the pool.
+        """
+        key = (name, as_dtype(dtype))
+        array = self._arrays.get(key)
+        if array is None or len(array) < length:
+            array = empty(length, dtype=dtype)
+            self._arrays[key] = array
+            self.allocations += 1
+        else:
+            self.reuses += 1
+        return array[:length]
+
+    def clear(self):
+        self._arrays.clear()
+
+
+_thread_buffers = local()
+
+
+def work_buffers():
+    """
+    Return the 'WorkBuffers' pool of the calling thread.
+    """
+    buffers = getattr(_thread_buffers, 'buffers', None)
+    if buffers is None:
+        buffers = WorkBuffers()
+        _thread_buffers.buffers = buffers
+    return buffers